@@ -1,11 +1,22 @@
 # app.py
+import atexit
 import logging
-from functools import wraps
+from functools import partial, wraps
 from datetime import datetime
-from flask import Flask, request, jsonify, abort
-
-from database import Database
-from models import Task, ShoppingItem
+from flask import Flask, Response, request, jsonify, abort, g
+
+from bootstrap import create_compressor, create_database, create_households, create_maintenance, create_reminders
+from etags import etag_base, matching_etag, make_etag, tasks_valid_until, dashboard_valid_until, end_of_day
+from metrics import Metrics, span
+from json_provider import get_json_provider_class
+from serializers import (
+    task_to_dict, shopping_item_to_dict, household_to_dict, dashboard_to_dict, sync_to_dict, batch_result,
+    json_array_chunks, next_page_link, shopping_suggestion_to_dict,
+)
+from validation import (
+    parse_login_name, parse_login_household, parse_new_task, parse_task_update, parse_new_shopping_item,
+    parse_due_filter, parse_shopping_filter, parse_page, parse_suggest, parse_stats_days, parse_since, parse_batch,
+)
 import config
 
 # Настройка логирования
@@ -13,76 +24,217 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-
-# Инициализация базы данных (один экземпляр на всё приложение)
-db = Database(config.DATABASE_PATH)
+# orjson, если установлен (JSON_PROVIDER = 'auto' | 'orjson' | 'stdlib')
+app.json = get_json_provider_class(getattr(config, 'JSON_PROVIDER', 'auto'))(app)
+
+# Метрики запросов и SQL: заголовок Server-Timing и /metrics (по умолчанию выключены)
+metrics = Metrics() if getattr(config, 'INSTRUMENTATION_ENABLED', False) else None
+
+# Инициализация базы данных (один экземпляр на всё приложение): пользователи,
+# домохозяйства и — если не включены отдельные файлы — их данные
+db = create_database(config, query_hook=metrics)
+# База с данными домохозяйства пользователя (g.db) выдаётся в require_chat_id
+households = create_households(db, config, query_hook=metrics)
+if metrics:
+    metrics.init_app(app, path=getattr(config, 'METRICS_PATH', '/metrics'))
+
+# gzip (и br / zstd, если установлены) по Accept-Encoding
+compressor = create_compressor(config)
+
+@app.after_request
+def compress_response(response):
+    # Потоковые ответы (/events, ?stream=true) и 304 не сжимаются
+    if compressor is None or response.status_code != 200 or response.is_streamed \
+            or response.direct_passthrough or 'Content-Encoding' in response.headers:
+        return response
+    if not compressor.eligible(response.mimetype, response.content_length or 0):
+        return response
+    response.vary.add('Accept-Encoding')
+    encoding = compressor.negotiate(request.headers.get('Accept-Encoding'))
+    if encoding is None:
+        return response
+    body = compressor.compress(response.get_data(), encoding, response.headers.get('ETag'))
+    if body is not None:
+        response.set_data(body)
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+@app.teardown_appcontext
+def release_db_connection(exc):
+    # Соединение потока возвращается в пул и достаётся следующему запросу
+    db.release_connection()
+    household_db = g.pop('db', None)
+    if household_db is not None and household_db is not db:
+        household_db.release_connection()
+    household_id = g.pop('household_id', None)
+    if household_id is not None:
+        households.release(household_id)
+
+# Очистка истории, optimize, vacuum и checkpoint — в фоне, а не в запросах
+maintenance = create_maintenance(db, config, households)
+maintenance.start()
+reminders = create_reminders(households, config)
+if reminders is not None:
+    reminders.start()
+
+# Закрываем соединения при остановке процесса (atexit вызывает в обратном порядке)
+atexit.register(db.close)
+atexit.register(households.close)
+atexit.register(maintenance.stop)
+if reminders is not None:
+    atexit.register(reminders.stop)
 
 # Декоратор для проверки X-Chat-ID
 def require_chat_id(f):
     @wraps(f)
     def decorated(*args, **kwargs):
-        chat_id = request.headers.get('X-Chat-ID')
-        if not chat_id:
-            abort(401, description='Missing X-Chat-ID header')
-        try:
-            chat_id = int(chat_id)
-        except ValueError:
-            abort(400, description='X-Chat-ID must be integer')
-        # Проверяем, что пользователь существует в базе
-        if not db.user_exists(chat_id):
-            abort(403, description='User not found')
+        with span('auth'):
+            chat_id = request.headers.get('X-Chat-ID')
+            if not chat_id:
+                abort(401, description='Missing X-Chat-ID header')
+            try:
+                chat_id = int(chat_id)
+            except ValueError:
+                abort(400, description='X-Chat-ID must be integer')
+            # Проверяем, что пользователь существует (обычно попадание в кэш, без SQLite)
+            household_id = db.get_user_household(chat_id)
+            if household_id is None:
+                abort(403, description='User not found')
+            # Все данные запроса — только из домохозяйства пользователя
+            g.db = households.acquire(household_id)
+            g.household_id = household_id
         kwargs['chat_id'] = chat_id
         return f(*args, **kwargs)
     return decorated
 
+# Декоратор условных запросов: ETag строится из версий таблиц и URL
+# запроса, поэтому 304 отдаётся без обращения к SQLite
+def etag_cached(*tables):
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            # Версию читаем до выборки: если данные изменятся в процессе,
+            # ответ получит старый ETag и следующий запрос вернёт 200
+            base = etag_base(g.db.versions.token(*tables, scope=g.household_id), request.full_path)
+            etag = matching_etag(request.headers.get('If-None-Match'), base)
+            if etag is not None:
+                response = app.response_class(status=304)
+                response.set_etag(etag, weak=True)
+                return response
+            g.etag_valid_until = None
+            response = app.make_response(f(*args, **kwargs))
+            if response.status_code == 200:
+                # Ответ может зависеть от текущего времени: тогда ETag действителен до g.etag_valid_until
+                response.set_etag(make_etag(base, g.etag_valid_until), weak=True)
+            return response
+        return decorated
+    return decorator
+
 @app.route('/login', methods=['POST'])
 def login():
-    """Вход по имени. Возвращает chat_id, если пользователь существует."""
+    """Вход по имени (и household_id, если имя есть в нескольких домохозяйствах).
+    Возвращает chat_id и домохозяйство пользователя."""
     data = request.get_json()
     if not data:
         abort(400, description='Missing JSON body')
-    name = data.get('name')
-    if not name:
-        abort(400, description='name is required')
-    name = name.strip()
-    if not name:
-        abort(400, description='name cannot be empty')
-
-    chat_id = db.get_user_by_name(name)
-    if chat_id is None:
+    try:
+        name = parse_login_name(data)
+        household_id = parse_login_household(data)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    users = db.get_users_by_name(name, household_id)
+    if not users:
         abort(404, description='User not found')
+    if len(users) > 1:
+        abort(409, description='Several users with this name, specify household_id')
 
-    return jsonify({'chat_id': chat_id, 'name': name})
-
-# ========== Вспомогательные функции сериализации ==========
-def task_to_dict(task: Task) -> dict:
-    return {
-        'id': task.id,
-        'name': task.name,
-        'interval_days': task.interval_days,
-        'last_done': task.last_done.isoformat() if task.last_done else None,
-        'last_done_by': task.last_done_by,
-        # 'created_at': task.created_at.isoformat() if task.created_at else None,
-        'is_overdue': task.is_overdue(),
-        'days_until_due': task.days_until_due(),
-        'days_since_done': task.days_since_done(),
-    }
-
-def shopping_item_to_dict(item: ShoppingItem) -> dict:
-    return {
-        'id': item.id,
-        'item_text': item.item_text,
-        'is_checked': item.is_checked,
-        'category': item.category,
-        # 'created_at': item.created_at.isoformat() if item.created_at else None,
-    }
+    chat_id, household_id = users[0]
+    return jsonify({'chat_id': chat_id, 'name': name, 'household_id': household_id})
+
+@app.route('/household', methods=['GET'])
+@require_chat_id
+def get_household(chat_id):
+    """Домохозяйство текущего пользователя и его участники."""
+    household = db.get_household(g.household_id)
+    if not household:
+        abort(404, description='Household not found')
+    return jsonify(household_to_dict(household, db.get_household_members(g.household_id)))
 
 # ========== Эндпоинты для задач ==========
+# Списки: ?limit=&after_id= — страница (keyset), ?stream=true — весь список потоком
+MAX_PAGE_SIZE = getattr(config, 'MAX_PAGE_SIZE', 500)
+STREAM_PAGE_SIZE = getattr(config, 'STREAM_PAGE_SIZE', 200)
+
+def parse_page_args():
+    return parse_page(request.args.get('limit'), request.args.get('after_id'),
+                      request.args.get('stream'), MAX_PAGE_SIZE)
+
+def page_response(page: list, limit: int, to_dict) -> Response:
+    response = jsonify([to_dict(obj) for obj in page])
+    link = next_page_link(request.path, request.args, page, limit)
+    if link:
+        response.headers['Link'] = link
+    return response
+
+def stream_response(pages, to_dict) -> Response:
+    """JSON-массив, который пишется по мере чтения страниц из базы:
+    память воркера не зависит от длины списка"""
+    household_id, household_db = g.household_id, g.db
+
+    def generate():
+        try:
+            yield from json_array_chunks(pages, to_dict, app.json.dumps)
+        finally:
+            # Генератор выполняется после teardown запроса
+            household_db.release_connection()
+
+    response = Response(generate(), mimetype='application/json')
+    # Ответ переживает запрос: своя аренда базы домохозяйства до его закрытия
+    households.acquire(household_id)
+    response.call_on_close(lambda: households.release(household_id))
+    return response
+
+@app.route('/dashboard', methods=['GET'])
+@require_chat_id
+@etag_cached('tasks', 'shopping_items')
+def get_dashboard(chat_id):
+    """Сводка для главного экрана: число задач (всего и просроченных),
+    покупок (отмеченных и нет) и ближайшая задача."""
+    now = datetime.now()
+    dashboard = g.db.get_dashboard(g.household_id, now)
+    g.etag_valid_until = dashboard_valid_until(dashboard, now)
+    return jsonify(dashboard_to_dict(dashboard, now))
+
 @app.route('/tasks', methods=['GET'])
 @require_chat_id
+@etag_cached('tasks')
 def get_tasks(chat_id):
-    tasks = db.get_all_tasks()
-    return jsonify([task_to_dict(t) for t in tasks])
+    """Все задачи по имени, либо с фильтром ?due_before=<ISO дата>&overdue=true
+    — только задачи со сроком до указанного момента, по возрастанию срока.
+    Список по имени можно получать страницами (?limit=&after_id=) или потоком (?stream=true)."""
+    now = datetime.now()
+    try:
+        due_before, overdue = parse_due_filter(request.args.get('due_before'), request.args.get('overdue'), now)
+        limit, after_id, stream = parse_page_args()
+    except ValueError as e:
+        abort(400, description=str(e))
+    if due_before and (limit or stream):
+        abort(400, description='limit, after_id and stream are not supported with due_before')
+    to_dict = partial(task_to_dict, now=now)
+    if stream:
+        # Статус задач зависит от времени, а к отправке заголовков задачи ещё не прочитаны
+        g.etag_valid_until = now.timestamp()
+        return stream_response(g.db.iter_tasks(g.household_id, STREAM_PAGE_SIZE), to_dict)
+    if limit:
+        tasks = g.db.get_tasks_page(g.household_id, limit, after_id)
+        if tasks is None:
+            abort(400, description='after_id not found')
+        g.etag_valid_until = tasks_valid_until(tasks, now)
+        return page_response(tasks, limit, to_dict)
+    tasks = g.db.get_due_tasks(g.household_id, due_before) if due_before else g.db.get_all_tasks(g.household_id)
+    g.etag_valid_until = tasks_valid_until(tasks, now, overdue)
+    return jsonify([task_to_dict(t, now) for t in tasks])
 
 @app.route('/tasks', methods=['POST'])
 @require_chat_id
@@ -90,27 +242,20 @@ def create_task(chat_id):
     data = request.get_json()
     if not data:
         abort(400, description='Missing JSON body')
-    name = data.get('name')
-    interval_days = data.get('interval_days')
-    if not name or not interval_days:
-        abort(400, description='name and interval_days are required')
-    if not isinstance(interval_days, int) or interval_days <= 0:
-        abort(400, description='interval_days must be positive integer')
-
-    success = db.add_new_task(name, interval_days)
-    if not success:
-        abort(409, description='Task with this name already exists')
+    try:
+        name, interval_days = parse_new_task(data)
+    except ValueError as e:
+        abort(400, description=str(e))
 
-    tasks = db.get_all_tasks()
-    task = next((t for t in tasks if t.name.lower() == name.lower()), None)
+    task = g.db.add_new_task(g.household_id, name, interval_days)
     if not task:
-        abort(500, description='Task created but not found')
+        abort(409, description='Task with this name already exists')
     return jsonify(task_to_dict(task)), 201
 
 @app.route('/tasks/<int:task_id>', methods=['PATCH'])
 @require_chat_id
 def update_task(task_id, chat_id):
-    task = db.get_task_by_id(task_id)
+    task = g.db.get_task_by_id(g.household_id, task_id)
     if not task:
         abort(404, description='Task not found')
 
@@ -118,94 +263,132 @@ def update_task(task_id, chat_id):
     if not data:
         abort(400, description='Missing JSON body')
 
-    if 'name' in data:
-        new_name = data['name'].strip()
-        if not new_name:
-            abort(400, description='name cannot be empty')
-        success = db.rename_task(task_id, new_name)
+    try:
+        new_name, new_interval = parse_task_update(data)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    if new_name is not None:
+        success = g.db.rename_task(g.household_id, task_id, new_name)
         if not success:
             abort(409, description='Task with this name already exists')
 
-    if 'interval_days' in data:
-        new_interval = data['interval_days']
-        if not isinstance(new_interval, int) or new_interval <= 0:
-            abort(400, description='interval_days must be positive integer')
-        db.update_task_interval(task_id, new_interval)
+    if new_interval is not None:
+        g.db.update_task_interval(g.household_id, task_id, new_interval)
 
-    updated_task = db.get_task_by_id(task_id)
+    updated_task = g.db.get_task_by_id(g.household_id, task_id)
+    if not updated_task:
+        # Задачу удалили параллельным запросом
+        abort(404, description='Task not found')
     return jsonify(task_to_dict(updated_task))
 
 @app.route('/tasks/<int:task_id>', methods=['DELETE'])
 @require_chat_id
 def delete_task(task_id, chat_id):
-    task = db.get_task_by_id(task_id)
+    task = g.db.get_task_by_id(g.household_id, task_id)
     if not task:
         abort(404, description='Task not found')
-    db.delete_task(task_id)
+    g.db.delete_task(g.household_id, task_id)
     return '', 204
 
 @app.route('/tasks/<int:task_id>/done', methods=['POST'])
 @require_chat_id
 def mark_task_done(task_id, chat_id):
-    task = db.get_task_by_id(task_id)
+    task = g.db.get_task_by_id(g.household_id, task_id)
     if not task:
         abort(404, description='Task not found')
 
-    db.mark_task_done(task_id, chat_id)
-    updated_task = db.get_task_by_id(task_id)
+    g.db.mark_task_done(g.household_id, task_id, chat_id)
+    updated_task = g.db.get_task_by_id(g.household_id, task_id)
+    if not updated_task:
+        abort(404, description='Task not found')
     return jsonify(task_to_dict(updated_task))
 
+# ========== Статистика ==========
+@app.route('/stats/tasks', methods=['GET'])
+@require_chat_id
+@etag_cached('tasks')
+def task_stats(chat_id):
+    """Выполнения, средние интервалы и серии по задачам и пользователям
+    за ?days=<N> последних дней (по умолчанию 30, days=all — за всё время)."""
+    try:
+        days = parse_stats_days(request.args.get('days'))
+    except ValueError as e:
+        abort(400, description=str(e))
+    now = datetime.now()
+    stats = g.db.get_task_stats(g.household_id, days, today=now.date())
+    # Окно и серии считаются от текущей даты: ETag действителен до полуночи
+    g.etag_valid_until = end_of_day(now)
+    return jsonify(stats)
+
 # ========== Эндпоинты для покупок ==========
 @app.route('/categories', methods=['GET'])
 @require_chat_id
+@etag_cached('shopping_items')
 def get_categories(chat_id):
     """Возвращает список всех уникальных категорий покупок."""
-    categories = db.get_unique_categories()
+    categories = g.db.get_unique_categories(g.household_id)
     return jsonify(categories)
 
 @app.route('/shopping', methods=['GET'])
 @require_chat_id
+@etag_cached('shopping_items')
 def get_shopping_items(chat_id):
-    show_checked = request.args.get('show_checked', 'true').lower() == 'true'
-    category = request.args.get('category')
-    if category == 'all':
-        category = None
-    items = db.get_shopping_items(show_checked=show_checked, category=category)
+    """Покупки: сначала неотмеченные, новые сверху. ?show_checked=false, ?category=<имя>;
+    страницами (?limit=&after_id=) или потоком (?stream=true)."""
+    show_checked, category = parse_shopping_filter(request.args.get('show_checked'), request.args.get('category'))
+    try:
+        limit, after_id, stream = parse_page_args()
+    except ValueError as e:
+        abort(400, description=str(e))
+    if stream:
+        pages = g.db.iter_shopping_items(g.household_id, STREAM_PAGE_SIZE, show_checked, category)
+        return stream_response(pages, shopping_item_to_dict)
+    if limit:
+        items = g.db.get_shopping_page(g.household_id, limit, after_id, show_checked, category)
+        if items is None:
+            abort(400, description='after_id not found')
+        return page_response(items, limit, shopping_item_to_dict)
+    items = g.db.get_shopping_items(g.household_id, show_checked=show_checked, category=category)
     return jsonify([shopping_item_to_dict(i) for i in items])
 
+MAX_SUGGESTIONS = getattr(config, 'MAX_SUGGESTIONS', 50)
+
+@app.route('/shopping/suggest', methods=['GET'])
+@require_chat_id
+@etag_cached('shopping_dictionary')
+def suggest_shopping_items(chat_id):
+    """Подсказки из истории покупок: ?q=<начало названия>&limit=&category=<имя>"""
+    try:
+        query, limit, category = parse_suggest(request.args.get('q'), request.args.get('limit'),
+                                               request.args.get('category'), MAX_SUGGESTIONS)
+    except ValueError as e:
+        abort(400, description=str(e))
+    suggestions = g.db.get_shopping_suggestions(g.household_id, query, limit, category)
+    return jsonify([shopping_suggestion_to_dict(s) for s in suggestions])
+
 @app.route('/shopping', methods=['POST'])
 @require_chat_id
 def create_shopping_item(chat_id):
     data = request.get_json()
     if not data:
         abort(400, description='Missing JSON body')
+    try:
+        item_text, category = parse_new_shopping_item(data)
+    except ValueError as e:
+        abort(400, description=str(e))
 
-    item_text = data.get('item_text')
-    if not item_text:
-        abort(400, description='item_text is required')
-    item_text = item_text.strip()
-    if not item_text:
-        abort(400, description='item_text cannot be empty')
-
-    category = data.get('category', 'supermarket')
-    if not isinstance(category, str) or not category.strip():
-        category = 'supermarket'
-    category = category.strip()
-
-    success = db.add_shopping_item(item_text, category)
-    if not success:
-        abort(409, description='Item already exists (unchecked)')
-
-    items = db.get_shopping_items(show_checked=True)
-    item = next((i for i in items if i.item_text.lower() == item_text.lower()), None)
+    item = g.db.add_shopping_item(g.household_id, item_text, category)
     if not item:
-        abort(500, description='Item created but not found')
+        abort(409, description='Item already exists (unchecked)')
     return jsonify(shopping_item_to_dict(item)), 201
 
 @app.route('/shopping/<int:item_id>/toggle', methods=['PATCH'])
 @require_chat_id
 def toggle_shopping_item(chat_id, item_id):
-    updated = db.toggle_shopping_item(item_id)
+    updated = g.db.toggle_shopping_item(g.household_id, item_id)
+    if updated is False:
+        abort(409, description='Item already exists (unchecked)')
     if not updated:
         return jsonify({'error': 'Item not found'}), 404
     return jsonify(shopping_item_to_dict(updated))
@@ -213,20 +396,98 @@ def toggle_shopping_item(chat_id, item_id):
 @app.route('/shopping/checked', methods=['DELETE'])
 @require_chat_id
 def delete_checked_items(chat_id):
-    count = db.delete_checked_items()
+    count = g.db.delete_checked_items(g.household_id)
     return jsonify({'deleted': count})
 
 @app.route('/shopping/all', methods=['DELETE'])
 @require_chat_id
 def delete_all_items(chat_id):
-    count = db.delete_all_shopping_items()
+    count = g.db.delete_all_shopping_items(g.household_id)
     return jsonify({'deleted': count})
 
 @app.route('/shopping/stats', methods=['GET'])
 @require_chat_id
+@etag_cached('shopping_items')
 def shopping_stats(chat_id):
-    stats = db.get_shopping_item_count()
+    stats = g.db.get_shopping_item_count(g.household_id)
     return jsonify(stats)
 
+# ========== Пакетные операции ==========
+BATCH_MAX_OPERATIONS = getattr(config, 'BATCH_MAX_OPERATIONS', 500)
+
+@app.route('/batch', methods=['POST'])
+@require_chat_id
+def batch(chat_id):
+    """Несколько операций за один запрос и одну транзакцию.
+
+    Тело: {"operations": [{"op": "add_shopping_item", "item_text": ..., "category": ...},
+    {"op": "toggle_shopping_item", "id": ...}, {"op": "add_task", "name": ..., "interval_days": ...},
+    {"op": "mark_task_done", "id": ...}]}. Ответ: результат для каждой операции в том же порядке.
+    """
+    data = request.get_json()
+    if not data:
+        abort(400, description='Missing JSON body')
+    try:
+        results, valid = parse_batch(data, BATCH_MAX_OPERATIONS)
+    except ValueError as e:
+        abort(400, description=str(e))
+
+    if valid:
+        applied = g.db.apply_batch(g.household_id, [operation for _, operation in valid], chat_id)
+        for (index, (name, _)), result in zip(valid, applied):
+            results[index] = batch_result(name, result)
+    return jsonify({'results': results})
+
+# ========== Синхронизация ==========
+@app.route('/sync', methods=['GET'])
+@require_chat_id
+def sync(chat_id):
+    """Изменения задач и покупок после ревизии ?since=<revision>."""
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        abort(400, description=str(e))
+    return jsonify(sync_to_dict(g.db.get_changes_since(g.household_id, since)))
+
+# ========== Поток событий (Server-Sent Events) ==========
+SSE_HEARTBEAT_SECONDS = getattr(config, 'SSE_HEARTBEAT_SECONDS', 15.0)
+SSE_QUEUE_SIZE = getattr(config, 'SSE_QUEUE_SIZE', 100)
+
+@app.route('/events', methods=['GET'])
+@require_chat_id
+def events(chat_id):
+    """Изменения задач и покупок домохозяйства в реальном времени (text/event-stream)."""
+    household_id = g.household_id
+    bus = g.db.events
+    subscription = bus.subscribe(maxsize=SSE_QUEUE_SIZE, scope=household_id)
+    # Клиент переподключился и мог пропустить события: пусть перечитает данные
+    last_event_id = request.headers.get('Last-Event-ID')
+    last_id = bus.last_event_id(household_id)
+    missed = bool(last_event_id) and last_event_id != str(last_id)
+
+    def stream():
+        try:
+            yield 'retry: 5000\n\n'
+            if missed:
+                yield f'id: {last_id}\nevent: resync\ndata: {{}}\n\n'
+            while True:
+                event = subscription.get(timeout=SSE_HEARTBEAT_SECONDS)
+                if event is None:
+                    # Комментарий держит соединение открытым через прокси
+                    yield ': heartbeat\n\n'
+                    continue
+                yield f'id: {event.id}\nevent: {event.type}\ndata: {app.json.dumps(event.data)}\n\n'
+        finally:
+            subscription.close()
+
+    response = Response(stream(), mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no',
+    })
+    # Поток переживает запрос: своя аренда базы домохозяйства до закрытия ответа
+    households.acquire(household_id)
+    response.call_on_close(lambda: households.release(household_id))
+    return response
+
 if __name__ == '__main__':
     app.run(host='0.0.0.0', port=8000, debug=True)
\ No newline at end of file
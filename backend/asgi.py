@@ -0,0 +1,577 @@
+# asgi.py
+"""ASGI-вариант API: те же маршруты и JSON, что у app.py, без Flask.
+
+Обращения к SQLite выполняются в ограниченном пуле потоков (AsyncDatabase),
+поэтому ожидающие соединения — в первую очередь /events — не занимают
+потоки, и один процесс держит много одновременно открытых клиентов.
+Проверка входных данных, сериализация и ETag общие с app.py.
+
+Запуск любым ASGI-сервером, например:
+    uvicorn asgi:app --host 0.0.0.0 --port 8000
+Ошибки отдаются как JSON {"error": "..."} с тем же кодом, что и в app.py.
+"""
+import asyncio
+import functools
+import json
+import logging
+import re
+from datetime import datetime
+from typing import AsyncIterator, Awaitable, Callable, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from async_database import AsyncDatabase
+from bootstrap import create_compressor, create_database, create_households, create_maintenance, create_reminders
+from etags import etag_base, matching_etag, make_etag, tasks_valid_until, dashboard_valid_until, end_of_day
+from json_provider import get_json_encoder
+from serializers import (
+    task_to_dict, shopping_item_to_dict, household_to_dict, dashboard_to_dict, sync_to_dict, batch_result,
+    json_array_chunks, next_page_link, shopping_suggestion_to_dict,
+)
+from validation import (
+    parse_login_name, parse_login_household, parse_new_task, parse_task_update, parse_new_shopping_item,
+    parse_due_filter, parse_shopping_filter, parse_page, parse_suggest, parse_stats_days, parse_since, parse_batch,
+)
+import config
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_OPERATIONS = getattr(config, 'BATCH_MAX_OPERATIONS', 500)
+SSE_HEARTBEAT_SECONDS = getattr(config, 'SSE_HEARTBEAT_SECONDS', 15.0)
+SSE_QUEUE_SIZE = getattr(config, 'SSE_QUEUE_SIZE', 100)
+MAX_PAGE_SIZE = getattr(config, 'MAX_PAGE_SIZE', 500)
+STREAM_PAGE_SIZE = getattr(config, 'STREAM_PAGE_SIZE', 200)
+MAX_SUGGESTIONS = getattr(config, 'MAX_SUGGESTIONS', 50)
+
+encode_json = get_json_encoder(getattr(config, 'JSON_PROVIDER', 'auto'))
+
+# Потоков для SQLite столько же, сколько соединений в пуле
+main_db = create_database(config)
+db = AsyncDatabase(main_db, max_workers=getattr(config, 'DB_POOL_SIZE', 8))
+# База с данными домохозяйства пользователя (request.db) выдаётся в authenticate
+households = create_households(main_db, config)
+maintenance = create_maintenance(main_db, config, households)
+reminders = create_reminders(households, config)
+compressor = create_compressor(config)
+
+
+# ================== ЗАПРОС И ОТВЕТ ==================
+class HTTPError(Exception):
+    def __init__(self, status: int, description: str):
+        super().__init__(description)
+        self.status = status
+        self.description = description
+
+
+class Request:
+    def __init__(self, scope: dict, body: bytes):
+        self.method: str = scope['method']
+        self.path: str = scope['path']
+        self.query_string: str = scope.get('query_string', b'').decode('latin-1')
+        # Как request.args.get во Flask: первое значение параметра
+        self.args: Dict[str, str] = {
+            key: values[0] for key, values in parse_qs(self.query_string, keep_blank_values=True).items()
+        }
+        self.headers: Dict[str, str] = {
+            key.decode('latin-1').lower(): value.decode('latin-1') for key, value in scope.get('headers', [])
+        }
+        self.body = body
+        self.chat_id: Optional[int] = None
+        self.household_id: Optional[int] = None
+        self.db: Optional[AsyncDatabase] = None
+        # Момент, до которого действителен ETag ответа (если ответ зависит от времени)
+        self.etag_valid_until: Optional[float] = None
+
+    @property
+    def full_path(self) -> str:
+        # В том же виде, что request.full_path во Flask: ETag совпадают с app.py
+        return f"{self.path}?{self.query_string}"
+
+    def json(self) -> dict:
+        """Тело запроса как JSON-объект; пустое или не объект — 400, как в app.py"""
+        if not self.body:
+            raise HTTPError(400, 'Missing JSON body')
+        try:
+            data = json.loads(self.body)
+        except ValueError:
+            raise HTTPError(400, 'Failed to decode JSON object')
+        if not data or not isinstance(data, dict):
+            raise HTTPError(400, 'Missing JSON body')
+        return data
+
+
+class Response:
+    def __init__(self, body: bytes = b'', status: int = 200, content_type: Optional[str] = None,
+                 headers: Optional[List[Tuple[str, str]]] = None):
+        self.body = body
+        self.status = status
+        self.headers = list(headers or [])
+        if content_type:
+            self.headers.append(('content-type', content_type))
+
+
+class StreamingResponse(Response):
+    def __init__(self, chunks: AsyncIterator[str], content_type: str, headers: List[Tuple[str, str]],
+                 on_close: Callable[[], None]):
+        super().__init__(status=200, content_type=content_type, headers=headers)
+        self.chunks = chunks
+        self.on_close = on_close
+
+
+def json_response(obj, status: int = 200) -> Response:
+    return Response(encode_json(obj), status, 'application/json')
+
+
+def bad_request(e: ValueError) -> HTTPError:
+    return HTTPError(400, str(e))
+
+
+def parse_page_args(request: 'Request') -> Tuple[Optional[int], Optional[int], bool]:
+    try:
+        return parse_page(request.args.get('limit'), request.args.get('after_id'),
+                          request.args.get('stream'), MAX_PAGE_SIZE)
+    except ValueError as e:
+        raise bad_request(e)
+
+
+def page_response(request: 'Request', page: Optional[list], limit: int, to_dict: Callable) -> Response:
+    if page is None:
+        raise HTTPError(400, 'after_id not found')
+    response = json_response([to_dict(obj) for obj in page])
+    link = next_page_link(request.path, request.args, page, limit)
+    if link:
+        response.headers.append(('link', link))
+    return response
+
+
+def stream_response(request: 'Request', pages, to_dict: Callable) -> StreamingResponse:
+    """JSON-массив по мере чтения страниц; чтение и сериализация страницы — в пуле потоков"""
+    chunks = json_array_chunks(pages, to_dict, lambda obj: encode_json(obj).decode())
+
+    async def stream() -> AsyncIterator[str]:
+        while True:
+            chunk = await request.db.run(next, chunks, None)
+            if chunk is None:
+                return
+            yield chunk
+
+    return StreamingResponse(stream(), 'application/json', [], on_close=chunks.close)
+
+
+# ================== МАРШРУТЫ ==================
+Handler = Callable[[Request], Awaitable[Response]]
+ROUTES: List[Tuple[str, re.Pattern, Handler, bool, Tuple[str, ...]]] = []
+
+
+def route(path: str, method: str, auth: bool = True, etag: Tuple[str, ...] = ()):
+    """Регистрация обработчика; <int:name> в пути передаётся как именованный аргумент.
+
+    auth — проверка X-Chat-ID (как require_chat_id), etag — таблицы для
+    условных запросов (как etag_cached).
+    """
+    pattern = re.compile('^' + re.sub(r'<int:(\w+)>', r'(?P<\1>[0-9]+)', path) + '$')
+
+    def decorator(handler: Handler) -> Handler:
+        ROUTES.append((method, pattern, handler, auth, etag))
+        return handler
+    return decorator
+
+
+async def authenticate(request: Request) -> int:
+    chat_id = request.headers.get('x-chat-id')
+    if not chat_id:
+        raise HTTPError(401, 'Missing X-Chat-ID header')
+    try:
+        chat_id = int(chat_id)
+    except ValueError:
+        raise HTTPError(400, 'X-Chat-ID must be integer')
+    household_id = await db.get_user_household(chat_id)
+    if household_id is None:
+        raise HTTPError(403, 'User not found')
+    # Все данные запроса — только из домохозяйства пользователя; аренда
+    # базы возвращается в app() после отправки ответа
+    household_db = await db.run(households.acquire, household_id)
+    request.household_id = household_id
+    request.db = db if household_db is main_db else db.bind(household_db)
+    return chat_id
+
+
+async def dispatch(request: Request) -> Response:
+    allowed = False
+    for method, pattern, handler, auth, tables in ROUTES:
+        match = pattern.match(request.path)
+        if not match:
+            continue
+        if method != request.method:
+            allowed = True
+            continue
+        if auth:
+            request.chat_id = await authenticate(request)
+        kwargs = {key: int(value) for key, value in match.groupdict().items()}
+        if not tables:
+            return await handler(request, **kwargs)
+
+        # Версию читаем до выборки, как в etag_cached
+        base = etag_base(request.db.versions.token(*tables, scope=request.household_id), request.full_path)
+        etag = matching_etag(request.headers.get('if-none-match'), base)
+        if etag is not None:
+            return Response(status=304, headers=[('etag', f'W/"{etag}"')])
+        response = await handler(request, **kwargs)
+        if response.status == 200:
+            response.headers.append(('etag', f'W/"{make_etag(base, request.etag_valid_until)}"'))
+        return response
+    raise HTTPError(405 if allowed else 404, 'Method not allowed' if allowed else 'Not found')
+
+
+# ================== ЗАДАЧИ ==================
+@route('/login', 'POST', auth=False)
+async def login(request: Request) -> Response:
+    data = request.json()
+    try:
+        name = parse_login_name(data)
+        household_id = parse_login_household(data)
+    except ValueError as e:
+        raise bad_request(e)
+    users = await db.get_users_by_name(name, household_id)
+    if not users:
+        raise HTTPError(404, 'User not found')
+    if len(users) > 1:
+        raise HTTPError(409, 'Several users with this name, specify household_id')
+    chat_id, household_id = users[0]
+    return json_response({'chat_id': chat_id, 'name': name, 'household_id': household_id})
+
+
+@route('/household', 'GET')
+async def get_household(request: Request) -> Response:
+    household = await db.get_household(request.household_id)
+    if not household:
+        raise HTTPError(404, 'Household not found')
+    members = await db.get_household_members(request.household_id)
+    return json_response(household_to_dict(household, members))
+
+
+@route('/dashboard', 'GET', etag=('tasks', 'shopping_items'))
+async def get_dashboard(request: Request) -> Response:
+    now = datetime.now()
+    dashboard = await request.db.get_dashboard(request.household_id, now)
+    request.etag_valid_until = dashboard_valid_until(dashboard, now)
+    return json_response(dashboard_to_dict(dashboard, now))
+
+
+@route('/tasks', 'GET', etag=('tasks',))
+async def get_tasks(request: Request) -> Response:
+    now = datetime.now()
+    try:
+        due_before, overdue = parse_due_filter(request.args.get('due_before'), request.args.get('overdue'), now)
+    except ValueError as e:
+        raise bad_request(e)
+    limit, after_id, stream = parse_page_args(request)
+    if due_before and (limit or stream):
+        raise HTTPError(400, 'limit, after_id and stream are not supported with due_before')
+    to_dict = functools.partial(task_to_dict, now=now)
+    if stream:
+        request.etag_valid_until = now.timestamp()
+        return stream_response(request, request.db.db.iter_tasks(request.household_id, STREAM_PAGE_SIZE), to_dict)
+    if limit:
+        tasks = await request.db.get_tasks_page(request.household_id, limit, after_id)
+        request.etag_valid_until = tasks_valid_until(tasks or [], now)
+        return page_response(request, tasks, limit, to_dict)
+    if due_before:
+        tasks = await request.db.get_due_tasks(request.household_id, due_before)
+    else:
+        tasks = await request.db.get_all_tasks(request.household_id)
+    request.etag_valid_until = tasks_valid_until(tasks, now, overdue)
+    return json_response([task_to_dict(t, now) for t in tasks])
+
+
+@route('/tasks', 'POST')
+async def create_task(request: Request) -> Response:
+    try:
+        name, interval_days = parse_new_task(request.json())
+    except ValueError as e:
+        raise bad_request(e)
+    task = await request.db.add_new_task(request.household_id, name, interval_days)
+    if not task:
+        raise HTTPError(409, 'Task with this name already exists')
+    return json_response(task_to_dict(task), 201)
+
+
+@route('/tasks/<int:task_id>', 'PATCH')
+async def update_task(request: Request, task_id: int) -> Response:
+    if not await request.db.get_task_by_id(request.household_id, task_id):
+        raise HTTPError(404, 'Task not found')
+    try:
+        new_name, new_interval = parse_task_update(request.json())
+    except ValueError as e:
+        raise bad_request(e)
+    if new_name is not None and not await request.db.rename_task(request.household_id, task_id, new_name):
+        raise HTTPError(409, 'Task with this name already exists')
+    if new_interval is not None:
+        await request.db.update_task_interval(request.household_id, task_id, new_interval)
+    updated_task = await request.db.get_task_by_id(request.household_id, task_id)
+    if not updated_task:
+        # Задачу удалили параллельным запросом
+        raise HTTPError(404, 'Task not found')
+    return json_response(task_to_dict(updated_task))
+
+
+@route('/tasks/<int:task_id>', 'DELETE')
+async def delete_task(request: Request, task_id: int) -> Response:
+    if not await request.db.get_task_by_id(request.household_id, task_id):
+        raise HTTPError(404, 'Task not found')
+    await request.db.delete_task(request.household_id, task_id)
+    return Response(status=204)
+
+
+@route('/tasks/<int:task_id>/done', 'POST')
+async def mark_task_done(request: Request, task_id: int) -> Response:
+    if not await request.db.get_task_by_id(request.household_id, task_id):
+        raise HTTPError(404, 'Task not found')
+    await request.db.mark_task_done(request.household_id, task_id, request.chat_id)
+    updated_task = await request.db.get_task_by_id(request.household_id, task_id)
+    if not updated_task:
+        raise HTTPError(404, 'Task not found')
+    return json_response(task_to_dict(updated_task))
+
+
+@route('/stats/tasks', 'GET', etag=('tasks',))
+async def task_stats(request: Request) -> Response:
+    try:
+        days = parse_stats_days(request.args.get('days'))
+    except ValueError as e:
+        raise bad_request(e)
+    now = datetime.now()
+    stats = await request.db.get_task_stats(request.household_id, days, today=now.date())
+    request.etag_valid_until = end_of_day(now)
+    return json_response(stats)
+
+
+# ================== ПОКУПКИ ==================
+@route('/categories', 'GET', etag=('shopping_items',))
+async def get_categories(request: Request) -> Response:
+    return json_response(await request.db.get_unique_categories(request.household_id))
+
+
+@route('/shopping', 'GET', etag=('shopping_items',))
+async def get_shopping_items(request: Request) -> Response:
+    show_checked, category = parse_shopping_filter(request.args.get('show_checked'), request.args.get('category'))
+    limit, after_id, stream = parse_page_args(request)
+    if stream:
+        pages = request.db.db.iter_shopping_items(request.household_id, STREAM_PAGE_SIZE, show_checked, category)
+        return stream_response(request, pages, shopping_item_to_dict)
+    if limit:
+        items = await request.db.get_shopping_page(request.household_id, limit, after_id, show_checked, category)
+        return page_response(request, items, limit, shopping_item_to_dict)
+    items = await request.db.get_shopping_items(request.household_id, show_checked=show_checked, category=category)
+    return json_response([shopping_item_to_dict(i) for i in items])
+
+
+@route('/shopping/suggest', 'GET', etag=('shopping_dictionary',))
+async def suggest_shopping_items(request: Request) -> Response:
+    try:
+        query, limit, category = parse_suggest(request.args.get('q'), request.args.get('limit'),
+                                               request.args.get('category'), MAX_SUGGESTIONS)
+    except ValueError as e:
+        raise bad_request(e)
+    suggestions = await request.db.get_shopping_suggestions(request.household_id, query, limit, category)
+    return json_response([shopping_suggestion_to_dict(s) for s in suggestions])
+
+
+@route('/shopping', 'POST')
+async def create_shopping_item(request: Request) -> Response:
+    try:
+        item_text, category = parse_new_shopping_item(request.json())
+    except ValueError as e:
+        raise bad_request(e)
+    item = await request.db.add_shopping_item(request.household_id, item_text, category)
+    if not item:
+        raise HTTPError(409, 'Item already exists (unchecked)')
+    return json_response(shopping_item_to_dict(item), 201)
+
+
+@route('/shopping/<int:item_id>/toggle', 'PATCH')
+async def toggle_shopping_item(request: Request, item_id: int) -> Response:
+    updated = await request.db.toggle_shopping_item(request.household_id, item_id)
+    if updated is False:
+        raise HTTPError(409, 'Item already exists (unchecked)')
+    if not updated:
+        raise HTTPError(404, 'Item not found')
+    return json_response(shopping_item_to_dict(updated))
+
+
+@route('/shopping/checked', 'DELETE')
+async def delete_checked_items(request: Request) -> Response:
+    return json_response({'deleted': await request.db.delete_checked_items(request.household_id)})
+
+
+@route('/shopping/all', 'DELETE')
+async def delete_all_items(request: Request) -> Response:
+    return json_response({'deleted': await request.db.delete_all_shopping_items(request.household_id)})
+
+
+@route('/shopping/stats', 'GET', etag=('shopping_items',))
+async def shopping_stats(request: Request) -> Response:
+    return json_response(await request.db.get_shopping_item_count(request.household_id))
+
+
+# ================== ПАКЕТЫ, СИНХРОНИЗАЦИЯ, СОБЫТИЯ ==================
+@route('/batch', 'POST')
+async def batch(request: Request) -> Response:
+    try:
+        results, valid = parse_batch(request.json(), BATCH_MAX_OPERATIONS)
+    except ValueError as e:
+        raise bad_request(e)
+    if valid:
+        applied = await request.db.apply_batch(request.household_id, [operation for _, operation in valid], request.chat_id)
+        for (index, (name, _)), result in zip(valid, applied):
+            results[index] = batch_result(name, result)
+    return json_response({'results': results})
+
+
+@route('/sync', 'GET')
+async def sync(request: Request) -> Response:
+    try:
+        since = parse_since(request.args.get('since'))
+    except ValueError as e:
+        raise bad_request(e)
+    return json_response(sync_to_dict(await request.db.get_changes_since(request.household_id, since)))
+
+
+@route('/events', 'GET')
+async def events(request: Request) -> Response:
+    """Server-Sent Events; ожидание события не занимает поток"""
+    bus = request.db.events
+    subscription = bus.subscribe(maxsize=SSE_QUEUE_SIZE, scope=request.household_id)
+    last_event_id = request.headers.get('last-event-id')
+    last_id = bus.last_event_id(request.household_id)
+    missed = bool(last_event_id) and last_event_id != str(last_id)
+
+    async def stream() -> AsyncIterator[str]:
+        yield 'retry: 5000\n\n'
+        if missed:
+            yield f'id: {last_id}\nevent: resync\ndata: {{}}\n\n'
+        while True:
+            event = await subscription.get_async(timeout=SSE_HEARTBEAT_SECONDS)
+            if event is None:
+                if subscription.closed:
+                    return
+                yield ': heartbeat\n\n'
+                continue
+            yield f'id: {event.id}\nevent: {event.type}\ndata: {encode_json(event.data).decode()}\n\n'
+
+    return StreamingResponse(stream(), 'text/event-stream', [
+        ('cache-control', 'no-cache'),
+        ('x-accel-buffering', 'no'),
+    ], on_close=subscription.close)
+
+
+# ================== ASGI ==================
+async def read_body(receive) -> bytes:
+    chunks = []
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            break
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body'):
+            break
+    return b''.join(chunks)
+
+
+async def send_response(send, receive, response: Response) -> None:
+    headers = [(key.encode('latin-1'), value.encode('latin-1')) for key, value in response.headers]
+    if not isinstance(response, StreamingResponse):
+        headers.append((b'content-length', str(len(response.body)).encode()))
+        await send({'type': 'http.response.start', 'status': response.status, 'headers': headers})
+        await send({'type': 'http.response.body', 'body': response.body})
+        return
+
+    await send({'type': 'http.response.start', 'status': response.status, 'headers': headers})
+    # Отключение клиента приходит через receive, а не через ошибку send
+    disconnected = asyncio.ensure_future(receive())
+    chunks = response.chunks.__aiter__()
+    next_chunk = None
+    try:
+        while True:
+            next_chunk = asyncio.ensure_future(chunks.__anext__())
+            done, _ = await asyncio.wait({next_chunk, disconnected}, return_when=asyncio.FIRST_COMPLETED)
+            if next_chunk not in done:
+                break
+            try:
+                chunk = next_chunk.result()
+            except StopAsyncIteration:
+                break
+            await send({'type': 'http.response.body', 'body': chunk.encode(), 'more_body': True})
+        if not disconnected.done():
+            await send({'type': 'http.response.body', 'body': b''})
+    except OSError:
+        pass  # соединение закрыто сервером
+    finally:
+        disconnected.cancel()
+        if next_chunk is not None and not next_chunk.done():
+            # Генератор ждёт события: отмена завершает его
+            next_chunk.cancel()
+            await asyncio.gather(next_chunk, return_exceptions=True)
+        response.on_close()
+        await chunks.aclose()
+
+
+async def compress_response(request: Request, response: Response) -> Response:
+    """Как compress_response в app.py; сжатие — в пуле потоков, а не в цикле событий"""
+    if compressor is None or response.status != 200 or isinstance(response, StreamingResponse):
+        return response
+    headers = dict(response.headers)
+    if 'content-encoding' in headers or not compressor.eligible(headers.get('content-type'), len(response.body)):
+        return response
+    response.headers.append(('vary', 'Accept-Encoding'))
+    encoding = compressor.negotiate(request.headers.get('accept-encoding'))
+    if encoding is None:
+        return response
+    body = await asyncio.get_running_loop().run_in_executor(
+        None, compressor.compress, response.body, encoding, headers.get('etag')
+    )
+    if body is not None:
+        response.body = body
+        response.headers.append(('content-encoding', encoding))
+    return response
+
+
+async def lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            maintenance.start()
+            if reminders is not None:
+                reminders.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            maintenance.stop()
+            if reminders is not None:
+                reminders.stop()
+            households.close()
+            db.close()
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    if scope['type'] == 'lifespan':
+        await lifespan(receive, send)
+        return
+    if scope['type'] != 'http':
+        return
+    request = Request(scope, await read_body(receive))
+    try:
+        response = await dispatch(request)
+    except HTTPError as e:
+        response = json_response({'error': e.description}, e.status)
+    except Exception:
+        logger.exception(f"Unhandled error in {request.method} {request.path}")
+        response = json_response({'error': 'Internal error'}, 500)
+    try:
+        response = await compress_response(request, response)
+        await send_response(send, receive, response)
+    finally:
+        # Поток /events отправляется здесь же, поэтому аренда держится до его конца
+        if request.household_id is not None:
+            households.release(request.household_id)
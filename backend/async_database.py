@@ -0,0 +1,55 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from database import Database
+
+
+class AsyncDatabase:
+    """Асинхронный фасад над Database для ASGI-приложения.
+
+    Каждый вызов метода Database выполняется в ограниченном пуле потоков и
+    возвращает корутину: цикл событий не блокируется SQLite, а число
+    одновременных обращений к базе не превышает max_workers (по умолчанию —
+    размер пула соединений). Атрибуты, не являющиеся методами (versions,
+    events), отдаются как есть.
+    """
+
+    def __init__(self, db: Database, max_workers: int = 8):
+        self.db = db
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='db-async')
+
+    def bind(self, db: Database) -> 'AsyncDatabase':
+        """Фасад другой базы (домохозяйства) с тем же пулом потоков"""
+        facade = AsyncDatabase.__new__(AsyncDatabase)
+        facade.db = db
+        facade._executor = self._executor
+        return facade
+
+    def _call(self, method: Callable, *args, **kwargs) -> Any:
+        try:
+            return method(*args, **kwargs)
+        finally:
+            # Поток пула может следующим вызовом обслуживать другой запрос
+            self.db.release_connection()
+
+    async def run(self, method: Callable, *args, **kwargs) -> Any:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor, functools.partial(self._call, method, *args, **kwargs)
+        )
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self.db, name)
+        if not callable(attr):
+            return attr
+
+        @functools.wraps(attr)
+        async def method(*args, **kwargs):
+            return await self.run(attr, *args, **kwargs)
+        return method
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        self.db.close()
@@ -0,0 +1 @@
+"""Бенчмарки бэкенда. Запуск из каталога backend: python -m bench.<модуль>"""
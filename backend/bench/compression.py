@@ -0,0 +1,69 @@
+"""Микробенчмарк сжатия ответов: сколько байт экономит каждая кодировка и уровень
+и сколько CPU это стоит на типичных телах /tasks и /shopping.
+
+br и zstd измеряются, если установлены brotli и zstandard.
+
+    python -m bench.compression --rows 10 100 1000 --repeat 20
+"""
+import argparse
+import time
+from datetime import datetime
+
+from compress import Compressor, available_encodings
+from database import Database
+from json_provider import get_json_encoder
+from serializers import task_to_dict, shopping_item_to_dict
+
+from bench.serialization import ITEMS_QUERY, TASKS_QUERY, best_time, make_connection
+
+LEVELS = {'gzip': (1, 6, 9), 'br': (1, 4, 11), 'zstd': (1, 3, 10)}
+
+
+def payloads(rows: int) -> dict:
+    """Тела ответов GET /tasks и GET /shopping на rows строк"""
+    conn = make_connection(rows)
+    encode = get_json_encoder()
+    now = datetime.now()
+    tasks = Database._fetch_all(conn.execute(TASKS_QUERY), Database._task_from_row)
+    items = Database._fetch_all(conn.execute(ITEMS_QUERY), Database._shopping_item_from_row)
+    return {
+        f'/tasks x{rows}': encode([task_to_dict(t, now) for t in tasks]),
+        f'/shopping x{rows}': encode([shopping_item_to_dict(i) for i in items]),
+    }
+
+
+def run(rows_list, repeat: int) -> None:
+    encodings = available_encodings()
+    missing = [name for name in LEVELS if name not in encodings]
+    if missing:
+        print(f"not installed, skipping: {', '.join(missing)}")
+
+    for rows in rows_list:
+        for name, body in payloads(rows).items():
+            print(f"{name}: {len(body)} bytes, best of {repeat}")
+            for encoding in encodings:
+                for level in LEVELS[encoding]:
+                    compressor = Compressor(min_size=0, levels={encoding: level}, encodings=[encoding])
+                    compressed = compressor.compress(body, encoding)
+                    size = len(compressed) if compressed is not None else len(body)
+                    seconds = best_time(lambda: compressor.compress(body, encoding), repeat)
+                    print(f"  {encoding:<4} level {level:<2} {size:9d} bytes  saved {1 - size / len(body):6.1%}"
+                          f"  {seconds * 1000:8.3f} ms  {len(body) / seconds / 2 ** 20:8.1f} MiB/s")
+
+            # Повторный ответ с тем же ETag берётся из кэша сжатых тел
+            compressor = Compressor(min_size=0)
+            compressor.compress(body, 'gzip', etag='W/"bench"')
+            seconds = best_time(lambda: compressor.compress(body, 'gzip', etag='W/"bench"'), repeat)
+            print(f"  gzip cached (same ETag)                  {seconds * 1000:8.3f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, nargs='+', default=[10, 100, 1000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,368 @@
+"""Нагрузочный бенчмарк API: задержки p50/p95/p99 и пропускная способность.
+
+Создаёт временную базу, заполняет её (пользователи, задачи, история,
+покупки), затем гоняет каждый сценарий несколькими потоками через
+Flask test client или через настоящий локальный HTTP-сервер. Результат —
+JSON, который можно сохранить и сравнить с предыдущим прогоном:
+
+    python -m bench.load --mode both --concurrency 8 --requests 2000 --output new.json
+    python -m bench.load --compare old.json new.json
+
+Приложение импортируется с собственным модулем config (DATABASE_PATH во
+временном каталоге), поэтому рабочая база не затрагивается. Остальные
+настройки задаются через --set KEY=VALUE (значение — литерал Python).
+"""
+import argparse
+import ast
+import http.client
+import json
+import logging
+import math
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+import types
+from datetime import datetime, timedelta
+from typing import Callable, Dict, List, Optional
+
+SCENARIOS = (
+    'GET /tasks',
+    'GET /stats/tasks',
+    'GET /shopping',
+    'GET /shopping?category',
+    'GET /shopping/stats',
+    'GET /categories',
+    'POST /tasks/<id>/done',
+    'PATCH /shopping/<id>/toggle',
+)
+
+CATEGORIES = ('supermarket', 'pharmacy', 'market', 'hardware', 'bakery')
+
+
+# ================== ПОДГОТОВКА ==================
+def load_app(db_path: str, settings: Dict[str, object]):
+    """Импортировать app.py с временным config"""
+    if 'app' in sys.modules:
+        raise RuntimeError('app is already imported in this process')
+    config = types.ModuleType('config')
+    config.DATABASE_PATH = db_path
+    # Фоновое обслуживание не должно попадать в замеры
+    config.MAINTENANCE_INTERVAL_SECONDS = 24 * 3600.0
+    for key, value in settings.items():
+        setattr(config, key, value)
+    sys.modules['config'] = config
+    import app
+    return app
+
+
+def seed(db, users: int, tasks: int, history: int, items: int, rng: random.Random) -> Dict[str, List[int]]:
+    """Заполнить базу; возвращает id пользователей, задач и покупок для сценариев"""
+    now = datetime.now()
+
+    def write(conn):
+        cursor = conn.cursor()
+        cursor.executemany(
+            "INSERT OR IGNORE INTO users (chat_id, username) VALUES (?, ?)",
+            [(1000 + i, f"bench_user_{i}") for i in range(users)]
+        )
+        cursor.executemany(
+            "INSERT INTO tasks (name, interval_days) VALUES (?, ?)",
+            [(f"bench_task_{i}", rng.randint(1, 30)) for i in range(tasks)]
+        )
+        cursor.execute("SELECT id, interval_days FROM tasks")
+        task_rows = cursor.fetchall()
+        user_ids = [1000 + i for i in range(users)]
+
+        # История по возрастанию времени, как её записывает mark_task_done
+        done_at = sorted(now - timedelta(seconds=rng.randint(0, 365 * 24 * 3600)) for _ in range(history))
+        last_done = {}
+        rows = []
+        for moment in done_at:
+            task_id, _ = rng.choice(task_rows)
+            user_id = rng.choice(user_ids)
+            rows.append((task_id, user_id, moment.isoformat()))
+            last_done[task_id] = (moment, user_id)
+        cursor.executemany("INSERT INTO task_history (task_id, done_by, done_at) VALUES (?, ?, ?)", rows)
+        intervals = dict(task_rows)
+        cursor.executemany(
+            "UPDATE tasks SET last_done = ?, last_done_by = ?, next_due = ? WHERE id = ?",
+            [(moment.isoformat(), user_id, (moment + timedelta(days=intervals[task_id])).isoformat(), task_id)
+             for task_id, (moment, user_id) in last_done.items()]
+        )
+
+        cursor.executemany(
+            "INSERT INTO shopping_items (item_text, is_checked, category) VALUES (?, ?, ?)",
+            [(f"bench_item_{i}", int(rng.random() < 0.3), rng.choice(CATEGORIES)) for i in range(items)]
+        )
+        cursor.execute("SELECT id FROM shopping_items")
+        item_ids = [row[0] for row in cursor.fetchall()]
+        return {'users': user_ids, 'tasks': [row[0] for row in task_rows], 'items': item_ids}
+
+    ids = db._write(write, 'tasks', 'shopping_items')
+    db.invalidate_user()
+    db.optimize()
+    return ids
+
+
+def make_requests(ids: Dict[str, List[int]], rng: random.Random) -> Dict[str, Callable[[], tuple]]:
+    """Для каждого сценария — функция, возвращающая (метод, путь) очередного запроса"""
+    def pick(key):
+        values = ids[key]
+        return values[rng.randrange(len(values))]
+
+    return {
+        'GET /tasks': lambda: ('GET', '/tasks'),
+        'GET /stats/tasks': lambda: ('GET', '/stats/tasks?days=30'),
+        'GET /shopping': lambda: ('GET', '/shopping'),
+        'GET /shopping?category': lambda: ('GET', f'/shopping?category={rng.choice(CATEGORIES)}'),
+        'GET /shopping/stats': lambda: ('GET', '/shopping/stats'),
+        'GET /categories': lambda: ('GET', '/categories'),
+        'POST /tasks/<id>/done': lambda: ('POST', f"/tasks/{pick('tasks')}/done"),
+        'PATCH /shopping/<id>/toggle': lambda: ('PATCH', f"/shopping/{pick('items')}/toggle"),
+    }
+
+
+# ================== КЛИЕНТЫ ==================
+class TestClientTransport:
+    """Запросы через Flask test client (без сети и HTTP-парсинга)"""
+
+    name = 'client'
+
+    def __init__(self, flask_app):
+        self.app = flask_app
+
+    def session(self):
+        client = self.app.test_client()
+
+        def send(method: str, path: str, headers: dict) -> int:
+            response = client.open(path, method=method, headers=headers)
+            response.get_data()
+            return response.status_code
+        return send, lambda: None
+
+    def close(self):
+        pass
+
+
+class ServerTransport:
+    """Запросы к настоящему HTTP-серверу (werkzeug, поток на запрос) на локальном порту"""
+
+    name = 'server'
+
+    def __init__(self, flask_app):
+        from werkzeug.serving import make_server
+        # Журнал каждого запроса в stderr искажает замеры
+        logging.getLogger('werkzeug').setLevel(logging.WARNING)
+        self.server = make_server('127.0.0.1', 0, flask_app, threaded=True)
+        self.port = self.server.server_port
+        self.thread = threading.Thread(target=self.server.serve_forever, name='bench-server', daemon=True)
+        self.thread.start()
+
+    def session(self):
+        conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+
+        def send(method: str, path: str, headers: dict) -> int:
+            nonlocal conn
+            try:
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            except (http.client.HTTPException, OSError):
+                # Сервер закрыл соединение (HTTP/1.0): переподключаемся
+                conn.close()
+                conn = http.client.HTTPConnection('127.0.0.1', self.port, timeout=30)
+                conn.request(method, path, headers=headers)
+                response = conn.getresponse()
+                response.read()
+            if response.will_close:
+                conn.close()
+            return response.status
+        return send, lambda: conn.close()
+
+    def close(self):
+        self.server.shutdown()
+        self.thread.join()
+
+
+# ================== ЗАМЕРЫ ==================
+def percentile(sorted_values: List[float], p: float) -> float:
+    """Перцентиль методом ближайшего ранга"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def run_scenario(transport, next_request: Callable[[], tuple], users: List[int],
+                 concurrency: int, total: int, warmup: int) -> dict:
+    latencies: List[List[float]] = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+    per_worker = [total // concurrency + (1 if i < total % concurrency else 0) for i in range(concurrency)]
+    barrier = threading.Barrier(concurrency + 1)
+    lock = threading.Lock()
+
+    def worker(index: int):
+        send, close = transport.session()
+        headers = {'X-Chat-ID': str(users[index % len(users)])}
+        try:
+            for _ in range(warmup):
+                with lock:
+                    method, path = next_request()
+                send(method, path, headers)
+            barrier.wait()
+            for _ in range(per_worker[index]):
+                with lock:
+                    method, path = next_request()
+                start = time.perf_counter()
+                status = send(method, path, headers)
+                latencies[index].append(time.perf_counter() - start)
+                if status >= 400:
+                    errors[index] += 1
+        finally:
+            close()
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    values = sorted(v for worker_values in latencies for v in worker_values)
+    ms = lambda seconds: round(seconds * 1000, 3)
+    return {
+        'requests': len(values),
+        'errors': sum(errors),
+        'throughput_rps': round(len(values) / elapsed, 1) if elapsed else 0.0,
+        'p50_ms': ms(percentile(values, 50)),
+        'p95_ms': ms(percentile(values, 95)),
+        'p99_ms': ms(percentile(values, 99)),
+        'max_ms': ms(values[-1]) if values else 0.0,
+        'mean_ms': ms(sum(values) / len(values)) if values else 0.0,
+    }
+
+
+def run(args) -> dict:
+    settings = dict(parse_setting(item) for item in args.set)
+    tmpdir = tempfile.mkdtemp(prefix='household-bench-')
+    app_module = load_app(os.path.join(tmpdir, 'bench.db'), settings)
+    rng = random.Random(args.seed)
+    ids = seed(app_module.db, args.users, args.tasks, args.history, args.items, rng)
+    next_requests = make_requests(ids, rng)
+    scenarios = args.scenario or list(SCENARIOS)
+
+    report = {
+        'meta': {
+            'started_at': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(),
+            'sqlite': sqlite3.sqlite_version,
+            'platform': platform.platform(),
+            'json_provider': type(app_module.app.json).__name__,
+            'seed': args.seed,
+            'users': args.users,
+            'tasks': args.tasks,
+            'history': args.history,
+            'items': args.items,
+            'concurrency': args.concurrency,
+            'requests': args.requests,
+            'warmup': args.warmup,
+            'settings': {key: repr(value) for key, value in settings.items()},
+        },
+        'results': {},
+    }
+    modes = ('client', 'server') if args.mode == 'both' else (args.mode,)
+    try:
+        for mode in modes:
+            transport = (TestClientTransport if mode == 'client' else ServerTransport)(app_module.app)
+            try:
+                report['results'][mode] = {}
+                for name in scenarios:
+                    result = run_scenario(transport, next_requests[name], ids['users'],
+                                          args.concurrency, args.requests, args.warmup)
+                    report['results'][mode][name] = result
+                    print(f"[{mode}] {name:<30} p50 {result['p50_ms']:8.2f} ms  p95 {result['p95_ms']:8.2f} ms  "
+                          f"p99 {result['p99_ms']:8.2f} ms  {result['throughput_rps']:9.1f} rps"
+                          + (f"  errors {result['errors']}" if result['errors'] else ''),
+                          file=sys.stderr)
+            finally:
+                transport.close()
+    finally:
+        app_module.maintenance.stop()
+        app_module.db.close()
+        shutil.rmtree(tmpdir, ignore_errors=True)
+    return report
+
+
+# ================== СРАВНЕНИЕ ==================
+def compare(old: dict, new: dict, threshold: float) -> int:
+    """Напечатать изменения p50/p95/p99 и rps; 1, если где-то p95 вырос больше threshold"""
+    regressions = 0
+    for mode, scenarios in new['results'].items():
+        for name, result in scenarios.items():
+            before = old.get('results', {}).get(mode, {}).get(name)
+            if not before:
+                continue
+            cells = []
+            for key in ('p50_ms', 'p95_ms', 'p99_ms', 'throughput_rps'):
+                change = (result[key] / before[key] - 1) * 100 if before[key] else 0.0
+                cells.append(f"{key} {before[key]:.2f} -> {result[key]:.2f} ({change:+.0f}%)")
+            regressed = before['p95_ms'] and result['p95_ms'] > before['p95_ms'] * (1 + threshold)
+            regressions += bool(regressed)
+            print(f"{'!' if regressed else ' '} [{mode}] {name:<30} " + '  '.join(cells))
+    return 1 if regressions else 0
+
+
+def parse_setting(item: str) -> tuple:
+    key, _, value = item.partition('=')
+    try:
+        return key, ast.literal_eval(value)
+    except (ValueError, SyntaxError):
+        return key, value
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--mode', choices=('client', 'server', 'both'), default='both')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--requests', type=int, default=1000, help='запросов на сценарий')
+    parser.add_argument('--warmup', type=int, default=10, help='прогревочных запросов на поток')
+    parser.add_argument('--users', type=int, default=5)
+    parser.add_argument('--tasks', type=int, default=200)
+    parser.add_argument('--history', type=int, default=20000)
+    parser.add_argument('--items', type=int, default=500)
+    parser.add_argument('--seed', type=int, default=42)
+    parser.add_argument('--scenario', action='append', choices=SCENARIOS,
+                        help='только указанные сценарии (можно несколько раз)')
+    parser.add_argument('--set', action='append', default=[], metavar='KEY=VALUE',
+                        help='настройка config, например --set DB_POOL_SIZE=16')
+    parser.add_argument('--output', help='файл для JSON-отчёта (по умолчанию stdout)')
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'),
+                        help='сравнить два отчёта вместо запуска')
+    parser.add_argument('--threshold', type=float, default=0.10,
+                        help='допустимый рост p95 при --compare (0.10 = 10%%)')
+    args = parser.parse_args(argv)
+
+    if args.compare:
+        with open(args.compare[0]) as old, open(args.compare[1]) as new:
+            return compare(json.load(old), json.load(new), args.threshold)
+
+    report = run(args)
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
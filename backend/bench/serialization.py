@@ -0,0 +1,195 @@
+"""Микробенчмарк: построение моделей из строк SQLite и сериализация списков в JSON.
+
+Сравнивает прежний путь (обычные dataclass, поиндексный разбор строки,
+стандартный json) с текущим (frozen/slots модели, row_factory, orjson).
+
+    python -m bench.serialization --rows 10000 --repeat 5
+"""
+import argparse
+import sqlite3
+import time
+import tracemalloc
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Optional
+
+from flask import Flask
+from flask.json.provider import DefaultJSONProvider
+
+from database import Database
+from json_provider import OrjsonProvider, orjson
+from serializers import task_to_dict, shopping_item_to_dict
+
+
+# ================== ПРЕЖНИЕ МОДЕЛИ ==================
+@dataclass
+class LegacyTask:
+    id: int
+    name: str
+    interval_days: int
+    last_done: Optional[datetime] = None
+    last_done_by: Optional[int] = None
+    next_due: Optional[datetime] = None
+
+    def days_since_done(self, now=None):
+        if not self.last_done:
+            return None
+        return ((now or datetime.now()) - self.last_done).days
+
+    def is_overdue(self, now=None):
+        if not self.last_done:
+            return True
+        return (now or datetime.now()) >= self.next_due
+
+    def days_until_due(self, now=None):
+        if not self.last_done:
+            return self.interval_days
+        return max(0, self.interval_days - (self.days_since_done(now) or 0))
+
+
+@dataclass
+class LegacyShoppingItem:
+    id: int
+    item_text: str
+    is_checked: bool
+    category: str
+
+
+def legacy_task_from_row(row) -> LegacyTask:
+    return LegacyTask(
+        id=row[0],
+        name=row[1],
+        interval_days=row[2],
+        last_done=datetime.fromisoformat(row[3]) if row[3] else None,
+        last_done_by=row[4],
+        next_due=datetime.fromisoformat(row[5]) if row[5] else None
+    )
+
+
+def legacy_shopping_item_from_row(row) -> LegacyShoppingItem:
+    return LegacyShoppingItem(
+        id=row[0],
+        item_text=row[1],
+        is_checked=bool(row[2]),
+        category=row[3]
+    )
+
+
+# ================== ДАННЫЕ ==================
+TASKS_QUERY = "SELECT id, name, interval_days, last_done, last_done_by, next_due FROM tasks"
+ITEMS_QUERY = "SELECT id, item_text, is_checked, category FROM shopping_items"
+
+
+def make_connection(rows: int) -> sqlite3.Connection:
+    conn = sqlite3.connect(':memory:')
+    conn.execute('''
+        CREATE TABLE tasks (id INTEGER PRIMARY KEY, name TEXT, interval_days INTEGER,
+                            last_done TIMESTAMP, last_done_by INTEGER, next_due TIMESTAMP)
+    ''')
+    conn.execute('''
+        CREATE TABLE shopping_items (id INTEGER PRIMARY KEY, item_text TEXT,
+                                     is_checked INTEGER, category TEXT)
+    ''')
+    now = datetime.now()
+    tasks = []
+    for i in range(rows):
+        interval = i % 14 + 1
+        last_done = now - timedelta(days=i % 20, minutes=i) if i % 5 else None
+        tasks.append((f"Задача {i}", interval,
+                      last_done.isoformat() if last_done else None,
+                      i % 3 + 1 if last_done else None,
+                      (last_done + timedelta(days=interval)).isoformat() if last_done else None))
+    conn.executemany(
+        "INSERT INTO tasks (name, interval_days, last_done, last_done_by, next_due) VALUES (?, ?, ?, ?, ?)",
+        tasks
+    )
+    conn.executemany(
+        "INSERT INTO shopping_items (item_text, is_checked, category) VALUES (?, ?, ?)",
+        [(f"Покупка {i}", i % 3 == 0, ('supermarket', 'pharmacy', 'market')[i % 3]) for i in range(rows)]
+    )
+    return conn
+
+
+# ================== ИЗМЕРЕНИЯ ==================
+def best_time(func, repeat: int) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func) -> int:
+    tracemalloc.start()
+    try:
+        result = func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+        del result
+
+
+def run(rows: int, repeat: int) -> None:
+    conn = make_connection(rows)
+    app = Flask(__name__)
+    stdlib_json = DefaultJSONProvider(app)
+    fast_json = OrjsonProvider(app) if orjson is not None else None
+    now = datetime.now()
+
+    def legacy_load():
+        return ([legacy_task_from_row(r) for r in conn.execute(TASKS_QUERY).fetchall()],
+                [legacy_shopping_item_from_row(r) for r in conn.execute(ITEMS_QUERY).fetchall()])
+
+    def current_load():
+        return (Database._fetch_all(conn.execute(TASKS_QUERY), Database._task_from_row),
+                Database._fetch_all(conn.execute(ITEMS_QUERY), Database._shopping_item_from_row))
+
+    def to_dicts(tasks, items):
+        return [task_to_dict(t, now) for t in tasks], [shopping_item_to_dict(i) for i in items]
+
+    def encode(provider, payload):
+        def body():
+            with app.app_context():
+                for part in payload:
+                    provider.response(part).get_data()
+        return body
+
+    def end_to_end(load, provider):
+        return encode(provider, to_dicts(*load()))
+
+    payload = to_dicts(*current_load())
+    results = [
+        ('load rows (legacy)', best_time(legacy_load, repeat), peak_memory(legacy_load)),
+        ('load rows (slots + row_factory)', best_time(current_load, repeat), peak_memory(current_load)),
+        ('encode (stdlib json)', best_time(encode(stdlib_json, payload), repeat), None),
+    ]
+    if fast_json is not None:
+        results += [
+            ('encode (orjson)', best_time(encode(fast_json, payload), repeat), None),
+            ('end-to-end (legacy, stdlib json)',
+             best_time(lambda: end_to_end(legacy_load, stdlib_json)(), repeat), None),
+            ('end-to-end (current, orjson)',
+             best_time(lambda: end_to_end(current_load, fast_json)(), repeat), None),
+        ]
+    else:
+        print("orjson is not installed: skipping the orjson cases")
+
+    print(f"{rows} tasks + {rows} shopping items, best of {repeat}")
+    for name, seconds, memory in results:
+        line = f"  {name:<36} {seconds * 1000:9.2f} ms"
+        if memory is not None:
+            line += f"   peak {memory / 1024:9.1f} KiB"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+    run(args.rows, args.repeat)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Создание базы и фонового обслуживания из модуля config (общее для app.py и asgi.py)"""
+from typing import Optional
+
+from compress import Compressor
+from database import Database
+from households import Households
+from maintenance import MaintenanceScheduler
+from query_hook import QueryHook
+from reminders import EventSink, LogSink, ReminderEngine, WebhookSink
+from versions import SHARED_VERSIONS_SUPPORTED
+
+
+def create_database(config, query_hook: Optional[QueryHook] = None, path: Optional[str] = None,
+                    seed_defaults: bool = True) -> Database:
+    """Основная база (path не задан) или база отдельного домохозяйства"""
+    path = path or config.DATABASE_PATH
+    # Версии таблиц для ETag в файле рядом с базой: при нескольких процессах
+    # (gunicorn) запись в одном воркере сбрасывает ETag во всех
+    shared_versions = getattr(config, 'DB_SHARED_VERSIONS', SHARED_VERSIONS_SUPPORTED)
+    return Database(
+        path,
+        pool_size=getattr(config, 'DB_POOL_SIZE', 8),
+        pool_timeout=getattr(config, 'DB_POOL_TIMEOUT', 30.0),
+        health_check_interval=getattr(config, 'DB_HEALTH_CHECK_INTERVAL', 60.0),
+        storage_profile=getattr(config, 'DB_STORAGE_PROFILE', 'default'),
+        write_batch_size=getattr(config, 'DB_WRITE_BATCH_SIZE', 64),
+        user_cache_size=getattr(config, 'USER_CACHE_SIZE', 10000),
+        user_cache_ttl=getattr(config, 'USER_CACHE_TTL', 300.0),
+        query_cache_size=getattr(config, 'QUERY_CACHE_SIZE', 1024),
+        query_cache_ttl=getattr(config, 'QUERY_CACHE_TTL', 60.0),
+        version_slots=getattr(config, 'DB_VERSION_SLOTS', 1024),
+        suggestion_cache_size=getattr(config, 'SUGGESTION_CACHE_SIZE', 256),
+        suggestion_cache_ttl=getattr(config, 'SUGGESTION_CACHE_TTL', 3600.0),
+        events_poll_interval=getattr(config, 'SSE_VERSIONS_POLL_SECONDS', 1.0),
+        query_hook=query_hook,
+        versions_path=f"{path}-versions" if shared_versions else None,
+        seed_defaults=seed_defaults,
+    )
+
+
+def create_households(db: Database, config, query_hook: Optional[QueryHook] = None) -> Households:
+    # HOUSEHOLD_DATA_DIR — каталог для файлов домохозяйств; без него все в основной базе
+    return Households(
+        db,
+        data_dir=getattr(config, 'HOUSEHOLD_DATA_DIR', None),
+        max_open=getattr(config, 'HOUSEHOLD_MAX_OPEN_DATABASES', 64),
+        open_database=lambda path: create_database(config, query_hook, path=path, seed_defaults=False),
+    )
+
+
+def create_compressor(config) -> Optional[Compressor]:
+    """Сжатие ответов по Accept-Encoding; COMPRESSION_ENABLED = False — выключено"""
+    if not getattr(config, 'COMPRESSION_ENABLED', True):
+        return None
+    return Compressor(
+        min_size=getattr(config, 'COMPRESSION_MIN_SIZE', 1024),
+        # Например {'gzip': 9, 'br': 5}; по умолчанию compress.DEFAULT_LEVELS
+        levels=getattr(config, 'COMPRESSION_LEVELS', None),
+        encodings=getattr(config, 'COMPRESSION_ENCODINGS', None),
+        cache_size=getattr(config, 'COMPRESSION_CACHE_SIZE', 512),
+        cache_ttl=getattr(config, 'COMPRESSION_CACHE_TTL', 300.0),
+    )
+
+
+def create_maintenance(db: Database, config, households: Optional[Households] = None) -> MaintenanceScheduler:
+    # Очистка истории, optimize, vacuum и checkpoint — в фоне, а не в запросах
+    return MaintenanceScheduler(
+        db,
+        interval=getattr(config, 'MAINTENANCE_INTERVAL_SECONDS', 3600.0),
+        history_days_to_keep=getattr(config, 'HISTORY_DAYS_TO_KEEP', 90),
+        change_log_days_to_keep=getattr(config, 'CHANGE_LOG_DAYS_TO_KEEP', 30),
+        # Один процесс из нескольких воркеров
+        lock_path=f"{config.DATABASE_PATH}-maintenance.lock",
+        # С файлами домохозяйств обслуживаются и открытые из них
+        databases=households.databases if households is not None and households.per_file else None,
+    )
+
+
+def create_reminders(households: Households, config) -> Optional[ReminderEngine]:
+    """Напоминания о просроченных задачах; REMINDERS_ENABLED = False — выключены"""
+    if not getattr(config, 'REMINDERS_ENABLED', True):
+        return None
+    sinks = [LogSink(), EventSink(households)]
+    webhook_url = getattr(config, 'REMINDER_WEBHOOK_URL', None)
+    if webhook_url:
+        sinks.append(WebhookSink(webhook_url, timeout=getattr(config, 'REMINDER_WEBHOOK_TIMEOUT', 5.0)))
+    # Повтор, пока задачу не выполнят; None — напоминать один раз
+    repeat_hours = getattr(config, 'REMINDER_REPEAT_HOURS', None)
+    return ReminderEngine(
+        households,
+        sinks,
+        repeat=repeat_hours * 3600 if repeat_hours else None,
+        poll_interval=getattr(config, 'REMINDER_POLL_SECONDS', 60.0),
+        lock_path=f"{config.DATABASE_PATH}-reminders.lock",
+    )
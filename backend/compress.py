@@ -0,0 +1,111 @@
+"""Сжатие ответов API по Accept-Encoding (общее для app.py и asgi.py).
+
+gzip есть всегда, br и zstd — если установлены brotli и zstandard.
+Тела меньше min_size не сжимаются: заголовки и CPU там дороже выигрыша.
+Сжатое тело ответа с ETag кэшируется по (хэш тела, кодировка), поэтому
+одинаковые ответы разным клиентам не сжимаются заново. Сам ETag ключом не
+служит: URL входит в него только через crc32, и ответы двух URL с
+совпавшим crc32 получили бы чужое тело.
+"""
+import gzip
+import hashlib
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # необязательная зависимость
+    brotli = None
+
+try:
+    import zstandard
+except ImportError:  # необязательная зависимость
+    zstandard = None
+
+# Уровни по умолчанию — быстрые: ответы сжимаются на каждый промах кэша.
+# Порядок — предпочтение сервера, если клиент принимает несколько кодировок с одинаковым q
+DEFAULT_LEVELS = {'br': 4, 'zstd': 3, 'gzip': 6}
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return tuple(name for name in DEFAULT_LEVELS
+                 if name == 'gzip' or (name == 'br' and brotli) or (name == 'zstd' and zstandard))
+
+
+def _codec(name: str, level: int) -> Callable[[bytes], bytes]:
+    if name == 'gzip':
+        # mtime=0: одинаковое тело — одинаковые байты
+        return lambda body: gzip.compress(body, compresslevel=level, mtime=0)
+    if name == 'br':
+        return lambda body: brotli.compress(body, quality=level)
+    # ZstdCompressor нельзя использовать из нескольких потоков одновременно
+    return lambda body: zstandard.ZstdCompressor(level=level).compress(body)
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """'gzip, br;q=0.8, *;q=0' -> {'gzip': 1.0, 'br': 0.8, '*': 0.0}"""
+    accepted = {}
+    for part in (header or '').split(','):
+        name, _, params = part.strip().partition(';')
+        name = name.strip().lower()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(';'):
+            key, _, value = param.strip().partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[name] = q
+    return accepted
+
+
+class Compressor:
+    def __init__(self, min_size: int = 1024, levels: Optional[Dict[str, int]] = None,
+                 encodings: Optional[Iterable[str]] = None, cache_size: int = 512, cache_ttl: float = 300.0):
+        self.min_size = min_size
+        levels = {**DEFAULT_LEVELS, **(levels or {})}
+        allowed = set(encodings) if encodings is not None else None
+        self.encodings = tuple(name for name in available_encodings() if allowed is None or name in allowed)
+        self._codecs = {name: _codec(name, levels[name]) for name in self.encodings}
+        # (хэш тела, кодировка) -> сжатое тело; None — сжатие не уменьшило тело
+        self._cache = TTLCache(maxsize=cache_size, ttl=cache_ttl) if cache_size > 0 else None
+
+    def negotiate(self, accept_encoding: Optional[str]) -> Optional[str]:
+        """Кодировка с наибольшим q среди поддерживаемых; None — отдавать как есть"""
+        accepted = parse_accept_encoding(accept_encoding)
+        best, best_q = None, 0.0
+        for name in self.encodings:
+            q = accepted.get(name, accepted.get('*', 0.0))
+            if q > best_q:
+                best, best_q = name, q
+        return best
+
+    def eligible(self, content_type: Optional[str], size: int) -> bool:
+        """Ответ такого типа и размера сжимается (для него нужен Vary: Accept-Encoding)"""
+        return (size >= self.min_size and bool(self.encodings)
+                and bool(content_type) and content_type.startswith(COMPRESSIBLE_TYPES))
+
+    def compress(self, body: bytes, encoding: str, etag: Optional[str] = None) -> Optional[bytes]:
+        """Сжатое тело или None, если сжатие его не уменьшает.
+
+        Кэшируются только ответы с etag: остальные (POST, ответы без версий)
+        почти не повторяются. Хэш тела многократно дешевле сжатия.
+        """
+        key = None
+        if etag and self._cache is not None:
+            key = (hashlib.blake2b(body, digest_size=16).digest(), encoding)
+            cached = self._cache.get(key, False)
+            if cached is not False:
+                return cached
+        compressed = self._codecs[encoding](body)
+        if len(compressed) >= len(body):
+            compressed = None
+        if key is not None:
+            self._cache.set(key, compressed)
+        return compressed
@@ -0,0 +1,169 @@
+import sqlite3
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Tuple, Type
+
+logger = logging.getLogger(__name__)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Не удалось получить соединение из пула за отведённое время"""
+
+
+class ConnectionPool:
+    """Пул соединений SQLite с привязкой соединения к потоку.
+
+    Поток получает соединение при первом обращении и переиспользует его
+    (в том числе во вложенных вызовах), пока не вызовет release() —
+    тогда соединение возвращается в пул и достаётся следующему потоку.
+    max_size ограничивает число одновременно открытых соединений.
+    """
+
+    def __init__(self, db_path: str, max_size: int = 8, timeout: float = 30.0,
+                 health_check_interval: float = 60.0,
+                 on_connect: Optional[Callable[[sqlite3.Connection], None]] = None,
+                 factory: Type[sqlite3.Connection] = sqlite3.Connection):
+        self.db_path = db_path
+        self.on_connect = on_connect
+        self.factory = factory
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._cond = threading.Condition()
+        # Свободные соединения: (соединение, время возврата в пул)
+        self._idle: List[Tuple[sqlite3.Connection, float]] = []
+        # Выданные соединения: ident потока -> (поток, соединение)
+        self._in_use: Dict[int, Tuple[threading.Thread, sqlite3.Connection]] = {}
+        self._closed = False
+
+    def _create_connection(self) -> sqlite3.Connection:
+        # Соединение переходит между потоками через пул, но в каждый момент
+        # используется только одним из них
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=self.factory)
+        if self.on_connect:
+            self.on_connect(conn)
+        return conn
+
+    def _is_healthy(self, conn: sqlite3.Connection) -> bool:
+        try:
+            conn.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def _close_quietly(self, conn: sqlite3.Connection) -> None:
+        try:
+            conn.close()
+        except sqlite3.Error as e:
+            logger.warning(f"Error closing connection: {e}")
+
+    def _reclaim_dead_threads(self) -> None:
+        """Забирает соединения у потоков, завершившихся без release()"""
+        for ident, (thread, conn) in list(self._in_use.items()):
+            if not thread.is_alive():
+                del self._in_use[ident]
+                if conn.in_transaction:
+                    conn.rollback()
+                self._idle.append((conn, time.monotonic()))
+
+    def _acquire(self) -> sqlite3.Connection:
+        ident = threading.get_ident()
+        deadline = time.monotonic() + self.timeout
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("Connection pool is closed")
+                slot = self._in_use.get(ident)
+                if slot:
+                    return slot[1]
+                if not self._idle and len(self._in_use) >= self.max_size:
+                    self._reclaim_dead_threads()
+                if self._idle:
+                    conn, released_at = self._idle.pop()
+                    break
+                if len(self._in_use) < self.max_size:
+                    conn, released_at = None, None
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolTimeoutError(
+                        f"No free SQLite connection after {self.timeout}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(remaining)
+            # Резервируем слот до открытия соединения, чтобы не превысить max_size
+            self._in_use[ident] = (threading.current_thread(), conn)
+
+        try:
+            if conn is not None and time.monotonic() - released_at > self.health_check_interval:
+                if not self._is_healthy(conn):
+                    logger.warning("Dropping unhealthy SQLite connection")
+                    self._close_quietly(conn)
+                    conn = None
+            if conn is None:
+                conn = self._create_connection()
+        except Exception:
+            with self._cond:
+                del self._in_use[ident]
+                self._cond.notify()
+            raise
+
+        with self._cond:
+            self._in_use[ident] = (threading.current_thread(), conn)
+        return conn
+
+    @contextmanager
+    def connection(self):
+        """Соединение текущего потока.
+
+        Как и `with sqlite3.connect(...)`: при выходе без ошибки транзакция
+        фиксируется, при исключении — откатывается. Соединение не закрывается.
+        """
+        conn = self._acquire()
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.rollback()
+            raise
+        else:
+            if conn.in_transaction:
+                conn.commit()
+
+    def release(self) -> None:
+        """Вернуть соединение текущего потока в пул (например, в конце запроса)"""
+        with self._cond:
+            slot = self._in_use.pop(threading.get_ident(), None)
+            if slot is None:
+                return
+            conn = slot[1]
+            if self._closed:
+                self._close_quietly(conn)
+                return
+            if conn.in_transaction:
+                conn.rollback()
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    def close_all(self) -> None:
+        """Закрыть все соединения; повторное использование пула невозможно"""
+        with self._cond:
+            self._closed = True
+            for conn, _ in self._idle:
+                self._close_quietly(conn)
+            self._idle.clear()
+            for _, conn in self._in_use.values():
+                if conn is not None:
+                    self._close_quietly(conn)
+            self._in_use.clear()
+            self._cond.notify_all()
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                'max_size': self.max_size,
+                'in_use': len(self._in_use),
+                'idle': len(self._idle),
+            }
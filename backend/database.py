@@ -1,67 +1,243 @@
 import sqlite3
 import logging
-from datetime import datetime, timedelta
-from typing import List, Optional, Dict
-from models import Task, ShoppingItem
+from datetime import date, datetime, timedelta
+from dataclasses import asdict
+from typing import Iterable, Iterator, List, Optional, Dict, Tuple, Union
+from models import DEFAULT_HOUSEHOLD_ID, Dashboard, Household, Task, ShoppingItem, ShoppingSuggestion
+from connection_pool import ConnectionPool
+from storage import StorageProfile, get_storage_profile
+from write_queue import WriteQueue
+from cache import TTLCache
+from versions import TableVersions
+from events import EventBus
+from query_hook import QueryHook
+from suggest import SuggestionIndex, normalize_item_text
 
 logger = logging.getLogger(__name__)
 
+_MISSING = object()
+
 class Database:
-    def __init__(self, db_path="household_dev.db"):
+    def __init__(self, db_path="household_dev.db", pool_size: int = 8,
+                 pool_timeout: float = 30.0, health_check_interval: float = 60.0,
+                 storage_profile: Union[str, StorageProfile] = 'default',
+                 write_batch_size: int = 64, user_cache_size: int = 10000,
+                 user_cache_ttl: float = 300.0, query_hook: Optional[QueryHook] = None,
+                 versions_path: Optional[str] = None, query_cache_size: int = 1024,
+                 query_cache_ttl: float = 60.0, version_slots: int = 1024,
+                 seed_defaults: bool = True, suggestion_cache_size: int = 256,
+                 suggestion_cache_ttl: float = 3600.0, events_poll_interval: float = 1.0):
         self.db_path = db_path
+        self.storage_profile = get_storage_profile(storage_profile)
+        # Хук видит каждое открытие соединения и каждый запрос (метрики, профилирование)
+        self.query_hook = query_hook
+        self._connection_factory = query_hook.connection_factory() if query_hook else sqlite3.Connection
+        # Читатели берут соединения из пула и работают параллельно,
+        # все изменения идут через единственный поток-писатель
+        self.pool = ConnectionPool(
+            db_path,
+            max_size=pool_size,
+            timeout=pool_timeout,
+            health_check_interval=health_check_interval,
+            on_connect=self.storage_profile.apply,
+            factory=self._connection_factory,
+        )
+        self.writer = WriteQueue(self._open_connection, max_batch=write_batch_size)
+        # Версии таблиц, отдаваемых API целиком (для ETag / If-None-Match);
+        # с versions_path — общие для всех процессов, работающих с этой базой;
+        # у каждого домохозяйства своя ячейка счётчиков (scope = household_id)
+        # users — по scope = chat_id: смена домохозяйства пользователя в любом
+        # процессе сбрасывает его запись в _user_cache
+        self.versions = TableVersions(('tasks', 'shopping_items', 'shopping_dictionary', 'users'),
+                                      path=versions_path, slots=version_slots)
+        # Результаты частых чтений (категории, счётчики, списки покупок)
+        # по (таблица, домохозяйство); сбрасываются изменениями, см. _cached
+        self._query_cache = TTLCache(maxsize=query_cache_size, ttl=query_cache_ttl)
+        # Индексы подсказок покупок по домохозяйствам: (версия словаря, SuggestionIndex)
+        self._suggestion_indexes = TTLCache(maxsize=suggestion_cache_size, ttl=suggestion_cache_ttl)
+        # Уведомления о зафиксированных изменениях (поток /events)
+        self.events = EventBus()
+        if self.versions.path is not None:
+            # Изменения, сделанные другими процессами, — как 'resync'
+            self.events.watch_versions(self.versions, ('tasks', 'shopping_items'), events_poll_interval)
         self._init_db()
         self._init_shopping_table()
-        self._add_default_tasks()
-        self._add_default_user()
+        self._init_unique_indexes()
+        # Словарь заполняется по спискам уже после схлопывания дубликатов
+        self._init_shopping_dictionary()
+        self._init_change_log()
+        self._init_task_stats()
+        # Базы отдельных домохозяйств (см. households.py) заполняет реестр
+        if seed_defaults:
+            self.add_default_tasks(DEFAULT_HOUSEHOLD_ID, only_if_empty=True)
+            self._add_default_user()
+        # Известные chat_id: проверка авторизации без обращения к SQLite.
+        # chat_id -> (версия ячейки users, household_id), см. get_user_household
+        self._user_cache = TTLCache(maxsize=user_cache_size, ttl=user_cache_ttl)
+        self._warm_user_cache()
+
+    def _open_connection(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(self.db_path, check_same_thread=False, factory=self._connection_factory)
+        self.storage_profile.apply(conn)
+        return conn
+
+    def _write(self, job, *tables: str, household_id: Optional[int] = None):
+        """Выполнить изменение в потоке-писателе и дождаться коммита.
+
+        job получает соединение и не должен вызывать commit/rollback:
+        транзакцией управляет WriteQueue. После коммита увеличиваются
+        версии перечисленных таблиц в домохозяйстве household_id
+        (None — во всех).
+        """
+        try:
+            return self.writer.execute(job)
+        finally:
+            # Даже при ошибке: часть изменений могла быть зафиксирована,
+            # лишний сброс ETag безопаснее устаревшего 304
+            self._invalidate(tables, household_id)
+
+    def _invalidate(self, tables: Iterable[str], household_id: Optional[int]) -> None:
+        """Увеличить версии таблиц домохозяйства (None — всех) и сбросить их кэш запросов"""
+        tables = tuple(tables)
+        if not tables:
+            return
+        self.versions.bump(*tables, scope=household_id)
+        if household_id is None:
+            self._query_cache.clear()
+        else:
+            for table in tables:
+                self._query_cache.invalidate((table, household_id))
+
+    def _cached(self, table: str, household_id: int, key: tuple, load):
+        """Результат load() из кэша запросов таблицы table домохозяйства.
+
+        Запись кэша — (версия таблицы, {key: результат}); версия читается до
+        запроса, и запись с другой версией считается устаревшей. Поэтому
+        результат, посчитанный во время параллельной записи, больше не будет
+        выдан, а через общий файл версий учитываются и записи других
+        процессов, а через эпоху — запуск другого процесса (база могла
+        измениться, пока он не работал). Исключения load() не кэшируются. Возвращаемый объект общий
+        для всех вызывающих — его нельзя изменять.
+        """
+        version = (self.versions.epoch, self.versions.get(table, household_id))
+        entry = self._query_cache.get((table, household_id))
+        if entry is None or entry[0] != version:
+            entry = (version, {})
+            self._query_cache.set((table, household_id), entry)
+        results = entry[1]
+        result = results.get(key, _MISSING)
+        if result is _MISSING:
+            result = results[key] = load()
+        return result
+
+    def release_connection(self):
+        """Вернуть соединение текущего потока в пул (вызывается в конце запроса)"""
+        self.pool.release()
+
+    def close(self):
+        """Остановить поток-писатель и закрыть все соединения с базой"""
+        self.events.close()
+        self.writer.close()
+        self.pool.close_all()
+        self.versions.close()
+
+    @staticmethod
+    def _add_household_column(cursor, table: str) -> bool:
+        """Добавить household_id в таблицу старой базы; True — колонка добавлена.
+
+        Всё, что было в базе до разделения на домохозяйства, относится
+        к домохозяйству по умолчанию.
+        """
+        cursor.execute(f"PRAGMA table_info({table})")
+        if 'household_id' in [col[1] for col in cursor.fetchall()]:
+            return False
+        cursor.execute(
+            f"ALTER TABLE {table} ADD COLUMN household_id INTEGER NOT NULL DEFAULT {DEFAULT_HOUSEHOLD_ID}"
+        )
+        return True
 
     def _init_db(self):
-        """Инициализация таблиц пользователей, задач и истории"""
-        with sqlite3.connect(self.db_path) as conn:
+        """Инициализация таблиц домохозяйств, пользователей, задач и истории"""
+        def write(conn):
             cursor = conn.cursor()
-            # Таблица пользователей
+            # Таблица домохозяйств: пользователи, задачи и покупки принадлежат одному из них
             cursor.execute('''
+                CREATE TABLE IF NOT EXISTS households (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            cursor.execute(
+                "INSERT OR IGNORE INTO households (id, name) VALUES (?, ?)",
+                (DEFAULT_HOUSEHOLD_ID, 'Дом')
+            )
+            # Таблица пользователей
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS users (
                     chat_id INTEGER PRIMARY KEY,
-                    username TEXT
+                    username TEXT,
+                    household_id INTEGER NOT NULL DEFAULT {DEFAULT_HOUSEHOLD_ID}
                 )
             ''')
             # Таблица задач (без created_at)
-            cursor.execute('''
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS tasks (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     name TEXT NOT NULL,
                     interval_days INTEGER NOT NULL,
                     last_done TIMESTAMP,
                     last_done_by INTEGER,
+                    household_id INTEGER NOT NULL DEFAULT {DEFAULT_HOUSEHOLD_ID},
                     FOREIGN KEY (last_done_by) REFERENCES users(chat_id)
                 )
             ''')
             # Таблица истории
-            cursor.execute('''
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS task_history (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     task_id INTEGER,
                     done_by INTEGER,
                     done_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    household_id INTEGER NOT NULL DEFAULT {DEFAULT_HOUSEHOLD_ID},
                     FOREIGN KEY (task_id) REFERENCES tasks(id),
                     FOREIGN KEY (done_by) REFERENCES users(chat_id)
                 )
             ''')
+            for table in ('users', 'tasks', 'task_history'):
+                self._add_household_column(cursor, table)
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_history_date ON task_history(done_at)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_history_task ON task_history(task_id)')
             cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_interval ON tasks(interval_days)')
-            conn.commit()
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_household ON users(household_id)')
+            # Срок следующего выполнения (last_done + interval_days); NULL — ни разу не выполнялась
+            cursor.execute("PRAGMA table_info(tasks)")
+            columns = [col[1] for col in cursor.fetchall()]
+            if 'next_due' not in columns:
+                cursor.execute("ALTER TABLE tasks ADD COLUMN next_due TIMESTAMP")
+                cursor.execute("SELECT id, last_done, interval_days FROM tasks WHERE last_done IS NOT NULL")
+                cursor.executemany(
+                    "UPDATE tasks SET next_due = ? WHERE id = ?",
+                    [(self._next_due(datetime.fromisoformat(last_done), interval_days), task_id)
+                     for task_id, last_done, interval_days in cursor.fetchall()]
+                )
+            # Все выборки идут внутри домохозяйства, поэтому household_id — первая
+            # колонка индексов: число домохозяйств не влияет на стоимость запроса
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_tasks_household_next_due ON tasks(household_id, next_due)')
+            cursor.execute('DROP INDEX IF EXISTS idx_tasks_next_due')
+        self._write(write)
 
     def _init_shopping_table(self):
         """Инициализация таблицы покупок (без created_at)"""
-        with sqlite3.connect(self.db_path) as conn:
+        def write(conn):
             cursor = conn.cursor()
-            cursor.execute('''
+            cursor.execute(f'''
                 CREATE TABLE IF NOT EXISTS shopping_items (
                     id INTEGER PRIMARY KEY AUTOINCREMENT,
                     item_text TEXT NOT NULL,
                     is_checked BOOLEAN DEFAULT 0,
-                    category TEXT DEFAULT 'supermarket'
+                    category TEXT DEFAULT 'supermarket',
+                    household_id INTEGER NOT NULL DEFAULT {DEFAULT_HOUSEHOLD_ID}
                 )
             ''')
             # Для старых баз добавляем category, если её нет
@@ -69,27 +245,294 @@ class Database:
             columns = [col[1] for col in cursor.fetchall()]
             if 'category' not in columns:
                 cursor.execute("ALTER TABLE shopping_items ADD COLUMN category TEXT DEFAULT 'supermarket'")
-            conn.commit()
-
-    def _add_default_tasks(self):
-        """Добавление стандартных задач при первом запуске"""
-        default_tasks = [
-            ("Помыть полы", 7),
-            ("Пропылесосить", 7),
-            ("Помыть ванну", 21),
-            ("Полотенца", 7),
-            ("Постельное", 7),
-            ("Раковина + плита", 7)
-        ]
-        with sqlite3.connect(self.db_path) as conn:
+            self._add_household_column(cursor, 'shopping_items')
+            # Индексы под ORDER BY is_checked, id DESC списка покупок домохозяйства:
+            # с фильтром по категории и без него; второй же покрывает список категорий
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_shopping_household_checked_id
+                ON shopping_items(household_id, is_checked, id DESC)
+            ''')
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_shopping_household_category
+                ON shopping_items(household_id, category, is_checked, id DESC)
+            ''')
+            cursor.execute('DROP INDEX IF EXISTS idx_shopping_checked_id')
+            cursor.execute('DROP INDEX IF EXISTS idx_shopping_category_checked_id')
+        self._write(write)
+
+    def _init_shopping_dictionary(self):
+        """Словарь покупок домохозяйства для подсказок (GET /shopping/suggest).
+
+        Каждое добавление покупки увеличивает счётчик (домохозяйство, название,
+        категория). Удаление покупок словарь не трогает: история остаётся после
+        «удалить отмеченные» и «очистить список». item_key — normalize_item_text,
+        item_text — последнее написание. revision растёт в порядке коммитов
+        (запись в SQLite одна на базу и у нескольких процессов), по ней индекс
+        подсказок дочитывает только изменённые строки.
+        """
+        def write(conn):
             cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM tasks")
-            if cursor.fetchone()[0] == 0:
-                cursor.executemany(
-                    "INSERT INTO tasks (name, interval_days) VALUES (?, ?)",
-                    default_tasks
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'shopping_dictionary'")
+            backfill = cursor.fetchone() is None
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS shopping_dictionary (
+                    household_id INTEGER NOT NULL,
+                    item_key TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    item_text TEXT NOT NULL,
+                    uses INTEGER NOT NULL DEFAULT 0,
+                    last_used TIMESTAMP NOT NULL,
+                    revision INTEGER NOT NULL,
+                    PRIMARY KEY (household_id, item_key, category)
+                ) WITHOUT ROWID
+            ''')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_shopping_dictionary_revision ON shopping_dictionary(revision)')
+            if backfill:
+                # Первый запуск: словарь из того, что сейчас в списках покупок
+                cursor.execute("SELECT household_id, item_text, category FROM shopping_items ORDER BY id")
+                for household_id, item_text, category in cursor.fetchall():
+                    self._remember_shopping_item(cursor, household_id, item_text, category or 'supermarket')
+        self._write(write)
+
+    def _init_unique_indexes(self):
+        """Регистронезависимые индексы для имён задач, пользователей и покупок.
+
+        Уникальность имени задачи и текста неотмеченной покупки внутри
+        домохозяйства обеспечивает сама база, поэтому дубликаты отсекаются
+        через INSERT ... ON CONFLICT без отдельной проверки. NOCASE сравнивает
+        так же, как LOWER() в SQLite.
+        """
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND name IN (?, ?)",
+                ('idx_tasks_household_name', 'idx_shopping_household_unchecked_text')
+            )
+            existing = {row[0] for row in cursor.fetchall()}
+            if 'idx_tasks_household_name' not in existing:
+                # В старых базах могут быть дубликаты: переименовываем все, кроме первого
+                cursor.execute('''
+                    UPDATE tasks SET name = name || ' (' || id || ')'
+                    WHERE id NOT IN (SELECT MIN(id) FROM tasks GROUP BY household_id, name COLLATE NOCASE)
+                ''')
+                if cursor.rowcount:
+                    logger.warning(f"Renamed {cursor.rowcount} duplicate tasks before adding unique index")
+                cursor.execute('''
+                    CREATE UNIQUE INDEX idx_tasks_household_name
+                    ON tasks(household_id, name COLLATE NOCASE)
+                ''')
+                cursor.execute('DROP INDEX IF EXISTS idx_tasks_name_nocase')
+            if 'idx_shopping_household_unchecked_text' not in existing:
+                # Повторяющиеся неотмеченные покупки, кроме самой ранней, отмечаем
+                # купленными: строки остаются в списке, пользователь удалит их сам
+                cursor.execute('''
+                    UPDATE shopping_items SET is_checked = 1
+                    WHERE is_checked = 0 AND id NOT IN (
+                        SELECT MIN(id) FROM shopping_items
+                        WHERE is_checked = 0 GROUP BY household_id, item_text COLLATE NOCASE
+                    )
+                ''')
+                if cursor.rowcount:
+                    logger.warning(f"Checked {cursor.rowcount} duplicate unchecked shopping items before adding unique index")
+                cursor.execute('''
+                    CREATE UNIQUE INDEX idx_shopping_household_unchecked_text
+                    ON shopping_items(household_id, item_text COLLATE NOCASE) WHERE is_checked = 0
+                ''')
+                cursor.execute('DROP INDEX IF EXISTS idx_shopping_unchecked_text')
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_users_username_nocase ON users(username COLLATE NOCASE)')
+        self._write(write)
+
+    def _init_change_log(self):
+        """Журнал изменений для дельта-синхронизации (GET /sync).
+
+        Триггеры записывают в change_log каждую вставку, изменение и удаление
+        задач и покупок. На каждую строку хранится только последняя запись
+        (INSERT OR REPLACE по (table_name, row_id)), поэтому журнал не растёт
+        быстрее самих таблиц; удаления остаются надгробиями (deleted = 1).
+        Ревизии общие, но читаются по домохозяйству (household_id записи).
+        """
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute(f'''
+                CREATE TABLE IF NOT EXISTS change_log (
+                    revision INTEGER PRIMARY KEY AUTOINCREMENT,
+                    table_name TEXT NOT NULL,
+                    row_id INTEGER NOT NULL,
+                    deleted INTEGER NOT NULL DEFAULT 0,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    household_id INTEGER NOT NULL DEFAULT {DEFAULT_HOUSEHOLD_ID}
                 )
-                conn.commit()
+            ''')
+            cursor.execute('CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_row ON change_log(table_name, row_id)')
+            if self._add_household_column(cursor, 'change_log'):
+                # Старые триггеры не пишут household_id: пересоздаём их ниже
+                for table in ('tasks', 'shopping_items'):
+                    for event in ('insert', 'update', 'delete'):
+                        cursor.execute(f"DROP TRIGGER IF EXISTS trg_{table}_{event}_log")
+            cursor.execute('''
+                CREATE INDEX IF NOT EXISTS idx_change_log_household_revision
+                ON change_log(household_id, revision)
+            ''')
+            # Ревизия, до которой надгробия уже удалены: клиенту с более старым
+            # курсором нужна полная синхронизация
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS sync_meta (
+                    key TEXT PRIMARY KEY,
+                    value INTEGER NOT NULL
+                )
+            ''')
+            for table in ('tasks', 'shopping_items'):
+                for event, ref, deleted in (('INSERT', 'NEW', 0), ('UPDATE', 'NEW', 0), ('DELETE', 'OLD', 1)):
+                    cursor.execute(f'''
+                        CREATE TRIGGER IF NOT EXISTS trg_{table}_{event.lower()}_log
+                        AFTER {event} ON {table}
+                        BEGIN
+                            INSERT OR REPLACE INTO change_log (table_name, row_id, deleted, household_id)
+                            VALUES ('{table}', {ref}.id, {deleted}, {ref}.household_id);
+                        END
+                    ''')
+        self._write(write)
+
+    def _init_task_stats(self):
+        """Агрегаты для статистики выполнения задач (GET /stats/tasks).
+
+        Триггер на task_history при каждой вставке обновляет дневную корзину
+        (домохозяйство, день, задача, пользователь) и серии выполнений, поэтому
+        статистика читается за O(корзин домохозяйства) без просмотра истории.
+        Агрегаты не зависят от очистки старой истории.
+        """
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("PRAGMA table_info(task_stats_daily)")
+            columns = [col[1] for col in cursor.fetchall()]
+            backfill = not columns
+            if columns and 'household_id' not in columns:
+                # Агрегаты старой базы переносятся как есть (история могла быть
+                # уже очищена), все они — домохозяйства по умолчанию
+                cursor.execute("DROP TRIGGER IF EXISTS trg_task_history_stats")
+                cursor.execute("ALTER TABLE task_stats_daily RENAME TO task_stats_daily_old")
+                cursor.execute("DROP INDEX IF EXISTS idx_task_stats_daily_task")
+            # interval_sum — сумма дней с предыдущего выполнения той же задачи
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS task_stats_daily (
+                    household_id INTEGER NOT NULL,
+                    day TEXT NOT NULL,
+                    task_id INTEGER NOT NULL,
+                    done_by INTEGER,
+                    completions INTEGER NOT NULL DEFAULT 0,
+                    interval_sum REAL NOT NULL DEFAULT 0,
+                    interval_count INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (household_id, day, task_id, done_by)
+                ) WITHOUT ROWID
+            ''')
+            if columns and 'household_id' not in columns:
+                cursor.execute(f'''
+                    INSERT INTO task_stats_daily
+                    SELECT {DEFAULT_HOUSEHOLD_ID}, day, task_id, done_by, completions, interval_sum, interval_count
+                    FROM task_stats_daily_old
+                ''')
+                cursor.execute("DROP TABLE task_stats_daily_old")
+            cursor.execute('CREATE INDEX IF NOT EXISTS idx_task_stats_daily_task ON task_stats_daily(task_id)')
+            # Серия задачи: сколько раз подряд её выполнили не позже срока
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS task_streaks (
+                    task_id INTEGER PRIMARY KEY,
+                    last_done_at TIMESTAMP NOT NULL,
+                    current_streak INTEGER NOT NULL,
+                    best_streak INTEGER NOT NULL
+                )
+            ''')
+            # Серия пользователя: сколько дней подряд он что-то выполнял
+            cursor.execute('''
+                CREATE TABLE IF NOT EXISTS user_streaks (
+                    chat_id INTEGER PRIMARY KEY,
+                    last_day TEXT NOT NULL,
+                    current_streak INTEGER NOT NULL,
+                    best_streak INTEGER NOT NULL
+                )
+            ''')
+            task_streak = '''CASE
+                WHEN julianday(date(excluded.last_done_at)) - julianday(date(last_done_at))
+                     <= (SELECT interval_days FROM tasks WHERE id = excluded.task_id)
+                THEN current_streak + 1 ELSE 1 END'''
+            user_streak = '''CASE
+                WHEN excluded.last_day = last_day THEN current_streak
+                WHEN julianday(excluded.last_day) - julianday(last_day) = 1 THEN current_streak + 1
+                ELSE 1 END'''
+            # Порядок важен: интервал считается от last_done_at до его обновления.
+            # done_by в старых базах бывает NULL: такое выполнение учитывается
+            # у задачи и по дням (done_by = 0, пользователя с таким chat_id нет),
+            # но не в сериях пользователей. Триггер пересоздаётся при каждом
+            # запуске, чтобы базы с прежней версией получили новое тело
+            cursor.execute("DROP TRIGGER IF EXISTS trg_task_history_stats")
+            cursor.execute(f'''
+                CREATE TRIGGER trg_task_history_stats
+                AFTER INSERT ON task_history
+                WHEN NEW.task_id IS NOT NULL
+                BEGIN
+                    INSERT INTO task_stats_daily
+                        (household_id, day, task_id, done_by, completions, interval_sum, interval_count)
+                    SELECT NEW.household_id, date(NEW.done_at), NEW.task_id, COALESCE(NEW.done_by, 0), 1,
+                           COALESCE(julianday(NEW.done_at) - julianday(s.last_done_at), 0),
+                           s.last_done_at IS NOT NULL
+                    FROM (SELECT 1) LEFT JOIN task_streaks s ON s.task_id = NEW.task_id
+                    WHERE 1
+                    ON CONFLICT (household_id, day, task_id, done_by) DO UPDATE SET
+                        completions = completions + 1,
+                        interval_sum = interval_sum + excluded.interval_sum,
+                        interval_count = interval_count + excluded.interval_count;
+                    INSERT INTO task_streaks (task_id, last_done_at, current_streak, best_streak)
+                    VALUES (NEW.task_id, NEW.done_at, 1, 1)
+                    ON CONFLICT (task_id) DO UPDATE SET
+                        current_streak = {task_streak},
+                        best_streak = MAX(best_streak, {task_streak}),
+                        last_done_at = excluded.last_done_at;
+                    INSERT INTO user_streaks (chat_id, last_day, current_streak, best_streak)
+                    SELECT NEW.done_by, date(NEW.done_at), 1, 1
+                    WHERE NEW.done_by IS NOT NULL
+                    ON CONFLICT (chat_id) DO UPDATE SET
+                        current_streak = {user_streak},
+                        best_streak = MAX(best_streak, {user_streak}),
+                        last_day = MAX(last_day, excluded.last_day);
+                END
+            ''')
+            if backfill:
+                # Первый запуск: прогоняем существующую историю через триггер по порядку
+                cursor.execute("CREATE TEMP TABLE history_replay AS SELECT * FROM task_history")
+                cursor.execute("DELETE FROM task_history")
+                cursor.execute('''
+                    INSERT INTO task_history (id, task_id, done_by, done_at, household_id)
+                    SELECT id, task_id, done_by, done_at, household_id FROM history_replay ORDER BY done_at, id
+                ''')
+                cursor.execute("DROP TABLE history_replay")
+        self._write(write)
+
+    DEFAULT_TASKS = [
+        ("Помыть полы", 7),
+        ("Пропылесосить", 7),
+        ("Помыть ванну", 21),
+        ("Полотенца", 7),
+        ("Постельное", 7),
+        ("Раковина + плита", 7)
+    ]
+
+    @classmethod
+    def _insert_default_tasks(cls, cursor, household_id: int) -> None:
+        cursor.executemany(
+            "INSERT INTO tasks (name, interval_days, household_id) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+            [(name, interval_days, household_id) for name, interval_days in cls.DEFAULT_TASKS]
+        )
+
+    def add_default_tasks(self, household_id: int, only_if_empty: bool = False) -> None:
+        """Стандартные задачи домохозяйства (only_if_empty — только если задач у него ещё нет)"""
+        def write(conn):
+            cursor = conn.cursor()
+            if only_if_empty:
+                cursor.execute("SELECT 1 FROM tasks WHERE household_id = ? LIMIT 1", (household_id,))
+                if cursor.fetchone():
+                    return
+            self._insert_default_tasks(cursor, household_id)
+        self._write(write, 'tasks', household_id=household_id)
 
     def _add_default_user(self):
         """Добавление пользователей по умолчанию при первом запуске"""
@@ -97,7 +540,7 @@ class Database:
             (1, 'настя'),
             (2, 'костя')
         ]
-        with sqlite3.connect(self.db_path) as conn:
+        def write(conn):
             cursor = conn.cursor()
             cursor.execute("SELECT COUNT(*) FROM users")
             if cursor.fetchone()[0] == 0:
@@ -105,296 +548,994 @@ class Database:
                     "INSERT INTO users (chat_id, username) VALUES (?, ?)",
                     default_users
                 )
-                conn.commit()
-                logger.info("✅ Созданы пользователи по умолчанию: настя, костя")
+                return True
+            return False
+        if self._write(write):
+            logger.info("✅ Созданы пользователи по умолчанию: настя, костя")
 
     # ================== ПОЛЬЗОВАТЕЛИ ==================
-    def get_user_by_name(self, name: str) -> Optional[int]:
-        with sqlite3.connect(self.db_path) as conn:
+    def _warm_user_cache(self):
+        """Загрузить пользователей в кэш при старте"""
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute(
-                "SELECT chat_id FROM users WHERE LOWER(username) = LOWER(?)",
-                (name,)
-            )
+            cursor.execute("SELECT chat_id, household_id FROM users LIMIT ?", (self._user_cache.maxsize,))
+            for chat_id, household_id in cursor.fetchall():
+                self._remember_user(chat_id, household_id)
+        self.pool.release()
+
+    def _remember_user(self, chat_id: int, household_id: int, version: Optional[int] = None) -> None:
+        if version is None:
+            version = self.versions.get('users', chat_id)
+        self._user_cache.set(chat_id, (version, household_id))
+
+    def invalidate_user(self, chat_id: Optional[int] = None):
+        """Сбросить кэш пользователя (или весь кэш) после изменения таблицы users, во всех процессах"""
+        self.versions.bump('users', scope=chat_id)
+        if chat_id is None:
+            self._user_cache.clear()
+        else:
+            self._user_cache.invalidate(chat_id)
+
+    def get_users_by_name(self, name: str, household_id: Optional[int] = None) -> List[Tuple[int, int]]:
+        """(chat_id, household_id) пользователей с таким именем (в одном домохозяйстве или во всех)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            query = "SELECT chat_id, household_id FROM users WHERE username = ? COLLATE NOCASE"
+            params = [name]
+            if household_id is not None:
+                query += " AND household_id = ?"
+                params.append(household_id)
+            cursor.execute(query + " ORDER BY chat_id", params)
+            return cursor.fetchall()
+
+    def get_user_household(self, chat_id: int) -> Optional[int]:
+        """Домохозяйство пользователя; None — пользователя нет.
+
+        Запись кэша действительна, пока не изменилась ячейка users этого
+        chat_id в общем файле версий: перенос пользователя в другом процессе
+        (воркер, households.py add-user) виден сразу, а не через USER_CACHE_TTL.
+        """
+        # Версию читаем до запроса, как в _cached
+        version = self.versions.get('users', chat_id)
+        cached = self._user_cache.get(chat_id)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        # Отрицательный результат не кэшируем: новый пользователь виден сразу
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT household_id FROM users WHERE chat_id = ?", (chat_id,))
             row = cursor.fetchone()
-            return row[0] if row else None
+        if row is None:
+            return None
+        self._remember_user(chat_id, row[0], version)
+        return row[0]
 
     def user_exists(self, chat_id: int) -> bool:
-        with sqlite3.connect(self.db_path) as conn:
+        return self.get_user_household(chat_id) is not None
+
+    def add_user(self, chat_id: int, username: str, household_id: int) -> None:
+        """Добавить пользователя в домохозяйство (или перенести существующего)"""
+        def write(conn):
+            row = conn.execute('SELECT household_id FROM users WHERE chat_id = ?', (chat_id,)).fetchone()
+            conn.execute('''
+                INSERT INTO users (chat_id, username, household_id) VALUES (?, ?, ?)
+                ON CONFLICT (chat_id) DO UPDATE SET
+                    username = excluded.username, household_id = excluded.household_id
+            ''', (chat_id, username, household_id))
+            return row[0] if row else None
+        # Пользователи входят в статистику задач (/stats/tasks) нового и
+        # прежнего домохозяйства; остальные домохозяйства не затрагиваются
+        old_household_id = self._write(write, 'tasks', household_id=household_id)
+        if old_household_id is not None and old_household_id != household_id:
+            self._invalidate(('tasks',), old_household_id)
+        if old_household_id != household_id:
+            # Другие процессы перечитают домохозяйство пользователя
+            self.versions.bump('users', scope=chat_id)
+        self._remember_user(chat_id, household_id)
+
+    # ================== ДОМОХОЗЯЙСТВА ==================
+    def create_household(self, name: str, with_default_tasks: bool = True) -> Household:
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("INSERT INTO households (name) VALUES (?)", (name,))
+            household_id = cursor.lastrowid
+            if with_default_tasks:
+                self._insert_default_tasks(cursor, household_id)
+            return household_id
+        household_id = self._write(write)
+        logger.info(f"🏠 Создано домохозяйство {household_id}: {name}")
+        return Household(household_id, name)
+
+    def get_household(self, household_id: int) -> Optional[Household]:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM users WHERE chat_id = ?", (chat_id,))
-            return cursor.fetchone() is not None
+            cursor.execute("SELECT id, name FROM households WHERE id = ?", (household_id,))
+            row = cursor.fetchone()
+            return Household(*row) if row else None
+
+    def get_household_members(self, household_id: int) -> List[Tuple[int, str]]:
+        """(chat_id, username) пользователей домохозяйства"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                "SELECT chat_id, username FROM users WHERE household_id = ? ORDER BY chat_id",
+                (household_id,)
+            )
+            return cursor.fetchall()
+
+    def get_household_ids_in_slots(self, slot_numbers: List[int], slots: int) -> List[int]:
+        """Домохозяйства, у которых ячейка счётчиков версий (household_id % slots) — одна из slot_numbers"""
+        if not slot_numbers:
+            return []
+        with self.pool.connection() as conn:
+            cursor = conn.execute(
+                f"SELECT id FROM households WHERE id % ? IN ({', '.join('?' * len(slot_numbers))})",
+                [slots, *slot_numbers]
+            )
+            return [row[0] for row in cursor.fetchall()]
 
     # ================== ЗАДАЧИ ==================
-    def get_all_tasks(self) -> List[Task]:
-        """Получить все задачи (без created_at)"""
-        with sqlite3.connect(self.db_path) as conn:
+    @staticmethod
+    def _next_due(last_done: datetime, interval_days: int) -> str:
+        # Тот же формат isoformat, что и у last_done: строки сравниваются в SQL
+        return (last_done + timedelta(days=interval_days)).isoformat()
+
+    @staticmethod
+    def _fetch_all(cursor, row_factory) -> list:
+        """fetchall, где каждая строка сразу превращается в объект через row_factory"""
+        cursor.row_factory = row_factory
+        try:
+            return cursor.fetchall()
+        finally:
+            # Курсор может использоваться дальше для других запросов
+            cursor.row_factory = None
+
+    @staticmethod
+    def _task_from_row(cursor, row) -> Task:
+        """Фабрика строк для SELECT id, name, interval_days, last_done, last_done_by, next_due"""
+        task_id, name, interval_days, last_done, last_done_by, next_due = row
+        return Task(
+            task_id, name, interval_days,
+            datetime.fromisoformat(last_done) if last_done else None,
+            last_done_by,
+            datetime.fromisoformat(next_due) if next_due else None,
+        )
+
+    def get_all_tasks(self, household_id: int) -> List[Task]:
+        """Получить все задачи домохозяйства (без created_at)"""
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, name, interval_days, last_done, last_done_by
-                FROM tasks ORDER BY name
-            ''')
-            return [
-                Task(
-                    id=row[0],
-                    name=row[1],
-                    interval_days=row[2],
-                    last_done=datetime.fromisoformat(row[3]) if row[3] else None,
-                    last_done_by=row[4]
-                )
-                for row in cursor.fetchall()
-            ]
+                SELECT id, name, interval_days, last_done, last_done_by, next_due
+                FROM tasks WHERE household_id = ? ORDER BY name
+            ''', (household_id,))
+            return self._fetch_all(cursor, self._task_from_row)
+
+    def get_tasks_page(self, household_id: int, limit: int,
+                       after_id: Optional[int] = None) -> Optional[List[Task]]:
+        """Страница get_all_tasks: до limit задач после задачи after_id (в порядке имён).
 
-    def get_task_by_id(self, task_id: int) -> Optional[Task]:
-        with sqlite3.connect(self.db_path) as conn:
+        None — задачи after_id нет в домохозяйстве (удалена между страницами).
+        """
+        after_name = None
+        if after_id is not None:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT name FROM tasks WHERE household_id = ? AND id = ?", (household_id, after_id)
+                ).fetchone()
+            if row is None:
+                return None
+            after_name = row[0]
+        return self._load_tasks_after(household_id, after_name, limit)
+
+    def iter_tasks(self, household_id: int, page_size: int) -> Iterator[List[Task]]:
+        """Все задачи страницами по page_size, каждая — отдельным коротким запросом.
+
+        В памяти одновременно только одна страница, а снимок WAL не держится
+        всё время отдачи ответа и не мешает checkpoint.
+        """
+        after_name = None
+        while True:
+            page = self._load_tasks_after(household_id, after_name, page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after_name = page[-1].name
+
+    def _load_tasks_after(self, household_id: int, after_name: Optional[str], limit: int) -> List[Task]:
+        # Имена задач в домохозяйстве уникальны, поэтому имя — ключ страницы.
+        # Задач в домохозяйстве немного: сортировка с LIMIT держит в памяти только limit строк
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                SELECT id, name, interval_days, last_done, last_done_by
-                FROM tasks WHERE id = ?
-            ''', (task_id,))
+                SELECT id, name, interval_days, last_done, last_done_by, next_due
+                FROM tasks WHERE household_id = ? AND (? IS NULL OR name > ?)
+                ORDER BY name LIMIT ?
+            ''', (household_id, after_name, after_name, limit))
+            return self._fetch_all(cursor, self._task_from_row)
+
+    def get_due_tasks(self, household_id: int, due_before: Optional[datetime] = None) -> List[Task]:
+        """Задачи со сроком раньше due_before (по умолчанию — сейчас, то есть просроченные).
+
+        Ни разу не выполнявшиеся задачи считаются просроченными и идут первыми,
+        остальные — по возрастанию срока. Обе части читаются по
+        idx_tasks_household_next_due.
+        """
+        before = (due_before or datetime.now()).isoformat()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, name, interval_days, last_done, last_done_by, next_due
+                FROM tasks WHERE household_id = ? AND next_due IS NULL
+                UNION ALL
+                SELECT id, name, interval_days, last_done, last_done_by, next_due
+                FROM tasks WHERE household_id = ? AND next_due <= ?
+                ORDER BY next_due
+            ''', (household_id, household_id, before))
+            return self._fetch_all(cursor, self._task_from_row)
+
+    def get_task_by_id(self, household_id: int, task_id: int) -> Optional[Task]:
+        """Задача домохозяйства; задачи других домохозяйств не видны (None)"""
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT id, name, interval_days, last_done, last_done_by, next_due
+                FROM tasks WHERE id = ? AND household_id = ?
+            ''', (task_id, household_id))
             row = cursor.fetchone()
             if row:
-                return Task(
-                    id=row[0],
-                    name=row[1],
-                    interval_days=row[2],
-                    last_done=datetime.fromisoformat(row[3]) if row[3] else None,
-                    last_done_by=row[4]
-                )
+                return self._task_from_row(cursor, row)
             return None
 
-    def add_new_task(self, name: str, interval_days: int) -> bool:
+    @staticmethod
+    def _insert_task(cursor, household_id: int, name: str, interval_days: int) -> Optional[Task]:
+        cursor.execute(
+            "INSERT INTO tasks (name, interval_days, household_id) VALUES (?, ?, ?) ON CONFLICT DO NOTHING",
+            (name, interval_days, household_id)
+        )
+        if cursor.rowcount == 0:
+            return None
+        return Task(id=cursor.lastrowid, name=name, interval_days=interval_days)
+
+    def add_new_task(self, household_id: int, name: str, interval_days: int) -> Optional[Task]:
+        """Создать задачу. Возвращает созданную задачу или None, если имя занято"""
+        def write(conn):
+            return self._insert_task(conn.cursor(), household_id, name, interval_days)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM tasks WHERE LOWER(name) = LOWER(?)",
-                    (name,)
-                )
-                if cursor.fetchone():
-                    return False
-                cursor.execute(
-                    "INSERT INTO tasks (name, interval_days) VALUES (?, ?)",
-                    (name, interval_days)
-                )
-                conn.commit()
-                return True
+            task = self._write(write, 'tasks', household_id=household_id)
+            if task:
+                self.events.publish('task_changed', scope=household_id, task_id=task.id)
+            return task
         except Exception as e:
             logger.error(f"Error adding task: {e}")
-            return False
+            return None
 
-    def update_task_interval(self, task_id: int, new_interval: int) -> bool:
+    def update_task_interval(self, household_id: int, task_id: int, new_interval: int) -> bool:
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("SELECT last_done FROM tasks WHERE id = ? AND household_id = ?", (task_id, household_id))
+            row = cursor.fetchone()
+            if not row:
+                return False
+            next_due = self._next_due(datetime.fromisoformat(row[0]), new_interval) if row[0] else None
+            cursor.execute(
+                "UPDATE tasks SET interval_days = ?, next_due = ? WHERE id = ?",
+                (new_interval, next_due, task_id)
+            )
+            return True
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "UPDATE tasks SET interval_days = ? WHERE id = ?",
-                    (new_interval, task_id)
-                )
-                conn.commit()
-                return True
+            result = self._write(write, 'tasks', household_id=household_id)
+            if result:
+                self.events.publish('task_changed', scope=household_id, task_id=task_id)
+            return result
         except Exception as e:
             logger.error(f"Error updating task interval: {e}")
             return False
 
-    def rename_task(self, task_id: int, new_name: str) -> bool:
-        try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute(
-                    "SELECT id FROM tasks WHERE LOWER(name) = LOWER(?) AND id != ?",
-                    (new_name, task_id)
-                )
-                if cursor.fetchone():
-                    return False
+    def rename_task(self, household_id: int, task_id: int, new_name: str) -> bool:
+        def write(conn):
+            cursor = conn.cursor()
+            try:
                 cursor.execute(
-                    "UPDATE tasks SET name = ? WHERE id = ?",
-                    (new_name, task_id)
+                    "UPDATE tasks SET name = ? WHERE id = ? AND household_id = ?",
+                    (new_name, task_id, household_id)
                 )
-                conn.commit()
-                return True
+            except sqlite3.IntegrityError:
+                # Имя уже занято другой задачей домохозяйства (idx_tasks_household_name)
+                return False
+            return cursor.rowcount > 0
+        try:
+            renamed = self._write(write, 'tasks', household_id=household_id)
+            if renamed:
+                self.events.publish('task_changed', scope=household_id, task_id=task_id)
+            return renamed
         except Exception as e:
             logger.error(f"Error renaming task: {e}")
             return False
 
-    def delete_task(self, task_id: int) -> bool:
+    def delete_task(self, household_id: int, task_id: int) -> bool:
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM tasks WHERE id = ? AND household_id = ?", (task_id, household_id))
+            if cursor.rowcount == 0:
+                return False
+            cursor.execute("DELETE FROM task_history WHERE task_id = ?", (task_id,))
+            cursor.execute("DELETE FROM task_stats_daily WHERE task_id = ?", (task_id,))
+            cursor.execute("DELETE FROM task_streaks WHERE task_id = ?", (task_id,))
+            return True
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM task_history WHERE task_id = ?", (task_id,))
-                cursor.execute("DELETE FROM tasks WHERE id = ?", (task_id,))
-                conn.commit()
-                return True
+            result = self._write(write, 'tasks', household_id=household_id)
+            if result:
+                self.events.publish('task_deleted', scope=household_id, task_id=task_id)
+            return result
         except Exception as e:
             logger.error(f"Error deleting task: {e}")
             return False
 
-    def mark_task_done(self, task_id: int, user_chat_id: int):
-        """Отметить задачу выполненной пользователем"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            # Получаем имя пользователя (необязательно, можно использовать для логирования)
+    @classmethod
+    def _mark_done(cls, cursor, household_id: int, task_id: int, user_chat_id: int) -> Optional[bool]:
+        """Отметить выполнение. None — задачи нет, иначе создан ли новый пользователь"""
+        cursor.execute("SELECT interval_days FROM tasks WHERE id = ? AND household_id = ?", (task_id, household_id))
+        task_row = cursor.fetchone()
+        if not task_row:
+            return None
+        now = datetime.now()
+        current_time = now.isoformat()
+        cursor.execute('''
+            UPDATE tasks SET last_done = ?, last_done_by = ?, next_due = ? WHERE id = ?
+        ''', (current_time, user_chat_id, cls._next_due(now, task_row[0]), task_id))
+
+        # Получаем имя пользователя (необязательно, можно использовать для логирования)
+        cursor.execute(
+            "SELECT username FROM users WHERE chat_id = ?",
+            (user_chat_id,)
+        )
+        user_row = cursor.fetchone()
+        username = user_row[0] if user_row else f"user_{user_chat_id}"
+
+        # Если пользователя нет в БД, создаём
+        if not user_row:
             cursor.execute(
-                "SELECT username FROM users WHERE chat_id = ?",
-                (user_chat_id,)
+                "INSERT INTO users (chat_id, username, household_id) VALUES (?, ?, ?)",
+                (user_chat_id, username, household_id)
             )
-            user_row = cursor.fetchone()
-            username = user_row[0] if user_row else f"user_{user_chat_id}"
 
-            # Если пользователя нет в БД, создаём
-            if not user_row:
-                cursor.execute(
-                    "INSERT INTO users (chat_id, username) VALUES (?, ?)",
-                    (user_chat_id, username)
-                )
+        cursor.execute('''
+            INSERT INTO task_history (task_id, done_by, done_at, household_id) VALUES (?, ?, ?, ?)
+        ''', (task_id, user_chat_id, current_time, household_id))
+        return not user_row
 
-            current_time = datetime.now().isoformat()
-            cursor.execute('''
-                UPDATE tasks SET last_done = ?, last_done_by = ? WHERE id = ?
-            ''', (current_time, user_chat_id, task_id))
-            cursor.execute('''
-                INSERT INTO task_history (task_id, done_by, done_at) VALUES (?, ?, ?)
-            ''', (task_id, user_chat_id, current_time))
-            conn.commit()
-        self._cleanup_old_history()
+    def mark_task_done(self, household_id: int, task_id: int, user_chat_id: int):
+        """Отметить задачу выполненной пользователем"""
+        def write(conn):
+            return self._mark_done(conn.cursor(), household_id, task_id, user_chat_id)
+        created_user = self._write(write, 'tasks', household_id=household_id)
+        if created_user is None:
+            # Задачи нет в домохозяйстве — событий нет
+            return
+        if created_user:
+            self._remember_user(user_chat_id, household_id)
+        self.events.publish('task_changed', scope=household_id, task_id=task_id)
 
-    def _cleanup_old_history(self, days_to_keep: int = 90):
+    def cleanup_old_history(self, days_to_keep: int = 90) -> int:
+        """Удалить историю старше days_to_keep дней (вызывается планировщиком обслуживания)"""
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM task_history WHERE done_at < ?", (cutoff,))
+            return cursor.rowcount
         try:
             cutoff = (datetime.now() - timedelta(days=days_to_keep)).isoformat()
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("DELETE FROM task_history WHERE done_at < ?", (cutoff,))
-                deleted = cursor.rowcount
-                conn.commit()
-                if deleted:
-                    logger.info(f"🧹 Очищено {deleted} старых записей истории")
+            deleted = self._write(write)
+            if deleted:
+                logger.info(f"🧹 Очищено {deleted} старых записей истории")
+            return deleted
         except Exception as e:
             logger.error(f"Error cleaning history: {e}")
+            return 0
+
+    # ================== СТАТИСТИКА ==================
+    def get_task_stats(self, household_id: int, days: Optional[int] = 30, today: Optional[date] = None) -> Dict:
+        """Статистика выполнения задач домохозяйства за последние days дней (None — за всё время).
+
+        Читаются только дневные агрегаты и таблицы серий (см. _init_task_stats).
+        Текущая серия задачи обнуляется, если задача просрочена, а серия
+        пользователя — если он ничего не выполнял ни сегодня, ни вчера.
+        """
+        today = today or date.today()
+        since = (today - timedelta(days=days - 1)).isoformat() if days else None
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            # Один снимок базы на все запросы ниже
+            cursor.execute("BEGIN")
+            cursor.execute('''
+                SELECT day, SUM(completions) FROM task_stats_daily
+                WHERE household_id = ? AND day >= ? GROUP BY day ORDER BY day
+            ''', (household_id, since or ''))
+            daily = [{'day': day, 'completions': count} for day, count in cursor.fetchall()]
+            cursor.execute('''
+                SELECT t.id, t.name, t.interval_days,
+                       d.completions, d.interval_sum, d.interval_count,
+                       s.last_done_at, s.current_streak, s.best_streak
+                FROM tasks t
+                LEFT JOIN (
+                    -- +task_id: группировать после выборки окна по первичному ключу
+                    -- (household_id, day), а не обходить по idx_task_stats_daily_task все корзины
+                    SELECT task_id, SUM(completions) AS completions,
+                           SUM(interval_sum) AS interval_sum, SUM(interval_count) AS interval_count
+                    FROM task_stats_daily WHERE household_id = ? AND day >= ? GROUP BY +task_id
+                ) d ON d.task_id = t.id
+                LEFT JOIN task_streaks s ON s.task_id = t.id
+                WHERE t.household_id = ?
+                ORDER BY t.name
+            ''', (household_id, since or '', household_id))
+            tasks = []
+            for (task_id, name, interval_days, completions, interval_sum, interval_count,
+                 last_done_at, current_streak, best_streak) in cursor.fetchall():
+                if last_done_at and (today - datetime.fromisoformat(last_done_at).date()).days > interval_days:
+                    current_streak = 0
+                tasks.append({
+                    'task_id': task_id,
+                    'name': name,
+                    'completions': completions or 0,
+                    'avg_interval_days': round(interval_sum / interval_count, 2) if interval_count else None,
+                    'current_streak': current_streak or 0,
+                    'best_streak': best_streak or 0,
+                })
+            cursor.execute('''
+                SELECT u.chat_id, u.username,
+                       d.completions, d.interval_sum, d.interval_count,
+                       s.last_day, s.current_streak, s.best_streak
+                FROM users u
+                LEFT JOIN (
+                    SELECT done_by, SUM(completions) AS completions,
+                           SUM(interval_sum) AS interval_sum, SUM(interval_count) AS interval_count
+                    FROM task_stats_daily WHERE household_id = ? AND day >= ? GROUP BY done_by
+                ) d ON d.done_by = u.chat_id
+                LEFT JOIN user_streaks s ON s.chat_id = u.chat_id
+                WHERE u.household_id = ?
+                ORDER BY COALESCE(d.completions, 0) DESC, u.username
+            ''', (household_id, since or '', household_id))
+            yesterday = (today - timedelta(days=1)).isoformat()
+            users = []
+            for (chat_id, username, completions, interval_sum, interval_count,
+                 last_day, current_streak, best_streak) in cursor.fetchall():
+                if last_day and last_day < yesterday:
+                    current_streak = 0
+                users.append({
+                    'chat_id': chat_id,
+                    'username': username,
+                    'completions': completions or 0,
+                    'avg_interval_days': round(interval_sum / interval_count, 2) if interval_count else None,
+                    'current_streak': current_streak or 0,
+                    'best_streak': best_streak or 0,
+                })
+        return {
+            'days': days,
+            'since': since,
+            'total_completions': sum(d['completions'] for d in daily),
+            'daily': daily,
+            'tasks': tasks,
+            'users': users,
+        }
 
     # ================== ПОКУПКИ ==================
-    def add_shopping_item(self, item_text: str, category: str = 'supermarket') -> bool:
+    @classmethod
+    def _insert_shopping_item(cls, cursor, household_id: int, item_text: str, category: str) -> Optional[ShoppingItem]:
+        cursor.execute('''
+            INSERT INTO shopping_items (item_text, is_checked, category, household_id)
+            VALUES (?, 0, ?, ?)
+            ON CONFLICT DO NOTHING
+        ''', (item_text, category, household_id))
+        if cursor.rowcount == 0:
+            return None
+        item_id = cursor.lastrowid
+        cls._remember_shopping_item(cursor, household_id, item_text, category)
+        return ShoppingItem(
+            id=item_id,
+            item_text=item_text,
+            is_checked=False,
+            category=category
+        )
+
+    def add_shopping_item(self, household_id: int, item_text: str,
+                          category: str = 'supermarket') -> Optional[ShoppingItem]:
+        """Добавить покупку. Возвращает созданный пункт или None, если такой уже есть в списке"""
+        def write(conn):
+            return self._insert_shopping_item(conn.cursor(), household_id, item_text, category)
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id FROM shopping_items
-                    WHERE LOWER(item_text) = LOWER(?) AND is_checked = 0
-                ''', (item_text,))
-                if cursor.fetchone():
-                    return False
-                cursor.execute('''
-                    INSERT INTO shopping_items (item_text, is_checked, category)
-                    VALUES (?, 0, ?)
-                ''', (item_text, category))
-                conn.commit()
-                return True
+            item = self._write(write, 'shopping_items', 'shopping_dictionary', household_id=household_id)
+            if item:
+                self.events.publish('shopping_item_added', scope=household_id, item=asdict(item))
+            return item
         except Exception as e:
             logger.error(f"Error adding shopping item: {e}")
-            return False
+            return None
+
+    @staticmethod
+    def _shopping_item_from_row(cursor, row) -> ShoppingItem:
+        """Фабрика строк для SELECT id, item_text, is_checked, category"""
+        item_id, item_text, is_checked, category = row
+        return ShoppingItem(item_id, item_text, bool(is_checked), category)
 
-    def get_shopping_items(self, show_checked: bool = True, category: Optional[str] = None) -> List[ShoppingItem]:
+    def get_shopping_items(self, household_id: int, show_checked: bool = True,
+                           category: Optional[str] = None) -> List[ShoppingItem]:
+        if category == 'all':
+            category = None
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                query = '''
-                    SELECT id, item_text, is_checked, category
-                    FROM shopping_items
-                    WHERE 1=1
-                '''
-                params = []
-                if not show_checked:
-                    query += " AND is_checked = 0"
-                if category and category != 'all':
-                    query += " AND category = ?"
-                    params.append(category)
-                # Сортировка: сначала неотмеченные, потом отмеченные; внутри по убыванию id (новые сверху)
-                query += " ORDER BY is_checked, id DESC"
-                cursor.execute(query, params)
-                return [
-                    ShoppingItem(
-                        id=row[0],
-                        item_text=row[1],
-                        is_checked=bool(row[2]),
-                        category=row[3]
-                    )
-                    for row in cursor.fetchall()
-                ]
+            return self._cached('shopping_items', household_id, ('items', show_checked, category),
+                                lambda: self._load_shopping_items(household_id, show_checked, category))
         except Exception as e:
             logger.error(f"Error getting shopping items: {e}")
             return []
 
-    def toggle_shopping_item(self, item_id: int) -> Optional[ShoppingItem]:
+    def _load_shopping_items(self, household_id: int, show_checked: bool,
+                             category: Optional[str]) -> List[ShoppingItem]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            query = '''
+                SELECT id, item_text, is_checked, category
+                FROM shopping_items
+                WHERE household_id = ?
+            '''
+            params = [household_id]
+            if not show_checked:
+                query += " AND is_checked = 0"
+            if category:
+                query += " AND category = ?"
+                params.append(category)
+            # Сортировка: сначала неотмеченные, потом отмеченные; внутри по убыванию id (новые сверху)
+            query += " ORDER BY is_checked, id DESC"
+            cursor.execute(query, params)
+            return self._fetch_all(cursor, self._shopping_item_from_row)
+
+    def get_shopping_page(self, household_id: int, limit: int, after_id: Optional[int] = None,
+                          show_checked: bool = True, category: Optional[str] = None) -> Optional[List[ShoppingItem]]:
+        """Страница get_shopping_items: до limit покупок после покупки after_id.
+
+        None — покупки after_id нет в домохозяйстве (удалена между страницами).
+        """
+        if category == 'all':
+            category = None
+        after = None
+        if after_id is not None:
+            with self.pool.connection() as conn:
+                row = conn.execute(
+                    "SELECT is_checked FROM shopping_items WHERE household_id = ? AND id = ?",
+                    (household_id, after_id)
+                ).fetchone()
+            if row is None:
+                return None
+            after = (bool(row[0]), after_id)
+        return self._load_shopping_after(household_id, show_checked, category, after, limit)
+
+    def iter_shopping_items(self, household_id: int, page_size: int, show_checked: bool = True,
+                            category: Optional[str] = None) -> Iterator[List[ShoppingItem]]:
+        """Все покупки страницами по page_size (как iter_tasks)"""
+        if category == 'all':
+            category = None
+        after = None
+        while True:
+            page = self._load_shopping_after(household_id, show_checked, category, after, page_size)
+            if page:
+                yield page
+            if len(page) < page_size:
+                return
+            after = (page[-1].is_checked, page[-1].id)
+
+    def _load_shopping_after(self, household_id: int, show_checked: bool, category: Optional[str],
+                             after: Optional[Tuple[bool, int]], limit: int) -> List[ShoppingItem]:
+        """До limit покупок в порядке is_checked, id DESC после ключа after = (is_checked, id).
+
+        Остаток группы после ключа и следующая группа (отмеченные) читаются
+        отдельными диапазонами idx_shopping_household_checked_id /
+        idx_shopping_household_category: условие с OR по двум колонкам
+        индекс не использует.
+        """
+        query = '''
+            SELECT id, item_text, is_checked, category
+            FROM shopping_items
+            WHERE household_id = ? AND is_checked = ?
+        '''
+        params = [household_id]
+        if category:
+            query += " AND category = ?"
+            params.append(category)
+        groups = [False, True] if show_checked else [False]
+        if after is not None:
+            groups = [checked for checked in groups if checked >= after[0]]
+        items = []
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            for checked in groups:
+                group_query, group_params = query, params[:1] + [int(checked)] + params[1:]
+                if after is not None and checked == after[0]:
+                    group_query += " AND id < ?"
+                    group_params.append(after[1])
+                cursor.execute(group_query + " ORDER BY id DESC LIMIT ?", group_params + [limit - len(items)])
+                items.extend(self._fetch_all(cursor, self._shopping_item_from_row))
+                if len(items) >= limit:
+                    break
+        return items
+
+    @staticmethod
+    def _toggle(cursor, household_id: int, item_id: int) -> Union[ShoppingItem, None, bool]:
+        """Переключённый пункт; None — пункта нет, False — снять отметку нельзя:
+        такой же неотмеченный пункт уже есть в списке"""
+        cursor.execute('''
+            SELECT id, item_text, is_checked, category
+            FROM shopping_items WHERE id = ? AND household_id = ?
+        ''', (item_id, household_id))
+        row = cursor.fetchone()
+        if not row:
+            return None
+        new_status = 0 if row[2] else 1
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT id, item_text, is_checked, category
-                    FROM shopping_items WHERE id = ?
-                ''', (item_id,))
-                row = cursor.fetchone()
-                if not row:
-                    return None
-                new_status = 0 if row[2] else 1
-                cursor.execute('''
-                    UPDATE shopping_items SET is_checked = ? WHERE id = ?
-                ''', (new_status, item_id))
-                conn.commit()
-                return ShoppingItem(
-                    id=row[0],
-                    item_text=row[1],
-                    is_checked=new_status,
-                    category=row[3]
-                )
+            cursor.execute('''
+                UPDATE shopping_items SET is_checked = ? WHERE id = ?
+            ''', (new_status, item_id))
+        except sqlite3.IntegrityError:
+            # Отмеченный пункт не удаляем молча: решает пользователь (409)
+            return False
+        return ShoppingItem(row[0], row[1], bool(new_status), row[3])
+
+    def toggle_shopping_item(self, household_id: int, item_id: int) -> Union[ShoppingItem, None, bool]:
+        """Переключить отметку; None — пункта нет, False — такой же неотмеченный уже есть"""
+        def write(conn):
+            return self._toggle(conn.cursor(), household_id, item_id)
+        try:
+            item = self._write(write, 'shopping_items', household_id=household_id)
+            if item:
+                self.events.publish('shopping_item_toggled', scope=household_id, id=item_id, item=asdict(item))
+            return item
         except Exception as e:
             logger.error(f"Error toggling shopping item: {e}")
             return None
 
-    def delete_checked_items(self) -> int:
+    def delete_checked_items(self, household_id: int) -> int:
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM shopping_items WHERE household_id = ? AND is_checked = 1", (household_id,))
+            return cursor.rowcount
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM shopping_items WHERE is_checked = 1")
-                count = cursor.fetchone()[0]
-                cursor.execute("DELETE FROM shopping_items WHERE is_checked = 1")
-                conn.commit()
-                return count
+            count = self._write(write, 'shopping_items', household_id=household_id)
+            if count:
+                self.events.publish('shopping_items_deleted', scope=household_id, checked_only=True, count=count)
+            return count
         except Exception as e:
             logger.error(f"Error deleting checked items: {e}")
             return 0
 
-    def delete_all_shopping_items(self) -> int:
+    def delete_all_shopping_items(self, household_id: int) -> int:
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM shopping_items WHERE household_id = ?", (household_id,))
+            return cursor.rowcount
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM shopping_items")
-                count = cursor.fetchone()[0]
-                cursor.execute("DELETE FROM shopping_items")
-                conn.commit()
-                return count
+            count = self._write(write, 'shopping_items', household_id=household_id)
+            if count:
+                self.events.publish('shopping_items_deleted', scope=household_id, checked_only=False, count=count)
+            return count
         except Exception as e:
             logger.error(f"Error deleting all items: {e}")
             return 0
 
-    def get_shopping_item_count(self) -> Dict[str, int]:
+    def get_shopping_item_count(self, household_id: int) -> Dict[str, int]:
         try:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.cursor()
-                cursor.execute("SELECT COUNT(*) FROM shopping_items WHERE is_checked = 0")
-                unchecked = cursor.fetchone()[0]
-                cursor.execute("SELECT COUNT(*) FROM shopping_items WHERE is_checked = 1")
-                checked = cursor.fetchone()[0]
-                return {
-                    'total': unchecked + checked,
-                    'unchecked': unchecked,
-                    'checked': checked
-                }
+            return self._cached('shopping_items', household_id, ('count',),
+                                lambda: self._load_shopping_item_count(household_id))
         except Exception as e:
             logger.error(f"Error getting item count: {e}")
             return {'total': 0, 'unchecked': 0, 'checked': 0}
-        
-    def get_unique_categories(self) -> List[str]:
-        """Возвращает отсортированный список уникальных категорий."""
-        with sqlite3.connect(self.db_path) as conn:
+
+    def _load_shopping_item_count(self, household_id: int) -> Dict[str, int]:
+        with self.pool.connection() as conn:
             cursor = conn.cursor()
-            cursor.execute("SELECT DISTINCT category FROM shopping_items ORDER BY category")
-            return [row[0] for row in cursor.fetchall()]
\ No newline at end of file
+            # Один проход по покрывающему индексу idx_shopping_household_checked_id
+            cursor.execute(
+                "SELECT is_checked, COUNT(*) FROM shopping_items WHERE household_id = ? GROUP BY is_checked",
+                (household_id,)
+            )
+            unchecked = checked = 0
+            for is_checked, count in cursor.fetchall():
+                if is_checked:
+                    checked += count
+                else:
+                    unchecked += count
+            return {
+                'total': unchecked + checked,
+                'unchecked': unchecked,
+                'checked': checked
+            }
+
+    def get_unique_categories(self, household_id: int) -> List[str]:
+        """Возвращает отсортированный список уникальных категорий домохозяйства."""
+        return self._cached('shopping_items', household_id, ('categories',),
+                            lambda: self._load_unique_categories(household_id))
+
+    def _load_unique_categories(self, household_id: int) -> List[str]:
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            # Перебор индекса idx_shopping_household_category прыжками от категории
+            # к следующей: O(категорий * log N) вместо чтения всех строк
+            cursor.execute('''
+                WITH RECURSIVE categories(category) AS (
+                    SELECT MIN(category) FROM shopping_items WHERE household_id = ?1
+                    UNION ALL
+                    SELECT (
+                        SELECT MIN(category) FROM shopping_items
+                        WHERE household_id = ?1 AND category > categories.category
+                    )
+                    FROM categories WHERE categories.category IS NOT NULL
+                )
+                SELECT category FROM categories WHERE category IS NOT NULL
+            ''', (household_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+    # ================== ПОДСКАЗКИ ПОКУПОК ==================
+    @staticmethod
+    def _remember_shopping_item(cursor, household_id: int, item_text: str, category: str) -> None:
+        cursor.execute('''
+            INSERT INTO shopping_dictionary (household_id, item_key, category, item_text, uses, last_used, revision)
+            VALUES (?, ?, ?, ?, 1, ?, (SELECT COALESCE(MAX(revision), 0) + 1 FROM shopping_dictionary))
+            ON CONFLICT (household_id, item_key, category) DO UPDATE SET
+                uses = uses + 1,
+                item_text = excluded.item_text,
+                last_used = excluded.last_used,
+                revision = excluded.revision
+        ''', (household_id, normalize_item_text(item_text), category, item_text, datetime.now().isoformat()))
+
+    def get_shopping_suggestions(self, household_id: int, query: str = '', limit: int = 10,
+                                 category: Optional[str] = None) -> List[ShoppingSuggestion]:
+        """Покупки из словаря домохозяйства по началу названия (и с опечатками), частые — первыми.
+
+        Индекс словаря живёт в памяти; пока версия shopping_dictionary не
+        изменилась, запрос к базе не нужен, а после изменения дочитываются
+        только строки с revision новее загруженной.
+        """
+        version = self.versions.get('shopping_dictionary', household_id)
+        cached = self._suggestion_indexes.get(household_id)
+        if cached is None:
+            cached = (None, SuggestionIndex())
+        if cached[0] != version:
+            index = cached[1]
+            index.apply(self._load_shopping_dictionary(household_id, index.revision))
+            cached = (version, index)
+        # Повторная запись продлевает время жизни индекса
+        self._suggestion_indexes.set(household_id, cached)
+        return cached[1].search(query, limit, category)
+
+    def _load_shopping_dictionary(self, household_id: int, after_revision: int = 0) -> List[tuple]:
+        with self.pool.connection() as conn:
+            # Первая загрузка — по первичному ключу домохозяйства, дальше — по idx_shopping_dictionary_revision
+            cursor = conn.execute(f'''
+                SELECT item_key, category, item_text, uses, revision FROM shopping_dictionary
+                {'INDEXED BY idx_shopping_dictionary_revision' if after_revision else ''}
+                WHERE household_id = ? AND revision > ?
+            ''', (household_id, after_revision))
+            return cursor.fetchall()
+
+    # ================== НАПОМИНАНИЯ ==================
+    def get_task_due_times(self, household_ids: Optional[List[int]] = None) -> List[Tuple[int, int, datetime]]:
+        """(household_id, task_id, next_due) задач со сроком — для очереди напоминаний.
+
+        Без household_ids — все домохозяйства базы (при старте), иначе
+        перечисленные, по idx_tasks_household_next_due.
+        """
+        query = "SELECT household_id, id, next_due FROM tasks WHERE next_due IS NOT NULL"
+        params: list = []
+        if household_ids is not None:
+            if not household_ids:
+                return []
+            query += f" AND household_id IN ({', '.join('?' * len(household_ids))})"
+            params = list(household_ids)
+        with self.pool.connection() as conn:
+            cursor = conn.execute(query, params)
+            return [(household_id, task_id, datetime.fromisoformat(next_due))
+                    for household_id, task_id, next_due in cursor.fetchall()]
+
+    # ================== ГЛАВНЫЙ ЭКРАН ==================
+    def get_dashboard(self, household_id: int, now: Optional[datetime] = None) -> Dashboard:
+        """Счётчики задач и покупок и ближайшая задача одним запросом.
+
+        Все части читаются по покрывающим индексам домохозяйства
+        (idx_tasks_household_next_due, idx_shopping_household_checked_id),
+        строки задач и покупок целиком не загружаются.
+        """
+        now = (now or datetime.now()).isoformat()
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT t.total, t.overdue, s.total, s.checked,
+                       (SELECT MIN(next_due) FROM tasks WHERE household_id = ?1 AND next_due > ?2),
+                       n.id, n.name, n.interval_days, n.last_done, n.last_done_by, n.next_due
+                FROM (
+                    -- Просроченные — как в get_due_tasks: без срока или со сроком не позже now
+                    SELECT COUNT(*) AS total,
+                           COALESCE(SUM(next_due IS NULL OR next_due <= ?2), 0) AS overdue
+                    FROM tasks WHERE household_id = ?1
+                ) AS t, (
+                    SELECT COUNT(*) AS total, COALESCE(SUM(is_checked), 0) AS checked
+                    FROM shopping_items WHERE household_id = ?1
+                ) AS s
+                LEFT JOIN (
+                    SELECT id, name, interval_days, last_done, last_done_by, next_due
+                    FROM tasks WHERE household_id = ?1 ORDER BY next_due LIMIT 1
+                ) AS n
+            ''', (household_id, now))
+            row = cursor.fetchone()
+        tasks_total, tasks_overdue, shopping_total, shopping_checked, next_overdue_at = row[:5]
+        return Dashboard(
+            tasks_total=tasks_total,
+            tasks_overdue=tasks_overdue,
+            shopping_unchecked=shopping_total - shopping_checked,
+            shopping_checked=shopping_checked,
+            next_task=self._task_from_row(None, row[5:]) if row[5] is not None else None,
+            next_overdue_at=datetime.fromisoformat(next_overdue_at) if next_overdue_at else None,
+        )
+
+    # ================== ПАКЕТНЫЕ ОПЕРАЦИИ ==================
+    BATCH_OPERATIONS = ('add_shopping_item', 'toggle_shopping_item', 'add_task', 'mark_task_done')
+
+    def apply_batch(self, household_id: int, operations: List[tuple], user_chat_id: int) -> List[Optional[object]]:
+        """Выполнить список операций одной транзакцией (один коммит на весь пакет).
+
+        operations: [(op, args), ...], op из BATCH_OPERATIONS, args — кортеж
+        аргументов соответствующего одиночного метода (без household_id).
+        Для каждой операции возвращается её результат: ShoppingItem / Task,
+        либо None (дубликат или объект не найден), либо False (снять отметку
+        нельзя — см. toggle_shopping_item). Операция, завершившаяся
+        ошибкой, откатывается отдельно от остальных, её результат — исключение.
+        """
+        handlers = {
+            'add_shopping_item': self._insert_shopping_item,
+            'toggle_shopping_item': self._toggle,
+            'add_task': self._insert_task,
+        }
+
+        def write(conn):
+            cursor = conn.cursor()
+            results = []
+            created_user = False
+            for index, (op, args) in enumerate(operations):
+                cursor.execute(f"SAVEPOINT batch_{index}")
+                try:
+                    if op == 'mark_task_done':
+                        (task_id,) = args
+                        created = self._mark_done(cursor, household_id, task_id, user_chat_id)
+                        created_user = created_user or bool(created)
+                        result = None
+                        if created is not None:
+                            cursor.execute('''
+                                SELECT id, name, interval_days, last_done, last_done_by, next_due
+                                FROM tasks WHERE id = ?
+                            ''', (task_id,))
+                            result = self._task_from_row(cursor, cursor.fetchone())
+                    else:
+                        result = handlers[op](cursor, household_id, *args)
+                except Exception as e:
+                    cursor.execute(f"ROLLBACK TO batch_{index}")
+                    result = e
+                cursor.execute(f"RELEASE batch_{index}")
+                results.append(result)
+            return results, created_user
+
+        touched = {'tasks' if op in ('add_task', 'mark_task_done') else 'shopping_items'
+                   for op, _ in operations}
+        if any(op == 'add_shopping_item' for op, _ in operations):
+            touched.add('shopping_dictionary')
+        results, created_user = self._write(write, *sorted(touched), household_id=household_id)
+        if created_user:
+            self._remember_user(user_chat_id, household_id)
+        for (op, args), result in zip(operations, results):
+            if not result or isinstance(result, Exception):
+                continue
+            if op == 'add_shopping_item':
+                self.events.publish('shopping_item_added', scope=household_id, item=asdict(result))
+            elif op == 'toggle_shopping_item':
+                self.events.publish('shopping_item_toggled', scope=household_id, id=args[0], item=asdict(result))
+            else:
+                self.events.publish('task_changed', scope=household_id, task_id=result.id)
+        return results
+
+    # ================== ОБСЛУЖИВАНИЕ ==================
+    def optimize(self):
+        """PRAGMA optimize: обновить статистику планировщика запросов, где она устарела"""
+        self._write(lambda conn: conn.execute("PRAGMA optimize"))
+
+    def incremental_vacuum(self, pages: int = 0) -> None:
+        """Вернуть ОС свободные страницы (работает при auto_vacuum = INCREMENTAL; 0 — все)"""
+        def write(conn):
+            # Результат PRAGMA нужно дочитать, иначе освобождается только одна страница
+            conn.execute(f"PRAGMA incremental_vacuum({int(pages)})").fetchall()
+        self._write(write)
+
+    def checkpoint(self, mode: str = 'PASSIVE') -> tuple:
+        """Перенести WAL в основной файл. Возвращает (busy, страниц в WAL, перенесено)"""
+        with self.pool.connection() as conn:
+            return tuple(conn.execute(f"PRAGMA wal_checkpoint({mode})").fetchone())
+
+    # ================== СИНХРОНИЗАЦИЯ ==================
+    def get_changes_since(self, household_id: int, since: int = 0) -> Dict:
+        """Изменения задач и покупок домохозяйства после ревизии since.
+
+        При since = 0 или если нужные надгробия уже удалены, возвращает полный
+        снимок (full = True). Клиент сохраняет revision и передаёт её в следующий раз.
+        """
+        with self.pool.connection() as conn:
+            cursor = conn.cursor()
+            # Один снимок базы на все запросы ниже
+            cursor.execute("BEGIN")
+            # Ревизии общие для всех домохозяйств; последняя своя — по idx_change_log_household_revision
+            cursor.execute("SELECT COALESCE(MAX(revision), 0) FROM change_log WHERE household_id = ?", (household_id,))
+            revision = cursor.fetchone()[0]
+            cursor.execute("SELECT value FROM sync_meta WHERE key = 'pruned_revision'")
+            row = cursor.fetchone()
+            pruned_revision = row[0] if row else 0
+            full = since <= 0 or since < pruned_revision or since > revision
+
+            if full:
+                cursor.execute('''
+                    SELECT id, name, interval_days, last_done, last_done_by, next_due
+                    FROM tasks WHERE household_id = ? ORDER BY name
+                ''', (household_id,))
+                tasks = self._fetch_all(cursor, self._task_from_row)
+                cursor.execute('''
+                    SELECT id, item_text, is_checked, category
+                    FROM shopping_items WHERE household_id = ? ORDER BY is_checked, id DESC
+                ''', (household_id,))
+                items = self._fetch_all(cursor, self._shopping_item_from_row)
+                deleted = {'tasks': [], 'shopping_items': []}
+            else:
+                cursor.execute('''
+                    SELECT t.id, t.name, t.interval_days, t.last_done, t.last_done_by, t.next_due
+                    FROM change_log c JOIN tasks t ON t.id = c.row_id
+                    WHERE c.household_id = ? AND c.revision > ? AND c.table_name = 'tasks' AND c.deleted = 0
+                ''', (household_id, since))
+                tasks = self._fetch_all(cursor, self._task_from_row)
+                cursor.execute('''
+                    SELECT s.id, s.item_text, s.is_checked, s.category
+                    FROM change_log c JOIN shopping_items s ON s.id = c.row_id
+                    WHERE c.household_id = ? AND c.revision > ? AND c.table_name = 'shopping_items' AND c.deleted = 0
+                ''', (household_id, since))
+                items = self._fetch_all(cursor, self._shopping_item_from_row)
+                deleted = {'tasks': [], 'shopping_items': []}
+                cursor.execute('''
+                    SELECT table_name, row_id FROM change_log
+                    WHERE household_id = ? AND revision > ? AND deleted = 1
+                ''', (household_id, since))
+                for table_name, row_id in cursor.fetchall():
+                    deleted[table_name].append(row_id)
+            return {
+                'revision': revision,
+                'full': full,
+                'tasks': tasks,
+                'shopping_items': items,
+                'deleted': deleted,
+            }
+
+    def prune_change_log(self, days_to_keep: int = 30) -> int:
+        """Удалить старые надгробия; клиенты с более старым курсором получат полный снимок"""
+        def write(conn):
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT MAX(revision) FROM change_log
+                WHERE deleted = 1 AND changed_at < ?
+            ''', (cutoff,))
+            max_revision = cursor.fetchone()[0]
+            if max_revision is None:
+                return 0
+            cursor.execute("DELETE FROM change_log WHERE deleted = 1 AND revision <= ?", (max_revision,))
+            deleted = cursor.rowcount
+            cursor.execute('''
+                INSERT INTO sync_meta (key, value) VALUES ('pruned_revision', ?)
+                ON CONFLICT(key) DO UPDATE SET value = MAX(value, excluded.value)
+            ''', (max_revision,))
+            return deleted
+        try:
+            # changed_at заполняется CURRENT_TIMESTAMP (UTC, 'YYYY-MM-DD HH:MM:SS')
+            cutoff = (datetime.utcnow() - timedelta(days=days_to_keep)).strftime('%Y-%m-%d %H:%M:%S')
+            return self._write(write)
+        except Exception as e:
+            logger.error(f"Error pruning change log: {e}")
+            return 0
@@ -0,0 +1,69 @@
+"""Условные запросы (ETag / If-None-Match), общие для app.py и asgi.py.
+
+ETag строится из версий таблиц (TableVersions.token) и URL запроса, поэтому
+304 отдаётся без обращения к SQLite. Если ответ зависит от текущего времени,
+к ETag добавляется момент, до которого он действителен.
+"""
+import time
+import zlib
+from datetime import datetime, timedelta
+from typing import Iterable, Optional
+
+from models import Dashboard, Task
+
+
+def etag_base(token: str, full_path: str) -> str:
+    return f"{token}-{zlib.crc32(full_path.encode()):08x}"
+
+
+def make_etag(base: str, valid_until: Optional[float] = None) -> str:
+    if valid_until is None:
+        return base
+    return f"{base}-{int(valid_until)}"
+
+
+def matching_etag(header: Optional[str], base: str) -> Optional[str]:
+    """ETag из If-None-Match, действительный для base (без W/ и кавычек), или None.
+
+    Он же — текущий ETag ответа: 304 отдаёт его, а не первый тег заголовка.
+    """
+    if not header:
+        return None
+    now = time.time()
+    for tag in header.split(','):
+        tag = tag.strip()
+        if tag.startswith('W/'):
+            tag = tag[2:]
+        tag = tag.strip('"')
+        if tag == base:
+            return tag
+        if tag.startswith(base + '-'):
+            try:
+                if now < int(tag[len(base) + 1:]):
+                    return tag
+            except ValueError:
+                pass
+    return None
+
+
+def tasks_valid_until(tasks: Iterable[Task], now: datetime, overdue: bool = False) -> Optional[float]:
+    """Поля статуса задач зависят от времени: ETag живёт до ближайшего их изменения"""
+    if overdue:
+        # Набор просроченных задач меняется со временем, даже без изменений в базе
+        return now.timestamp()
+    expiries = [t.status_valid_until(now) for t in tasks]
+    expiries = [e.timestamp() for e in expiries if e]
+    return min(expiries) if expiries else None
+
+
+def dashboard_valid_until(dashboard: Dashboard, now: datetime) -> Optional[float]:
+    """Число просроченных меняется, когда наступает срок следующей задачи"""
+    expiries = [dashboard.next_overdue_at]
+    if dashboard.next_task:
+        expiries.append(dashboard.next_task.status_valid_until(now))
+    expiries = [e.timestamp() for e in expiries if e]
+    return min(expiries) if expiries else None
+
+
+def end_of_day(now: datetime) -> float:
+    return datetime.combine(now.date() + timedelta(days=1), datetime.min.time()).timestamp()
@@ -0,0 +1,216 @@
+import asyncio
+import itertools
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class Event:
+    id: int
+    type: str
+    data: Dict[str, Any] = field(default_factory=dict)
+
+
+class Subscription:
+    """Очередь событий одного подписчика.
+
+    Очередь ограничена: если клиент не успевает забирать события, накопленные
+    события отбрасываются и вместо них отдаётся одно событие 'resync' —
+    клиент должен перечитать данные целиком. Публикующий поток никогда не ждёт.
+    """
+
+    def __init__(self, bus: "EventBus", maxsize: int, scope: Optional[int] = None):
+        self._bus = bus
+        self.scope = scope
+        self._events: deque = deque()
+        self._maxsize = maxsize
+        self._cond = threading.Condition()
+        # (цикл событий, future) ожидающего get_async
+        self._waiter: Optional[tuple] = None
+        self.closed = False
+
+    def _put(self, event: Event) -> None:
+        with self._cond:
+            if len(self._events) >= self._maxsize:
+                self._events.clear()
+                event = Event(id=event.id, type='resync')
+            self._events.append(event)
+            self._cond.notify()
+            self._wake_async()
+
+    def _wake_async(self) -> None:
+        if self._waiter is not None:
+            loop, future = self._waiter
+            self._waiter = None
+            loop.call_soon_threadsafe(_resolve, future)
+
+    def get(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """Следующее событие или None, если за timeout ничего не пришло"""
+        with self._cond:
+            if not self._events and not self.closed:
+                self._cond.wait(timeout)
+            if self._events:
+                return self._events.popleft()
+            return None
+
+    async def get_async(self, timeout: Optional[float] = None) -> Optional[Event]:
+        """То же, что get, но ожидание не занимает поток (для ASGI)"""
+        with self._cond:
+            if self._events or self.closed:
+                return self._events.popleft() if self._events else None
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            self._waiter = (loop, future)
+        try:
+            await asyncio.wait_for(future, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            with self._cond:
+                if self._waiter is not None and self._waiter[1] is future:
+                    self._waiter = None
+        with self._cond:
+            return self._events.popleft() if self._events else None
+
+    def close(self) -> None:
+        self._bus.unsubscribe(self)
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+            self._wake_async()
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class EventBus:
+    """Внутрипроцессная публикация событий об изменениях данных.
+
+    Событие с scope (домохозяйство) получают только подписчики этого scope
+    и подписчики без scope; событие без scope — все.
+
+    Сами события видны только в процессе, где произошло изменение. При
+    нескольких процессах (gunicorn) шина следит за общим файлом версий
+    (watch_versions): изменение в другом процессе доходит до подписчиков
+    этого процесса как 'resync' — клиент перечитывает данные.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[Optional[int], Set[Subscription]] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.last_id = 0
+        # scope -> id последнего события этого scope; события без scope — в _last_global_id
+        self._last_ids: Dict[int, int] = {}
+        self._last_global_id = 0
+        # Внутренние обработчики (напоминания): вызываются в потоке публикации
+        self._listeners: List[Callable[[Event, Optional[int]], None]] = []
+        # (TableVersions, таблицы, период опроса) для watch_versions
+        self._watched = None
+        self._watcher: Optional[threading.Thread] = None
+        self._closed = threading.Event()
+
+    def subscribe(self, maxsize: int = 100, scope: Optional[int] = None) -> Subscription:
+        subscription = Subscription(self, maxsize, scope)
+        with self._lock:
+            self._subscribers.setdefault(scope, set()).add(subscription)
+            # Поток слежения нужен, только пока есть подписчики: запускается с первым
+            if self._watched is not None and self._watcher is None and not self._closed.is_set():
+                self._watcher = threading.Thread(target=self._watch_versions, name='events-versions', daemon=True)
+                self._watcher.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.scope)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.scope]
+
+    def add_listener(self, listener: Callable[[Event, Optional[int]], None]) -> None:
+        """listener(event, scope) на каждое событие; должен быстро возвращаться и не бросать исключений"""
+        with self._lock:
+            self._listeners = self._listeners + [listener]
+
+    def remove_listener(self, listener: Callable[[Event, Optional[int]], None]) -> None:
+        with self._lock:
+            self._listeners = [other for other in self._listeners if other is not listener]
+
+    def publish(self, event_type: str, *, scope: Optional[int] = None, **data: Any) -> Event:
+        with self._lock:
+            event = Event(id=next(self._ids), type=event_type, data=data)
+            self.last_id = event.id
+            if scope is None:
+                self._last_global_id = event.id
+                subscribers = [s for group in self._subscribers.values() for s in group]
+            else:
+                self._last_ids[scope] = event.id
+                subscribers = list(self._subscribers.get(scope, ()))
+                subscribers += self._subscribers.get(None, ())
+            listeners = self._listeners
+        for subscription in subscribers:
+            subscription._put(event)
+        for listener in listeners:
+            listener(event, scope)
+        return event
+
+    def last_event_id(self, scope: Optional[int] = None) -> int:
+        """id последнего события, которое получил бы подписчик scope"""
+        with self._lock:
+            if scope is None:
+                return self.last_id
+            return max(self._last_ids.get(scope, 0), self._last_global_id)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return sum(len(group) for group in self._subscribers.values())
+
+    # ================== ИЗМЕНЕНИЯ В ДРУГИХ ПРОЦЕССАХ ==================
+    def watch_versions(self, versions, tables: Iterable[str], interval: float = 1.0) -> None:
+        """Раз в interval секунд сверять чужие изменения tables в общем файле версий"""
+        self._watched = (versions, tuple(tables), interval)
+
+    def _watch_versions(self) -> None:
+        versions, tables, interval = self._watched
+        # Наибольшие виденные значения: foreign_snapshot может временно отставать
+        seen = {table: versions.foreign_snapshot(table) for table in tables}
+        while not self._closed.wait(interval):
+            try:
+                changed = set()
+                for table in tables:
+                    for slot, (old, new) in enumerate(zip(seen[table], versions.foreign_snapshot(table))):
+                        if new > old:
+                            seen[table][slot] = new
+                            changed.add(slot)
+                if changed:
+                    self._resync(changed, versions.slots)
+            except Exception as e:
+                # Файл версий закрыт вместе с базой
+                if self._closed.is_set():
+                    return
+                logger.error(f"Error watching shared versions: {e}")
+
+    def _resync(self, slots: Set[int], slot_count: int) -> None:
+        with self._lock:
+            scopes = [scope for scope in self._subscribers
+                      if scope is not None and scope % slot_count in slots]
+        # Подписчики без scope получат 'resync' с каждым из этих scope
+        for scope in scopes:
+            self.publish('resync', scope=scope)
+        if not scopes and None in self._subscribers:
+            self.publish('resync')
+
+    def close(self) -> None:
+        """Остановить слежение за файлом версий"""
+        self._closed.set()
+        watcher = self._watcher
+        if watcher is not None and watcher is not threading.current_thread():
+            watcher.join()
@@ -0,0 +1,83 @@
+# gunicorn.conf.py
+"""Production-запуск бэкенда несколькими процессами (pre-fork).
+
+Из каталога backend:
+    gunicorn -c gunicorn.conf.py
+Плавная перезагрузка кода и воркеров — kill -HUP <pid мастера>,
+остановка с завершением текущих запросов — kill -TERM <pid мастера>.
+
+Настройки берутся из config.py (SERVER_*), значения по умолчанию подобраны
+для SQLite в режиме WAL: читатели в разных процессах не мешают друг другу,
+но писатель у базы один, поэтому процессов немного, а параллельность
+чтения добирается потоками.
+"""
+import logging
+import multiprocessing
+import sys
+
+import config
+
+logger = logging.getLogger('gunicorn.error')
+
+wsgi_app = getattr(config, 'SERVER_APP', 'app:app')
+bind = getattr(config, 'SERVER_BIND', '0.0.0.0:8000')
+
+# Больше 4 процессов только удлиняет очередь за блокировкой записи SQLite
+workers = getattr(config, 'SERVER_WORKERS', min(multiprocessing.cpu_count(), 4))
+worker_class = getattr(config, 'SERVER_WORKER_CLASS', 'gthread')
+# Поток на запрос; соединений в пуле столько же, чтобы потоки их не ждали.
+# Каждый открытый поток /events занимает один поток воркера: для многих
+# клиентов /events — SERVER_APP = 'asgi:app' и
+# SERVER_WORKER_CLASS = 'uvicorn.workers.UvicornWorker'. Изменения из других
+# воркеров доходят до /events как 'resync' (EventBus.watch_versions)
+threads = getattr(config, 'SERVER_THREADS', getattr(config, 'DB_POOL_SIZE', 8))
+
+# app.py открывает базу при импорте (соединения, поток-писатель, обслуживание).
+# SQLite-соединения нельзя переносить через fork, поэтому приложение
+# загружается в каждом воркере уже после fork, а не в мастере
+preload_app = False
+
+timeout = getattr(config, 'SERVER_TIMEOUT', 30)
+graceful_timeout = getattr(config, 'SERVER_GRACEFUL_TIMEOUT', 30)
+keepalive = getattr(config, 'SERVER_KEEPALIVE', 5)
+# Периодический перезапуск воркеров (с разбросом, чтобы не все сразу)
+max_requests = getattr(config, 'SERVER_MAX_REQUESTS', 10000)
+max_requests_jitter = max_requests // 10
+
+accesslog = getattr(config, 'SERVER_ACCESS_LOG', None)
+errorlog = '-'
+
+
+def when_ready(server):
+    if 'app' in sys.modules or 'database' in sys.modules:
+        # Например, запуск с --preload: соединения мастера унаследуют все воркеры
+        raise RuntimeError('The database must not be opened in the gunicorn master (do not use --preload)')
+    logger.info(f"Serving {wsgi_app} with {workers} workers x {threads} threads")
+
+
+def post_worker_init(worker):
+    # Импорт приложения уже выполнен в этом процессе: у воркера свои
+    # соединения, поток-писатель и кэши
+    app_module = sys.modules.get(wsgi_app.split(':')[0])
+    db = getattr(app_module, 'db', None)
+    if db is not None:
+        logger.info(f"Worker {worker.pid}: database {getattr(db, 'db_path', '')} opened")
+
+
+def worker_exit(server, worker):
+    # Остановить обслуживание и напоминания и дописать очередь записи до выхода процесса
+    app_module = sys.modules.get(wsgi_app.split(':')[0])
+    if app_module is None:
+        return
+    maintenance = getattr(app_module, 'maintenance', None)
+    if maintenance is not None:
+        maintenance.stop()
+    reminders = getattr(app_module, 'reminders', None)
+    if reminders is not None:
+        reminders.stop()
+    households = getattr(app_module, 'households', None)
+    if households is not None:
+        households.close()
+    db = getattr(app_module, 'db', None)
+    if db is not None:
+        db.close()
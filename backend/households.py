@@ -0,0 +1,251 @@
+"""Размещение данных домохозяйств.
+
+Пользователи и список домохозяйств всегда хранятся в основной базе.
+Задачи, история и покупки по умолчанию лежат там же и разделены по
+household_id. С data_dir (HOUSEHOLD_DATA_DIR) данные каждого домохозяйства,
+кроме домохозяйства по умолчанию, хранятся в отдельном файле
+<data_dir>/household_<id>.db: у каждого файла своя блокировка записи, а
+домохозяйство можно перенести или удалить вместе с файлом. Открытые базы
+держатся в LRU из max_open штук.
+
+Добавить домохозяйство и пользователя (из каталога backend):
+    python households.py create "Название"
+    python households.py add-user <household_id> <chat_id> <имя>
+"""
+import argparse
+import logging
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import Future
+from typing import Callable, Iterator, List, Optional, Tuple
+
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID, Household
+
+logger = logging.getLogger(__name__)
+
+
+class Households:
+    """Выдаёт базу с данными домохозяйства.
+
+    acquire() берёт базу в аренду, release() возвращает: база, которую кто-то
+    использует, не закрывается при вытеснении из LRU, даже если открытых баз
+    временно больше max_open. В режиме одной базы обе операции ничего не стоят.
+    Файл открывается вне общей блокировки: промах LRU одного домохозяйства
+    (миграции, заполнение) не задерживает запросы остальных.
+    """
+
+    def __init__(self, db: Database, data_dir: Optional[str] = None, max_open: int = 64,
+                 open_database: Optional[Callable[[str], Database]] = None):
+        self.db = db
+        self.data_dir = data_dir
+        self.max_open = max_open
+        self._open_database = open_database or (lambda path: Database(path, seed_defaults=False))
+        self._lock = threading.Lock()
+        # household_id -> [Database, число аренд]; порядок — от давно использованных к недавним
+        self._open: "OrderedDict[int, list]" = OrderedDict()
+        # household_id -> Future открытия: остальные запросы того же домохозяйства ждут его
+        self._opening: "dict[int, Future]" = {}
+        # Вызываются с (household_id, база) после открытия файла домохозяйства
+        self._open_listeners: List[Callable[[int, Database], None]] = []
+        if data_dir:
+            os.makedirs(data_dir, exist_ok=True)
+
+    @property
+    def per_file(self) -> bool:
+        return bool(self.data_dir)
+
+    def _in_main_db(self, household_id: int) -> bool:
+        # Данные домохозяйства по умолчанию остаются в основной базе: старые
+        # однодомные установки переходят на отдельные файлы без переноса данных
+        return not self.per_file or household_id == DEFAULT_HOUSEHOLD_ID
+
+    def path_for(self, household_id: int) -> str:
+        return os.path.join(self.data_dir, f"household_{int(household_id)}.db")
+
+    def acquire(self, household_id: int) -> Database:
+        """База с данными домохозяйства; после использования — release(household_id)"""
+        if self._in_main_db(household_id):
+            return self.db
+        while True:
+            with self._lock:
+                entry = self._open.get(household_id)
+                if entry is not None:
+                    evicted = self._lease(household_id, entry)
+                    opening = None
+                else:
+                    opening = self._opening.get(household_id)
+                    owner = opening is None
+                    if owner:
+                        opening = self._opening[household_id] = Future()
+            if opening is None:
+                self._close(evicted)
+                return entry[0]
+            if not owner:
+                # Файл открывает другой поток; после открытия база уже в LRU
+                # (или открытие не удалось — тогда пробуем сами)
+                try:
+                    opening.result()
+                except Exception:
+                    pass
+                continue
+            try:
+                db = self._open_household(household_id)
+            except BaseException as e:
+                with self._lock:
+                    del self._opening[household_id]
+                opening.set_exception(e)
+                raise
+            with self._lock:
+                del self._opening[household_id]
+                entry = self._open[household_id] = [db, 0]
+                evicted = self._lease(household_id, entry)
+            opening.set_result(None)
+            self._close(evicted)
+            for listener in self._open_listeners:
+                listener(household_id, db)
+            return db
+
+    def _lease(self, household_id: int, entry: list) -> List[Database]:
+        """Взять entry в аренду и вернуть вытесненные базы (вызывается под self._lock)"""
+        self._open.move_to_end(household_id)
+        entry[1] += 1
+        # База в аренде вытеснена не будет
+        if len(self._open) > self.max_open:
+            return self._evict()
+        return []
+
+    def add_open_listener(self, listener: Callable[[int, Database], None]) -> None:
+        self._open_listeners.append(listener)
+
+    def remove_open_listener(self, listener: Callable[[int, Database], None]) -> None:
+        self._open_listeners.remove(listener)
+
+    def release(self, household_id: int) -> None:
+        if self._in_main_db(household_id):
+            return
+        with self._lock:
+            entry = self._open.get(household_id)
+            if entry is None:
+                return
+            entry[1] -= 1
+            evicted = self._evict()
+        self._close(evicted)
+
+    def _open_household(self, household_id: int) -> Database:
+        path = self.path_for(household_id)
+        new = not os.path.exists(path)
+        db = self._open_database(path)
+        # Пользователи нужны в файле домохозяйства для статистики. Повторное
+        # открытие после вытеснения ничего не пишет, если состав не менялся:
+        # запись увеличила бы версии таблиц и сбросила ETag клиентов
+        known = set(db.get_household_members(household_id))
+        for chat_id, username in self.db.get_household_members(household_id):
+            if (chat_id, username) not in known:
+                db.add_user(chat_id, username, household_id)
+        if new:
+            db.add_default_tasks(household_id, only_if_empty=True)
+            logger.info(f"🏠 Создана база домохозяйства {household_id}: {path}")
+        return db
+
+    def _evict(self) -> List[Database]:
+        """Убрать из LRU лишние базы без аренд (вызывается под self._lock)"""
+        evicted = []
+        for household_id in list(self._open):
+            if len(self._open) <= self.max_open:
+                break
+            db, leases = self._open[household_id]
+            if leases <= 0:
+                del self._open[household_id]
+                evicted.append(db)
+        return evicted
+
+    @staticmethod
+    def _close(databases: List[Database]) -> None:
+        for db in databases:
+            try:
+                db.close()
+            except Exception as e:
+                logger.error(f"Error closing household database {db.db_path}: {e}")
+
+    def databases(self) -> Iterator[Database]:
+        """Основная база и все открытые базы домохозяйств (для обслуживания)"""
+        yield self.db
+        with self._lock:
+            household_ids = list(self._open)
+        for household_id in household_ids:
+            with self._lock:
+                entry = self._open.get(household_id)
+                if entry is None:
+                    continue
+                entry[1] += 1
+            try:
+                yield entry[0]
+            finally:
+                self.release(household_id)
+
+    def opened(self) -> List[Tuple[int, Database]]:
+        """Открытые сейчас базы домохозяйств (без основной)"""
+        with self._lock:
+            return [(household_id, entry[0]) for household_id, entry in self._open.items()]
+
+    def open_count(self) -> int:
+        with self._lock:
+            return len(self._open)
+
+    # ================== УПРАВЛЕНИЕ ==================
+    def create(self, name: str) -> Household:
+        # Стандартные задачи отдельного файла заполняются при его создании
+        return self.db.create_household(name, with_default_tasks=not self.per_file)
+
+    def add_user(self, chat_id: int, username: str, household_id: int) -> None:
+        self.db.add_user(chat_id, username, household_id)
+        if self._in_main_db(household_id):
+            return
+        with self._lock:
+            entry = self._open.get(household_id)
+        if entry is not None:
+            entry[0].add_user(chat_id, username, household_id)
+
+    def close(self) -> None:
+        """Закрыть базы домохозяйств (основную закрывает её владелец)"""
+        with self._lock:
+            databases = [db for db, _ in self._open.values()]
+            self._open.clear()
+        self._close(databases)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    import config
+    from bootstrap import create_database, create_households
+
+    parser = argparse.ArgumentParser(description='Домохозяйства и их пользователи')
+    commands = parser.add_subparsers(dest='command', required=True)
+    create = commands.add_parser('create', help='создать домохозяйство')
+    create.add_argument('name')
+    add_user = commands.add_parser('add-user', help='добавить пользователя в домохозяйство')
+    add_user.add_argument('household_id', type=int)
+    add_user.add_argument('chat_id', type=int)
+    add_user.add_argument('name')
+    args = parser.parse_args(argv)
+
+    db = create_database(config)
+    households = create_households(db, config)
+    try:
+        if args.command == 'create':
+            household = households.create(args.name)
+            print(f"{household.id}\t{household.name}")
+        else:
+            if db.get_household(args.household_id) is None:
+                parser.error(f'household {args.household_id} not found')
+            households.add_user(args.chat_id, args.name, args.household_id)
+            print(f"{args.chat_id}\t{args.name}\t{args.household_id}")
+    finally:
+        households.close()
+        db.close()
+
+
+if __name__ == '__main__':
+    logging.basicConfig(level=logging.INFO)
+    main()
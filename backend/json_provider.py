@@ -0,0 +1,58 @@
+import functools
+import json
+from typing import Any, Callable, Type
+
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость: без неё работает json из стандартной библиотеки
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """JSON через orjson для jsonify, request.get_json и app.json.dumps.
+
+    В отличие от стандартного провайдера ключи не сортируются, а не-ASCII
+    символы выводятся как есть (UTF-8), без \\uXXXX. Типы, которые orjson
+    не знает, передаются в DefaultJSONProvider.default.
+    """
+
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def loads(self, s, **kwargs):
+        # orjson.JSONDecodeError — подкласс ValueError, Flask отвечает 400 как обычно
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_APPEND_NEWLINE
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        # Тело отдаётся байтами, без промежуточной str
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option),
+            mimetype=self.mimetype,
+        )
+
+
+def get_json_provider_class(name: str = 'auto') -> Type[JSONProvider]:
+    """'orjson', 'stdlib' или 'auto' (orjson, если установлен)"""
+    if name == 'auto':
+        name = 'orjson' if orjson is not None else 'stdlib'
+    if name == 'stdlib':
+        return DefaultJSONProvider
+    if name == 'orjson':
+        if orjson is None:
+            raise ValueError("JSON provider 'orjson' requested, but orjson is not installed")
+        return OrjsonProvider
+    raise ValueError(f"Unknown JSON provider '{name}', expected one of: auto, orjson, stdlib")
+
+
+def get_json_encoder(name: str = 'auto') -> Callable[[Any], bytes]:
+    """obj -> bytes для кода вне Flask (asgi.py), с тем же выбором, что и get_json_provider_class"""
+    if get_json_provider_class(name) is OrjsonProvider:
+        return functools.partial(orjson.dumps, option=orjson.OPT_NON_STR_KEYS)
+    # Как DefaultJSONProvider: ASCII и отсортированные ключи
+    return lambda obj: json.dumps(obj, ensure_ascii=True, sort_keys=True).encode()
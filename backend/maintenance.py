@@ -0,0 +1,100 @@
+import logging
+import os
+import threading
+from typing import Callable, Iterable, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: без межпроцессной блокировки
+    fcntl = None
+
+from database import Database
+
+logger = logging.getLogger(__name__)
+
+
+class MaintenanceScheduler:
+    """Фоновое обслуживание базы вне пути запроса.
+
+    Раз в interval секунд: очистка старой истории задач и надгробий журнала
+    синхронизации, PRAGMA optimize, incremental vacuum и checkpoint WAL.
+    """
+
+    def __init__(self, db: Database, interval: float = 3600.0,
+                 history_days_to_keep: int = 90, change_log_days_to_keep: int = 30,
+                 checkpoint_mode: str = 'PASSIVE', lock_path: Optional[str] = None,
+                 databases: Optional[Callable[[], Iterable[Database]]] = None):
+        self.db = db
+        # Какие базы обслуживать за проход (по умолчанию — только db)
+        self._databases = databases or (lambda: (self.db,))
+        self.interval = interval
+        self.history_days_to_keep = history_days_to_keep
+        self.change_log_days_to_keep = change_log_days_to_keep
+        self.checkpoint_mode = checkpoint_mode
+        # Файл блокировки: из нескольких процессов с одной базой обслуживание
+        # выполняет только тот, кто его захватил
+        self.lock_path = lock_path if fcntl is not None else None
+        self._lock_fd: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='db-maintenance', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        if self._thread:
+            self._thread.join(timeout)
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _acquire_lock(self) -> bool:
+        if self.lock_path is None or self._lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            # Обслуживанием занят другой процесс; если он завершится,
+            # блокировку захватит кто-то из оставшихся на следующем проходе
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _run(self) -> None:
+        # Первый проход — сразу после старта: база могла долго не обслуживаться
+        while not self._stop.is_set():
+            if self._acquire_lock():
+                self.run_once()
+            self._stop.wait(self.interval)
+
+    def run_once(self) -> None:
+        for db in self._databases():
+            if self._stop.is_set():
+                break
+            self._maintain(db)
+
+    def _maintain(self, db: Database) -> None:
+        steps = (
+            ('history retention', lambda: db.cleanup_old_history(self.history_days_to_keep)),
+            ('change log pruning', lambda: db.prune_change_log(self.change_log_days_to_keep)),
+            ('optimize', db.optimize),
+            ('incremental vacuum', db.incremental_vacuum),
+            ('wal checkpoint', lambda: db.checkpoint(self.checkpoint_mode)),
+        )
+        for name, step in steps:
+            if self._stop.is_set():
+                break
+            try:
+                step()
+            except Exception as e:
+                # Ошибка одного шага не должна останавливать остальные
+                logger.error(f"Maintenance step '{name}' failed: {e}")
+        # Соединение пула этому потоку до следующего прохода не нужно
+        db.release_connection()
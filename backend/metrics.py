@@ -0,0 +1,245 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from flask import Flask, Response, g, request
+
+from query_hook import QueryHook
+
+# Границы корзин гистограмм длительности (секунды), как у клиентов Prometheus
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Гистограмма Prometheus: накопительные счётчики по верхним границам корзин"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # последняя корзина — +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self) -> Iterator[Tuple[str, int]]:
+        total = 0
+        for bound, count in zip(self.buckets + (float('inf'),), self.counts):
+            total += count
+            yield ('+Inf' if bound == float('inf') else repr(float(bound))), total
+
+
+class RequestTimings:
+    """Затраты времени одного HTTP-запроса (секунды)"""
+
+    __slots__ = ('queries', 'query_seconds', 'connections', 'connect_seconds', 'spans')
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.connections = 0
+        self.connect_seconds = 0.0
+        self.spans: Dict[str, float] = {}
+
+
+# Метрики текущего запроса; задания потока-писателя выполняются в том же контексте
+_current: ContextVar[Optional[RequestTimings]] = ContextVar('request_timings', default=None)
+
+
+@contextmanager
+def span(name: str):
+    """Засчитать время блока в Server-Timing текущего запроса (без метрик — ничего не делает)"""
+    timings = _current.get()
+    if timings is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timings.spans[name] = timings.spans.get(name, 0.0) + time.perf_counter() - start
+
+
+class Metrics(QueryHook):
+    """Метрики HTTP-запросов и SQLite для /metrics (формат Prometheus) и Server-Timing.
+
+    Подключается к базе (Database(query_hook=metrics)) и к приложению
+    (metrics.init_app(app)). Запросы к базе вне HTTP-запросов (обслуживание,
+    служебные команды писателя) попадают только в общие счётчики.
+    """
+
+    def __init__(self, prefix: str = 'household', buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.prefix = prefix
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        # (method, endpoint) -> длительность запроса
+        self._request_duration: Dict[Tuple[str, str], Histogram] = {}
+        # (method, endpoint, status) -> число запросов
+        self._requests: Dict[Tuple[str, str, int], int] = {}
+        # endpoint -> число SQL-запросов на HTTP-запрос
+        self._queries_per_request: Dict[str, Histogram] = {}
+        # endpoint -> [соединений открыто, время SQL]
+        self._db_by_endpoint: Dict[str, List[float]] = {}
+        self._query_duration = Histogram(self.buckets)
+        self._fetch_seconds = 0.0
+        self._connections = 0
+        self._connect_seconds = 0.0
+
+    # ---------- QueryHook ----------
+    def on_connect(self, seconds: float) -> None:
+        with self._lock:
+            self._connections += 1
+            self._connect_seconds += seconds
+        timings = _current.get()
+        if timings is not None:
+            timings.connections += 1
+            timings.connect_seconds += seconds
+
+    def on_query(self, sql: str, seconds: float) -> None:
+        with self._lock:
+            self._query_duration.observe(seconds)
+        timings = _current.get()
+        if timings is not None:
+            timings.queries += 1
+            timings.query_seconds += seconds
+
+    def on_fetch(self, seconds: float) -> None:
+        with self._lock:
+            self._fetch_seconds += seconds
+        timings = _current.get()
+        if timings is not None:
+            timings.query_seconds += seconds
+
+    # ---------- Flask ----------
+    def init_app(self, app: Flask, path: str = '/metrics') -> None:
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        app.teardown_request(self._teardown_request)
+        app.add_url_rule(path, 'metrics', self._metrics_view, methods=['GET'])
+
+        # jsonify вызывает app.json.response — засчитываем его как сериализацию
+        provider_response = app.json.response
+
+        def response(*args, **kwargs):
+            with span('serialize'):
+                return provider_response(*args, **kwargs)
+        app.json.response = response
+
+    def _before_request(self) -> None:
+        g.metrics_token = _current.set(RequestTimings())
+        g.metrics_start = time.perf_counter()
+
+    def _after_request(self, response: Response) -> Response:
+        timings = _current.get()
+        if timings is None or 'metrics_start' not in g:
+            return response
+        elapsed = time.perf_counter() - g.metrics_start
+        endpoint = request.url_rule.rule if request.url_rule else 'unmatched'
+        self.observe_request(request.method, endpoint, response.status_code, elapsed, timings)
+        response.headers['Server-Timing'] = self.server_timing(timings, elapsed)
+        return response
+
+    def _teardown_request(self, exc) -> None:
+        token = g.pop('metrics_token', None)
+        if token is not None:
+            _current.reset(token)
+
+    def _metrics_view(self) -> Response:
+        return Response(self.render(), mimetype='text/plain; version=0.0.4')
+
+    # ---------- Данные ----------
+    def observe_request(self, method: str, endpoint: str, status: int,
+                        seconds: float, timings: RequestTimings) -> None:
+        with self._lock:
+            key = (method, endpoint)
+            histogram = self._request_duration.get(key)
+            if histogram is None:
+                histogram = self._request_duration[key] = Histogram(self.buckets)
+            histogram.observe(seconds)
+            status_key = (method, endpoint, status)
+            self._requests[status_key] = self._requests.get(status_key, 0) + 1
+            histogram = self._queries_per_request.get(endpoint)
+            if histogram is None:
+                histogram = self._queries_per_request[endpoint] = Histogram(QUERY_COUNT_BUCKETS)
+            histogram.observe(timings.queries)
+            db = self._db_by_endpoint.setdefault(endpoint, [0, 0.0])
+            db[0] += timings.connections
+            db[1] += timings.query_seconds
+
+    @staticmethod
+    def server_timing(timings: RequestTimings, total: float) -> str:
+        """Значение заголовка Server-Timing (длительности в миллисекундах)"""
+        parts = [f'{name};dur={seconds * 1000:.2f}' for name, seconds in timings.spans.items()]
+        parts.append(f'db;dur={timings.query_seconds * 1000:.2f};desc="{timings.queries} queries"')
+        if timings.connections:
+            parts.append(f'connect;dur={timings.connect_seconds * 1000:.2f};desc="{timings.connections} opened"')
+        parts.append(f'total;dur={total * 1000:.2f}')
+        return ', '.join(parts)
+
+    def render(self) -> str:
+        """Все метрики в текстовом формате Prometheus"""
+        p = self.prefix
+        lines: List[str] = []
+        with self._lock:
+            lines += [f'# HELP {p}_http_request_duration_seconds HTTP request latency.',
+                      f'# TYPE {p}_http_request_duration_seconds histogram']
+            for (method, endpoint), histogram in sorted(self._request_duration.items()):
+                lines += _histogram_lines(f'{p}_http_request_duration_seconds', histogram,
+                                          f'method="{method}",endpoint="{_escape(endpoint)}"')
+
+            lines += [f'# HELP {p}_http_requests_total HTTP requests by status.',
+                      f'# TYPE {p}_http_requests_total counter']
+            for (method, endpoint, status), count in sorted(self._requests.items()):
+                lines.append(f'{p}_http_requests_total{{method="{method}",endpoint="{_escape(endpoint)}",'
+                             f'status="{status}"}} {count}')
+
+            lines += [f'# HELP {p}_db_queries_per_request SQL statements executed per HTTP request.',
+                      f'# TYPE {p}_db_queries_per_request histogram']
+            for endpoint, histogram in sorted(self._queries_per_request.items()):
+                lines += _histogram_lines(f'{p}_db_queries_per_request', histogram,
+                                          f'endpoint="{_escape(endpoint)}"')
+
+            lines += [f'# HELP {p}_db_request_seconds_total Time spent in SQLite per endpoint.',
+                      f'# TYPE {p}_db_request_seconds_total counter']
+            for endpoint, (_, seconds) in sorted(self._db_by_endpoint.items()):
+                lines.append(f'{p}_db_request_seconds_total{{endpoint="{_escape(endpoint)}"}} {seconds!r}')
+
+            lines += [f'# HELP {p}_db_request_connections_opened_total Connections opened while serving an endpoint.',
+                      f'# TYPE {p}_db_request_connections_opened_total counter']
+            for endpoint, (connections, _) in sorted(self._db_by_endpoint.items()):
+                lines.append(f'{p}_db_request_connections_opened_total{{endpoint="{_escape(endpoint)}"}} '
+                             f'{int(connections)}')
+
+            lines += [f'# HELP {p}_db_query_duration_seconds SQL statement execution time.',
+                      f'# TYPE {p}_db_query_duration_seconds histogram']
+            lines += _histogram_lines(f'{p}_db_query_duration_seconds', self._query_duration, '')
+
+            lines += [f'# HELP {p}_db_fetch_seconds_total Time spent reading result rows.',
+                      f'# TYPE {p}_db_fetch_seconds_total counter',
+                      f'{p}_db_fetch_seconds_total {self._fetch_seconds!r}',
+                      f'# HELP {p}_db_connections_opened_total SQLite connections opened.',
+                      f'# TYPE {p}_db_connections_opened_total counter',
+                      f'{p}_db_connections_opened_total {self._connections}',
+                      f'# HELP {p}_db_connect_seconds_total Time spent opening SQLite connections.',
+                      f'# TYPE {p}_db_connect_seconds_total counter',
+                      f'{p}_db_connect_seconds_total {self._connect_seconds!r}']
+        return '\n'.join(lines) + '\n'
+
+
+def _histogram_lines(name: str, histogram: Histogram, labels: str) -> List[str]:
+    sep = ',' if labels else ''
+    lines = [f'{name}_bucket{{{labels}{sep}le="{bound}"}} {count}' for bound, count in histogram.cumulative()]
+    suffix = f'{{{labels}}}' if labels else ''
+    lines.append(f'{name}_sum{suffix} {histogram.sum!r}')
+    lines.append(f'{name}_count{suffix} {histogram.count}')
+    return lines
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
@@ -1,32 +1,48 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, List, Optional, Tuple
 
-@dataclass
+# Домохозяйство, к которому относятся данные однодомных баз (и старых баз до разделения)
+DEFAULT_HOUSEHOLD_ID = 1
+
+# __slots__: объектов в ответах API много, без __dict__ они меньше и быстрее создаются.
+# frozen=True не используется: сгенерированный __init__ тогда присваивает поля
+# через object.__setattr__ и создание объекта замедляется в несколько раз
+@dataclass(slots=True)
 class Task:
     id: int
     name: str
     interval_days: int
     last_done: Optional[datetime] = None
     last_done_by: Optional[int] = None
+    next_due: Optional[datetime] = None  # last_done + interval_days, хранится в БД
     # created_at: Optional[datetime] = None
     
-    def days_since_done(self) -> Optional[int]:
+    def days_since_done(self, now: Optional[datetime] = None) -> Optional[int]:
         if not self.last_done:
             return None
-        return (datetime.now() - self.last_done).days
+        return ((now or datetime.now()) - self.last_done).days
     
-    def is_overdue(self) -> bool:
+    def is_overdue(self, now: Optional[datetime] = None) -> bool:
         if not self.last_done:
             return True
-        return self.days_since_done() >= self.interval_days
+        if self.next_due:
+            # То же, что days_since_done() >= interval_days, но без пересчёта
+            return (now or datetime.now()) >= self.next_due
+        return self.days_since_done(now) >= self.interval_days
     
-    def days_until_due(self) -> int:
+    def days_until_due(self, now: Optional[datetime] = None) -> int:
         if not self.last_done:
             return self.interval_days  # Изменено с 0 на interval_days
-        days_passed = self.days_since_done() or 0
+        days_passed = self.days_since_done(now) or 0
         return max(0, self.interval_days - days_passed)
         
+    def status_valid_until(self, now: Optional[datetime] = None) -> Optional[datetime]:
+        """Момент, когда изменятся days_since_done / is_overdue / days_until_due"""
+        if not self.last_done:
+            return None  # Без выполнения статус от времени не зависит
+        return self.last_done + timedelta(days=(self.days_since_done(now) or 0) + 1)
+
     def get_status_emoji(self) -> str:
         """Получить смайлик статуса"""
         if self.last_done is None:
@@ -54,7 +70,7 @@ class Task:
         
         return status_text
 
-@dataclass
+@dataclass(slots=True)
 class ShoppingItem:
     id: int
     item_text: str
@@ -68,4 +84,39 @@ class ShoppingItem:
         return f"{status} {text} (категория: {self.category})"  # для отладки
     
     def toggle_checked(self) -> None:
-        self.is_checked = not self.is_checked
\ No newline at end of file
+        self.is_checked = not self.is_checked
+
+@dataclass(slots=True)
+class ShoppingSuggestion:
+    """Покупка из словаря домохозяйства (подсказка при добавлении)"""
+    item_text: str
+    category: str  # категория, в которой покупали чаще всего
+    uses: int  # сколько раз добавляли в список
+    categories: Dict[str, int] = field(default_factory=dict)  # сколько раз — по категориям
+
+@dataclass(slots=True)
+class Household:
+    id: int
+    name: str
+
+@dataclass(slots=True)
+class Reminder:
+    """Напоминание о задаче, у которой наступил срок"""
+    household_id: int
+    task: Task
+    recipients: List[Tuple[int, str]]  # (chat_id, username) участников домохозяйства
+    repeat: int = 0  # 0 — первое напоминание о сроке, дальше — номер повтора
+
+    def text(self) -> str:
+        names = dict(self.recipients)
+        return self.task.format_status(lambda chat_id: names.get(chat_id, str(chat_id)))
+
+@dataclass(slots=True)
+class Dashboard:
+    """Сводка для главного экрана"""
+    tasks_total: int
+    tasks_overdue: int
+    shopping_unchecked: int
+    shopping_checked: int
+    next_task: Optional[Task] = None  # ближайшая по сроку; первыми — ни разу не выполнявшиеся
+    next_overdue_at: Optional[datetime] = None  # когда станет просроченной следующая задача
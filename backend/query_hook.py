@@ -0,0 +1,85 @@
+import sqlite3
+import time
+from typing import Type
+
+
+class QueryHook:
+    """Наблюдатель за работой SQLite: открытия соединений и запросы.
+
+    Передаётся в Database(query_hook=...); соединения тогда создаются классом
+    из connection_factory(), который замеряет время и вызывает методы ниже.
+    Без хука используется обычный sqlite3.Connection и накладных расходов нет.
+    """
+
+    def on_connect(self, seconds: float) -> None:
+        """Открыто новое соединение"""
+
+    def on_query(self, sql: str, seconds: float) -> None:
+        """Выполнен execute/executemany/executescript"""
+
+    def on_fetch(self, seconds: float) -> None:
+        """Дочитаны строки результата (fetchone/fetchmany/fetchall)"""
+
+    def connection_factory(self) -> Type[sqlite3.Connection]:
+        hook = self
+
+        class Connection(_InstrumentedConnection):
+            _hook = hook
+        return Connection
+
+
+class _InstrumentedCursor(sqlite3.Cursor):
+    def _timed(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            self.connection._hook.on_query(args[0], time.perf_counter() - start)
+
+    def execute(self, sql, parameters=()):
+        return self._timed(sqlite3.Cursor.execute, sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self._timed(sqlite3.Cursor.executemany, sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self._timed(sqlite3.Cursor.executescript, sql_script)
+
+    # Основная часть работы SELECT выполняется при чтении строк, а не в execute
+    def _fetch(self, method, *args):
+        start = time.perf_counter()
+        try:
+            return method(self, *args)
+        finally:
+            self.connection._hook.on_fetch(time.perf_counter() - start)
+
+    def fetchone(self):
+        return self._fetch(sqlite3.Cursor.fetchone)
+
+    def fetchmany(self, size=None):
+        return self._fetch(sqlite3.Cursor.fetchmany, size if size is not None else self.arraysize)
+
+    def fetchall(self):
+        return self._fetch(sqlite3.Cursor.fetchall)
+
+
+class _InstrumentedConnection(sqlite3.Connection):
+    _hook: QueryHook
+
+    def __init__(self, *args, **kwargs):
+        start = time.perf_counter()
+        super().__init__(*args, **kwargs)
+        self._hook.on_connect(time.perf_counter() - start)
+
+    def cursor(self, factory=_InstrumentedCursor):
+        return super().cursor(factory)
+
+    # Connection.execute* вызывают execute курсора в обход Python-методов
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+    def executescript(self, sql_script):
+        return self.cursor().executescript(sql_script)
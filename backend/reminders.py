@@ -0,0 +1,431 @@
+"""Напоминания о задачах, у которых наступил срок.
+
+Задачи со сроком лежат в куче по времени срабатывания: поток движка спит
+до ближайшего срока, а выполнение задачи, новый интервал или удаление
+приходят событиями EventBus и меняют кучу за O(log n) — без периодического
+перебора всех задач всех домохозяйств.
+
+О задаче напоминают один раз, когда она становится просроченной, и — с
+repeat — каждые repeat секунд, пока её не выполнят. Задачи, просроченные ещё
+до запуска движка, сразу не напоминаются (иначе каждый перезапуск повторял
+бы все напоминания), только по расписанию repeat.
+"""
+import abc
+import heapq
+import itertools
+import logging
+import math
+import os
+import threading
+import time
+import urllib.request
+import weakref
+from collections import deque
+from typing import Deque, Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: без межпроцессной блокировки
+    fcntl = None
+
+from database import Database
+from events import Event
+from households import Households
+from json_provider import get_json_encoder
+from models import Reminder, Task
+from serializers import reminder_to_dict
+
+logger = logging.getLogger(__name__)
+
+# События базы, после которых срок задачи мог измениться
+TASK_EVENTS = ('task_changed', 'task_deleted')
+# Пауза перед повтором после ошибки чтения базы
+ERROR_RETRY_SECONDS = 5.0
+
+
+# ================== ПРИЁМНИКИ ==================
+class ReminderSink(abc.ABC):
+    """Куда доставлять напоминания; send вызывается из потока движка"""
+
+    @abc.abstractmethod
+    def send(self, reminder: Reminder) -> None:
+        ...
+
+
+class LogSink(ReminderSink):
+    def send(self, reminder: Reminder) -> None:
+        logger.info(f"⏰ Reminder for household {reminder.household_id}: {reminder.text()}")
+
+
+class EventSink(ReminderSink):
+    """Событие 'task_due' в /events домохозяйства.
+
+    EventBus у каждого процесса свой: событие получат клиенты, подключённые
+    к процессу, в котором работает движок.
+    """
+
+    def __init__(self, households: Households):
+        self.households = households
+
+    def send(self, reminder: Reminder) -> None:
+        db = self.households.acquire(reminder.household_id)
+        try:
+            db.events.publish('task_due', scope=reminder.household_id,
+                              task_id=reminder.task.id, repeat=reminder.repeat)
+        finally:
+            self.households.release(reminder.household_id)
+
+
+class WebhookSink(ReminderSink):
+    """POST напоминания в JSON на url (бот, локальный сервис уведомлений)"""
+
+    def __init__(self, url: str, timeout: float = 5.0, headers: Optional[Dict[str, str]] = None):
+        self.url = url
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json', **(headers or {})}
+        self._encode = get_json_encoder()
+
+    def send(self, reminder: Reminder) -> None:
+        request = urllib.request.Request(self.url, data=self._encode(reminder_to_dict(reminder)),
+                                         headers=self.headers, method='POST')
+        with urllib.request.urlopen(request, timeout=self.timeout) as response:
+            response.read()
+
+
+# ================== ДВИЖОК ==================
+class _Entry:
+    """Запись кучи; при изменении задачи старая запись помечается недействительной"""
+    __slots__ = ('fire_at', 'seq', 'key', 'due', 'count', 'valid')
+
+    def __init__(self, fire_at: float, seq: int, key: Tuple[int, int], due: float, count: int):
+        self.fire_at = fire_at
+        self.seq = seq
+        self.key = key  # (household_id, task_id)
+        self.due = due  # next_due задачи, для которого запланировано напоминание
+        self.count = count
+        self.valid = True
+
+    def __lt__(self, other: '_Entry') -> bool:
+        return (self.fire_at, self.seq) < (other.fire_at, other.seq)
+
+
+class ReminderEngine:
+    """Очередь напоминаний по сроку задач.
+
+    Изменения задач в этом процессе приходят событиями баз (основной и
+    открытых баз домохозяйств). Если счётчики версий общие для процессов
+    (DB_SHARED_VERSIONS), раз в poll_interval секунд сравнивается снимок ячеек
+    таблицы tasks, и задачи домохозяйств изменившихся ячеек перечитываются:
+    так видны изменения, сделанные другими воркерами. Файлы домохозяйств,
+    не открытые в процессе движка, читаются при открытии; до этого изменения
+    в них из других процессов проверяются только в момент срабатывания.
+    """
+
+    def __init__(self, households: Households, sinks: Iterable[ReminderSink],
+                 repeat: Optional[float] = None, poll_interval: float = 60.0,
+                 lock_path: Optional[str] = None):
+        self.households = households
+        self.db = households.db
+        self.sinks = list(sinks)
+        self.repeat = repeat
+        self.poll_interval = poll_interval
+        # Как у MaintenanceScheduler: из нескольких процессов напоминает только
+        # захвативший блокировку
+        self.lock_path = lock_path if fcntl is not None else None
+        self._lock_fd: Optional[int] = None
+        # stop() и завершающийся поток освобождают блокировку независимо
+        self._lock_guard = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        self._cond = threading.Condition()
+        # (событие, household_id, task_id) или ('load', household_id, база)
+        self._pending: Deque[tuple] = deque()
+        self._heap: List[_Entry] = []
+        self._entries: Dict[Tuple[int, int], _Entry] = {}
+        self._stale = 0
+        self._seq = itertools.count()
+        # Срок, о котором уже напомнили: повторно — только по repeat
+        self._reminded: Dict[Tuple[int, int], float] = {}
+        self._active_since = 0.0
+        self._versions: Optional[List[int]] = None
+        # Версия tasks открытых баз домохозяйств (Households с отдельными файлами)
+        self._household_versions: Dict[int, int] = {}
+        self._next_poll = 0.0
+        self._watched: 'weakref.WeakSet[Database]' = weakref.WeakSet()
+        # Связанные методы создаются заново при каждом обращении, а
+        # remove_listener сравнивает по is
+        self._event_listener = self._on_event
+        self._open_listener = self._on_open
+
+    def start(self) -> None:
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='reminders', daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: Optional[float] = 5.0) -> None:
+        self._stop.set()
+        with self._cond:
+            self._cond.notify()
+        if self._thread:
+            self._thread.join(timeout)
+        self._release_lock()
+
+    def scheduled_count(self) -> int:
+        """Сколько задач ждут напоминания"""
+        with self._cond:
+            return len(self._entries)
+
+    def _acquire_lock(self) -> bool:
+        if self.lock_path is None or self._lock_fd is not None:
+            return True
+        fd = os.open(self.lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        return True
+
+    def _release_lock(self) -> None:
+        with self._lock_guard:
+            fd, self._lock_fd = self._lock_fd, None
+        if fd is not None:
+            os.close(fd)
+
+    # ---------- поток движка ----------
+    def _run(self) -> None:
+        while not self._acquire_lock():
+            if self._stop.wait(self.poll_interval):
+                return
+        try:
+            while not self._stop.is_set():
+                try:
+                    self._activate()
+                    break
+                except Exception as e:
+                    logger.error(f"Reminder engine activation failed, retrying: {e}")
+                    self._stop.wait(self.poll_interval)
+            while not self._stop.is_set():
+                try:
+                    self._iterate()
+                except Exception as e:
+                    # Ошибка одного прохода (база недоступна и т.п.) не должна
+                    # останавливать напоминания до перезапуска
+                    logger.error(f"Reminder engine iteration failed: {e}")
+                    self._stop.wait(ERROR_RETRY_SECONDS)
+                finally:
+                    self.db.release_connection()
+        finally:
+            self.households.remove_open_listener(self._open_listener)
+            for db in list(self._watched):
+                db.events.remove_listener(self._event_listener)
+            # Блокировку — другому воркеру, даже если поток завершился не через stop()
+            self._release_lock()
+
+    def _iterate(self) -> None:
+        with self._cond:
+            if not self._pending and not self._stop.is_set():
+                self._cond.wait(self._timeout())
+            pending = list(self._pending)
+            self._pending.clear()
+        for item in pending:
+            try:
+                self._apply(*item)
+            except Exception as e:
+                logger.error(f"Reminder update {item[:2]} failed: {e}")
+        self._fire_due()
+        self._poll_versions()
+
+    def _activate(self) -> None:
+        self._active_since = time.time()
+        self._watch(self.db)
+        self.households.add_open_listener(self._open_listener)
+        for household_id, db in self.households.opened():
+            self._on_open(household_id, db)
+        self._load(self.db, None)
+        if self.db.versions.path is not None:
+            self._versions = self.db.versions.snapshot('tasks')
+            self._next_poll = time.monotonic() + self.poll_interval
+        logger.info(f"Reminder engine started: {len(self._entries)} tasks scheduled")
+
+    def _timeout(self) -> Optional[float]:
+        """Сколько спать: до ближайшего срока или до сверки версий"""
+        while self._heap and not self._heap[0].valid:
+            heapq.heappop(self._heap)
+            self._stale -= 1
+        timeout = None
+        if self._versions is not None:
+            timeout = max(0.0, self._next_poll - time.monotonic())
+        if self._heap:
+            until_due = max(0.0, self._heap[0].fire_at - time.time())
+            timeout = until_due if timeout is None else min(timeout, until_due)
+        return timeout
+
+    # ---------- события ----------
+    def _watch(self, db: Database) -> None:
+        if db not in self._watched:
+            self._watched.add(db)
+            db.events.add_listener(self._event_listener)
+
+    def _on_event(self, event: Event, scope: Optional[int]) -> None:
+        # Вызывается в потоке, опубликовавшем событие: только ставим в очередь
+        if event.type in TASK_EVENTS and scope is not None:
+            with self._cond:
+                self._pending.append((event.type, scope, event.data.get('task_id')))
+                self._cond.notify()
+
+    def _on_open(self, household_id: int, db: Database) -> None:
+        # Новая открытая база домохозяйства (Households с отдельными файлами)
+        self._watch(db)
+        with self._cond:
+            self._pending.append(('load', household_id, db))
+            self._cond.notify()
+
+    def _apply(self, kind: str, household_id: int, arg) -> None:
+        if kind == 'load':
+            self._load(arg, [household_id])
+            return
+        key = (household_id, arg)
+        if kind == 'task_deleted':
+            self._unschedule(key)
+            self._reminded.pop(key, None)
+            return
+        task = self._read_task(household_id, arg)
+        if task is None or task.next_due is None:
+            self._unschedule(key)
+        else:
+            self._schedule(key, task.next_due.timestamp())
+
+    def _load(self, db: Database, household_ids: Optional[List[int]]) -> None:
+        try:
+            due_times = db.get_task_due_times(household_ids)
+        except Exception as e:
+            # База домохозяйства могла закрыться (вытеснение из LRU) — задачи
+            # подхватятся при следующем открытии
+            logger.warning(f"Cannot load task due times: {e}")
+            return
+        finally:
+            if db is not self.db:
+                db.release_connection()
+        for household_id, task_id, next_due in due_times:
+            self._schedule((household_id, task_id), next_due.timestamp())
+
+    def _read_task(self, household_id: int, task_id: int) -> Optional[Task]:
+        db = self.households.acquire(household_id)
+        try:
+            return db.get_task_by_id(household_id, task_id)
+        finally:
+            if db is not self.db:
+                db.release_connection()
+            self.households.release(household_id)
+
+    # ---------- куча ----------
+    def _push(self, key: Tuple[int, int], fire_at: float, due: float, count: int) -> None:
+        entry = _Entry(fire_at, next(self._seq), key, due, count)
+        with self._cond:
+            self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
+
+    def _unschedule(self, key: Tuple[int, int]) -> None:
+        with self._cond:
+            entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        entry.valid = False
+        self._stale += 1
+        # Ленивое удаление; когда недействительных записей больше половины — пересборка
+        if self._stale > 64 and self._stale * 2 > len(self._heap):
+            self._heap = [e for e in self._heap if e.valid]
+            heapq.heapify(self._heap)
+            self._stale = 0
+
+    def _schedule(self, key: Tuple[int, int], due: float) -> None:
+        entry = self._entries.get(key)
+        if (entry is not None and entry.due == due) or self._reminded.get(key) == due:
+            return
+        self._unschedule(key)
+        self._reminded.pop(key, None)
+        if due >= self._active_since:
+            self._push(key, due, due, 0)
+        elif self.repeat:
+            # Просрочена до запуска: следующий повтор по сетке due + k * repeat
+            count = max(1, math.ceil((time.time() - due) / self.repeat))
+            self._push(key, due + count * self.repeat, due, count)
+
+    def _fire_due(self) -> None:
+        while self._heap and not self._stop.is_set():
+            now = time.time()
+            if self._heap[0].fire_at > now:
+                break
+            entry = heapq.heappop(self._heap)
+            if not entry.valid:
+                self._stale -= 1
+                continue
+            with self._cond:
+                del self._entries[entry.key]
+            try:
+                self._fire(entry, now)
+            except Exception as e:
+                # Напоминание не теряется: повтор после паузы
+                logger.error(f"Reminder for task {entry.key} failed, retrying: {e}")
+                self._push(entry.key, now + ERROR_RETRY_SECONDS, entry.due, entry.count)
+
+    def _fire(self, entry: _Entry, now: float) -> None:
+        household_id, task_id = entry.key
+        # Сверка с базой: изменение из другого процесса могло не дойти событием
+        task = self._read_task(household_id, task_id)
+        if task is None or task.next_due is None:
+            self._reminded.pop(entry.key, None)
+            return
+        due = task.next_due.timestamp()
+        if due != entry.due:
+            self._schedule(entry.key, due)
+            return
+        self._deliver(Reminder(household_id=household_id, task=task,
+                               recipients=self.db.get_household_members(household_id),
+                               repeat=entry.count))
+        self._reminded[entry.key] = due
+        if self.repeat:
+            self._push(entry.key, now + self.repeat, due, entry.count + 1)
+
+    def _deliver(self, reminder: Reminder) -> None:
+        for sink in self.sinks:
+            try:
+                sink.send(reminder)
+            except Exception as e:
+                # Сбой одного приёмника не должен мешать остальным
+                logger.error(f"Reminder sink {type(sink).__name__} failed: {e}")
+
+    # ---------- изменения из других процессов ----------
+    def _poll_versions(self) -> None:
+        if self._versions is None or time.monotonic() < self._next_poll:
+            return
+        self._next_poll = time.monotonic() + self.poll_interval
+        self._poll_households()
+        snapshot = self.db.versions.snapshot('tasks')
+        changed = [slot for slot, (old, new) in enumerate(zip(self._versions, snapshot)) if old != new]
+        self._versions = snapshot
+        if not changed:
+            return
+        # Перечитываются только домохозяйства изменившихся ячеек: при запуске
+        # процесса меняется эпоха, а не счётчики (TableVersions)
+        self._load(self.db, self.db.get_household_ids_in_slots(changed, self.db.versions.slots))
+
+    def _poll_households(self) -> None:
+        opened = dict(self.households.opened())
+        for household_id in list(self._household_versions):
+            if household_id not in opened:
+                del self._household_versions[household_id]
+        for household_id in opened:
+            db = self.households.acquire(household_id)
+            try:
+                version = db.versions.get('tasks', household_id)
+                if self._household_versions.get(household_id, version) != version:
+                    self._load(db, [household_id])
+                self._household_versions[household_id] = version
+            finally:
+                self.households.release(household_id)
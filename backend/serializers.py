@@ -0,0 +1,122 @@
+"""Представление моделей в JSON API (общее для app.py и asgi.py)"""
+import logging
+from datetime import datetime
+from typing import Callable, Iterable, Iterator, Mapping, Optional
+from urllib.parse import urlencode
+
+from models import Dashboard, Household, Reminder, Task, ShoppingItem, ShoppingSuggestion
+
+logger = logging.getLogger(__name__)
+
+
+def task_to_dict(task: Task, now: Optional[datetime] = None) -> dict:
+    # Для списка now передаётся один раз, а не берётся заново для каждой задачи
+    now = now or datetime.now()
+    return {
+        'id': task.id,
+        'name': task.name,
+        'interval_days': task.interval_days,
+        'last_done': task.last_done.isoformat() if task.last_done else None,
+        'last_done_by': task.last_done_by,
+        'next_due': task.next_due.isoformat() if task.next_due else None,
+        # 'created_at': task.created_at.isoformat() if task.created_at else None,
+        'is_overdue': task.is_overdue(now),
+        'days_until_due': task.days_until_due(now),
+        'days_since_done': task.days_since_done(now),
+    }
+
+def shopping_item_to_dict(item: ShoppingItem) -> dict:
+    return {
+        'id': item.id,
+        'item_text': item.item_text,
+        'is_checked': item.is_checked,
+        'category': item.category,
+        # 'created_at': item.created_at.isoformat() if item.created_at else None,
+    }
+
+def shopping_suggestion_to_dict(suggestion: ShoppingSuggestion) -> dict:
+    return {
+        'item_text': suggestion.item_text,
+        'category': suggestion.category,
+        'uses': suggestion.uses,
+        'categories': suggestion.categories,
+    }
+
+def household_to_dict(household: Household, members: list) -> dict:
+    return {
+        'id': household.id,
+        'name': household.name,
+        'members': [{'chat_id': chat_id, 'username': username} for chat_id, username in members],
+    }
+
+def dashboard_to_dict(dashboard: Dashboard, now: Optional[datetime] = None) -> dict:
+    return {
+        'tasks': {'total': dashboard.tasks_total, 'overdue': dashboard.tasks_overdue},
+        'shopping': {
+            'total': dashboard.shopping_unchecked + dashboard.shopping_checked,
+            'unchecked': dashboard.shopping_unchecked,
+            'checked': dashboard.shopping_checked,
+        },
+        'next_task': task_to_dict(dashboard.next_task, now) if dashboard.next_task else None,
+    }
+
+def reminder_to_dict(reminder: Reminder) -> dict:
+    return {
+        'household_id': reminder.household_id,
+        'task': task_to_dict(reminder.task),
+        'recipients': [{'chat_id': chat_id, 'username': username} for chat_id, username in reminder.recipients],
+        'repeat': reminder.repeat,
+        'text': reminder.text(),
+    }
+
+def sync_to_dict(changes: dict) -> dict:
+    now = datetime.now()
+    return {
+        'revision': changes['revision'],
+        'full': changes['full'],
+        'tasks': [task_to_dict(t, now) for t in changes['tasks']],
+        'shopping_items': [shopping_item_to_dict(i) for i in changes['shopping_items']],
+        'deleted': changes['deleted'],
+    }
+
+def json_array_chunks(pages: Iterable[list], to_dict: Callable, dumps: Callable[[list], str]) -> Iterator[str]:
+    """JSON-массив по частям, по фрагменту на страницу объектов"""
+    yield '['
+    first = True
+    for page in pages:
+        if not page:
+            continue
+        chunk = dumps([to_dict(obj) for obj in page]).strip()[1:-1]
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']'
+
+def next_page_link(path: str, args: Mapping[str, str], page: list, limit: int) -> Optional[str]:
+    """Заголовок Link на следующую страницу; None — страница последняя"""
+    if len(page) < limit:
+        return None
+    args = {**args, 'limit': limit, 'after_id': page[-1].id}
+    return f'<{path}?{urlencode(args)}>; rel="next"'
+
+def batch_result(op: str, result) -> dict:
+    """Ответ на одну операцию POST /batch по результату Database.apply_batch"""
+    if isinstance(result, Exception):
+        logger.error(f"Batch operation {op} failed: {result}")
+        return {'status': 500, 'error': 'Internal error'}
+    if op == 'add_shopping_item':
+        if result is None:
+            return {'status': 409, 'error': 'Item already exists (unchecked)'}
+        return {'status': 201, 'item': shopping_item_to_dict(result)}
+    if op == 'toggle_shopping_item':
+        if result is False:
+            return {'status': 409, 'error': 'Item already exists (unchecked)'}
+        if result is None:
+            return {'status': 404, 'error': 'Item not found'}
+        return {'status': 200, 'item': shopping_item_to_dict(result)}
+    if op == 'add_task':
+        if result is None:
+            return {'status': 409, 'error': 'Task with this name already exists'}
+        return {'status': 201, 'task': task_to_dict(result)}
+    if result is None:
+        return {'status': 404, 'error': 'Task not found'}
+    return {'status': 200, 'task': task_to_dict(result)}
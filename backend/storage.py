@@ -0,0 +1,51 @@
+import sqlite3
+import logging
+from dataclasses import dataclass
+from typing import Dict, Union
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StorageProfile:
+    """Набор PRAGMA, применяемых к каждому новому соединению"""
+    journal_mode: str = 'WAL'
+    synchronous: str = 'NORMAL'
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 8192
+    mmap_size: int = 128 * 1024 * 1024
+    # Действует только для новой (пустой) базы; для существующей нужен VACUUM
+    auto_vacuum: str = 'INCREMENTAL'
+
+    def apply(self, conn: sqlite3.Connection) -> None:
+        conn.execute(f"PRAGMA auto_vacuum = {self.auto_vacuum}")
+        mode = conn.execute(f"PRAGMA journal_mode = {self.journal_mode}").fetchone()[0]
+        if mode.upper() != self.journal_mode.upper():
+            # Например, WAL недоступен для :memory: или на сетевых ФС
+            logger.warning(f"journal_mode={self.journal_mode} not applied, using {mode}")
+        conn.execute(f"PRAGMA synchronous = {self.synchronous}")
+        conn.execute(f"PRAGMA busy_timeout = {int(self.busy_timeout_ms)}")
+        # Отрицательное значение cache_size задаётся в КиБ, а не в страницах
+        conn.execute(f"PRAGMA cache_size = -{int(self.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size = {int(self.mmap_size)}")
+
+
+STORAGE_PROFILES: Dict[str, StorageProfile] = {
+    # WAL + NORMAL: читатели не блокируются писателем, fsync только на checkpoint
+    'default': StorageProfile(),
+    # Каждый коммит сбрасывается на диск (медленнее, но без потери последних транзакций)
+    'durable': StorageProfile(synchronous='FULL'),
+    # Поведение SQLite по умолчанию, как было до профилей
+    'legacy': StorageProfile(journal_mode='DELETE', synchronous='FULL', mmap_size=0, auto_vacuum='NONE'),
+}
+
+
+def get_storage_profile(profile: Union[str, StorageProfile]) -> StorageProfile:
+    if isinstance(profile, StorageProfile):
+        return profile
+    try:
+        return STORAGE_PROFILES[profile]
+    except KeyError:
+        raise ValueError(
+            f"Unknown storage profile '{profile}', expected one of: {', '.join(STORAGE_PROFILES)}"
+        )
@@ -0,0 +1,176 @@
+"""Подсказки при добавлении покупок (GET /shopping/suggest).
+
+Индекс строится в памяти по словарю покупок домохозяйства
+(shopping_dictionary) и дополняется изменёнными строками словаря:
+- по началу названия или любого его слова — бинарный поиск по
+  отсортированному списку слов, O(log n + найденные);
+- с опечатками (от 3 символов) — по общим триграммам, как в pg_trgm,
+  если по началу нашлось меньше limit.
+Регистр и ё/е не различаются (normalize_item_text): NOCASE и LIKE в SQLite
+складывают регистр только у латиницы.
+"""
+import bisect
+import heapq
+import itertools
+import threading
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from models import ShoppingSuggestion
+
+# Доля триграмм запроса, которые должны найтись в названии
+SIMILARITY_THRESHOLD = 0.4
+FUZZY_MIN_LENGTH = 3
+
+
+def normalize_item_text(text: str) -> str:
+    """'  Зелёный  Чай' -> 'зеленый чай'"""
+    return ' '.join(text.casefold().replace('ё', 'е').split())
+
+
+def _trigrams(key: str, partial: bool = False) -> Set[str]:
+    # partial: запрос набирается, последнее слово может быть не закончено
+    words = key.split()
+    grams = set()
+    for i, word in enumerate(words):
+        padded = f'  {word}' if partial and i == len(words) - 1 else f'  {word} '
+        grams.update(padded[j:j + 3] for j in range(len(padded) - 2))
+    return grams
+
+
+class SuggestionIndex:
+    """Индекс словаря покупок одного домохозяйства.
+
+    Словарь только растёт, поэтому индекс не перестраивается при каждом
+    изменении: apply() дописывает строки с revision больше уже загруженной.
+    Записи (ShoppingSuggestion) после выдачи не меняются — изменённая строка
+    заменяет запись целиком.
+    """
+
+    def __init__(self):
+        self.revision = 0  # наибольшая загруженная revision словаря
+        self._lock = threading.Lock()
+        self._ids: Dict[str, int] = {}  # item_key -> номер записи
+        self._keys: List[str] = []
+        self._entries: List[ShoppingSuggestion] = []
+        self._recency: List[int] = []  # revision последнего добавления записи
+        self._row_revisions: Dict[Tuple[str, str], int] = {}  # (item_key, категория) -> revision
+        self._words: List[Tuple[str, int]] = []  # (слово названия, номер записи), по порядку
+        # Триграммы нужны только при поиске с опечатками — строятся при первом таком запросе
+        self._grams: Optional[Dict[str, List[int]]] = None
+        self._gram_counts: List[int] = []
+        self._ranked: Optional[List[int]] = None  # все записи по популярности, для пустого запроса
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def apply(self, rows: Iterable[Tuple[str, str, str, int, int]]) -> None:
+        """rows: (item_key, category, item_text, uses, revision) из shopping_dictionary.
+
+        uses в строке — итог по (название, категория), поэтому повторное
+        применение той же строки ничего не меняет, а строка старше уже
+        применённой (параллельная дозагрузка) пропускается.
+        """
+        with self._lock:
+            new_words: List[Tuple[str, int]] = []
+            for key, category, item_text, uses, revision in rows:
+                if self._row_revisions.get((key, category), 0) >= revision:
+                    continue
+                self._row_revisions[key, category] = revision
+                entry_id = self._ids.get(key)
+                if entry_id is None:
+                    entry_id = self._add_key(key, new_words)
+                    old = ShoppingSuggestion(item_text, category, 0)
+                else:
+                    old = self._entries[entry_id]
+                categories = {**old.categories, category: uses}
+                entry = ShoppingSuggestion(
+                    # Написание — как в последний раз
+                    item_text=item_text if revision >= self._recency[entry_id] else old.item_text,
+                    category=max(categories, key=categories.get),
+                    uses=sum(categories.values()),
+                    categories=categories,
+                )
+                self._entries[entry_id] = entry
+                self._recency[entry_id] = max(self._recency[entry_id], revision)
+                self.revision = max(self.revision, revision)
+            if len(new_words) > 64:
+                # Первая загрузка словаря: одна сортировка вместо вставки каждого слова
+                self._words.extend(new_words)
+                self._words.sort()
+            else:
+                for word in new_words:
+                    bisect.insort(self._words, word)
+            self._ranked = None
+
+    def _add_key(self, key: str, new_words: List[Tuple[str, int]]) -> int:
+        entry_id = len(self._keys)
+        self._ids[key] = entry_id
+        self._keys.append(key)
+        self._entries.append(None)
+        self._recency.append(0)
+        new_words.extend((word, entry_id) for word in set(key.split()))
+        if self._grams is not None:
+            self._index_trigrams(entry_id)
+        return entry_id
+
+    def _rank(self, entry_id: int) -> tuple:
+        # Чаще покупаемые, затем недавние — первыми
+        return -self._entries[entry_id].uses, -self._recency[entry_id]
+
+    def search(self, query: str, limit: int = 10, category: Optional[str] = None) -> List[ShoppingSuggestion]:
+        """Подсказки по началу названия, затем похожие; пустой query — самые частые"""
+        query = normalize_item_text(query)
+        allowed = (lambda entry_id: category in self._entries[entry_id].categories) if category \
+            else (lambda entry_id: True)
+        with self._lock:
+            if not query:
+                if self._ranked is None:
+                    self._ranked = sorted(range(len(self._entries)), key=self._rank)
+                return [self._entries[i] for i in itertools.islice(filter(allowed, self._ranked), limit)]
+
+            found = self._prefix_matches(query, allowed, limit)
+            if len(found) < limit and len(query) >= FUZZY_MIN_LENGTH:
+                seen = set(found)
+                found += [entry_id for entry_id in self._fuzzy_matches(query, allowed, limit + len(found))
+                          if entry_id not in seen][:limit - len(found)]
+            return [self._entries[i] for i in found]
+
+    def _prefix_matches(self, query: str, allowed, limit: int) -> List[int]:
+        words = query.split()
+        first, rest = words[0], words[1:]
+        start = bisect.bisect_left(self._words, (first,))
+        candidates = set()
+        for word, entry_id in itertools.islice(self._words, start, None):
+            if not word.startswith(first):
+                break
+            candidates.add(entry_id)
+        keys = self._keys
+        # Совпадение с начала названия — выше совпадения по слову; каждое
+        # следующее слово запроса — начало какого-то слова названия
+        matches = [(not keys[i].startswith(query), self._rank(i), i) for i in candidates
+                   if allowed(i) and all(any(kw.startswith(w) for kw in keys[i].split()) for w in rest)]
+        return [i for _, _, i in heapq.nsmallest(limit, matches)]
+
+    def _index_trigrams(self, entry_id: int) -> None:
+        grams = _trigrams(self._keys[entry_id])
+        self._gram_counts.append(len(grams))
+        for gram in grams:
+            self._grams.setdefault(gram, []).append(entry_id)
+
+    def _fuzzy_matches(self, query: str, allowed, limit: int) -> List[int]:
+        if self._grams is None:
+            self._grams = {}
+            for entry_id in range(len(self._keys)):
+                self._index_trigrams(entry_id)
+        grams = _trigrams(query, partial=True)
+        shared = Counter()
+        for gram in grams:
+            shared.update(self._grams.get(gram, ()))
+        scored = []
+        for entry_id, count in shared.items():
+            similarity = count / len(grams)
+            if similarity >= SIMILARITY_THRESHOLD and allowed(entry_id):
+                # При равной доле — название ближе по длине, затем популярнее
+                scored.append((-similarity, self._gram_counts[entry_id] - count, self._rank(entry_id), entry_id))
+        return [entry_id for *_, entry_id in heapq.nsmallest(limit, scored)]
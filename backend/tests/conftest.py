@@ -0,0 +1,94 @@
+"""Общие фикстуры тестов бэкенда: python -m pytest tests (из каталога backend)"""
+import itertools
+import os
+import sqlite3
+import sys
+import types
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database import Database  # noqa: E402
+
+# Схема базы до всех миграций (как её создавала первая версия Database)
+BASELINE_SCHEMA = '''
+    CREATE TABLE users (
+        chat_id INTEGER PRIMARY KEY,
+        username TEXT
+    );
+    CREATE TABLE tasks (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        interval_days INTEGER NOT NULL,
+        last_done TIMESTAMP,
+        last_done_by INTEGER,
+        FOREIGN KEY (last_done_by) REFERENCES users(chat_id)
+    );
+    CREATE TABLE task_history (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        task_id INTEGER,
+        done_by INTEGER,
+        done_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        FOREIGN KEY (task_id) REFERENCES tasks(id),
+        FOREIGN KEY (done_by) REFERENCES users(chat_id)
+    );
+    CREATE INDEX idx_task_history_date ON task_history(done_at);
+    CREATE INDEX idx_task_history_task ON task_history(task_id);
+    CREATE TABLE shopping_items (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        item_text TEXT NOT NULL,
+        is_checked BOOLEAN DEFAULT 0,
+        category TEXT DEFAULT 'supermarket'
+    );
+'''
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    return str(tmp_path / 'test.db')
+
+
+@pytest.fixture
+def db(db_path):
+    database = Database(db_path)
+    yield database
+    database.close()
+
+
+@pytest.fixture
+def baseline(db_path):
+    """Соединение с базой в исходной схеме: тест заполняет её и закрывает"""
+    conn = sqlite3.connect(db_path)
+    conn.executescript(BASELINE_SCHEMA)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture(scope='session')
+def app_module(tmp_path_factory):
+    """app.py с базой во временном каталоге; модуль приложения один на все тесты"""
+    config = types.ModuleType('config')
+    config.DATABASE_PATH = str(tmp_path_factory.mktemp('app') / 'app.db')
+    config.REMINDERS_ENABLED = False
+    sys.modules['config'] = config
+    import app
+    yield app
+    app.maintenance.stop()
+    app.households.close()
+    app.db.close()
+
+
+_chat_ids = itertools.count(1000)
+
+
+@pytest.fixture
+def api(app_module):
+    """Тестовый клиент от имени нового пользователя в своём пустом домохозяйстве"""
+    household = app_module.db.create_household('Тест', with_default_tasks=False)
+    chat_id = next(_chat_ids)
+    app_module.households.add_user(chat_id, f'user{chat_id}', household.id)
+    client = app_module.app.test_client()
+    client.environ_base['HTTP_X_CHAT_ID'] = str(chat_id)
+    client.chat_id, client.household_id = chat_id, household.id
+    return client
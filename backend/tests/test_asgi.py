@@ -0,0 +1,98 @@
+import asyncio
+import json
+
+import pytest
+
+from async_database import AsyncDatabase
+from models import DEFAULT_HOUSEHOLD_ID
+
+
+def test_async_database_runs_methods_in_pool(db):
+    facade = AsyncDatabase(db, max_workers=2)
+
+    async def scenario():
+        task = await facade.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 7)
+        return task, await facade.get_task_by_id(DEFAULT_HOUSEHOLD_ID, task.id)
+
+    try:
+        task, loaded = asyncio.run(scenario())
+        assert loaded == task
+        # Не методы отдаются как есть; соединения потоков пула возвращены
+        assert facade.versions is db.versions
+        assert db.pool.stats()['in_use'] == 0
+    finally:
+        facade._executor.shutdown(wait=True)
+
+
+@pytest.fixture(scope='session')
+def asgi_module(app_module):
+    """asgi.py с тем же config, что у app_module: две точки входа на одной базе"""
+    import asgi
+    yield asgi
+    asgi.households.close()
+    asgi.db.close()
+
+
+@pytest.fixture
+def call(asgi_module, app_module, api):
+    """Запрос к ASGI-приложению от имени пользователя api: (статус, заголовки, JSON)"""
+    def call(method, path, body=None, headers=None):
+        headers = {'x-chat-id': str(api.chat_id), **(headers or {})}
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': b'',
+            'headers': [(k.encode(), v.encode()) for k, v in headers.items() if v is not None],
+        }
+        incoming = [{'type': 'http.request', 'body': json.dumps(body).encode() if body is not None else b''}]
+        sent = []
+
+        async def receive():
+            return incoming.pop(0) if incoming else {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        asyncio.run(asgi_module.app(scope, receive, send))
+        response_headers = {k.decode(): v.decode() for k, v in sent[0]['headers']}
+        data = b''.join(m.get('body', b'') for m in sent[1:])
+        return sent[0]['status'], response_headers, json.loads(data) if data else None
+    return call
+
+
+def test_asgi_task_routes(call):
+    status, _, task = call('POST', '/tasks', {'name': 'Окна', 'interval_days': 7})
+    assert status == 201 and task['name'] == 'Окна'
+    assert call('POST', '/tasks', {'name': 'Окна', 'interval_days': 7})[0] == 409
+    status, _, task = call('PATCH', f"/tasks/{task['id']}", {'interval_days': 3})
+    assert status == 200 and task['interval_days'] == 3
+    assert call('PATCH', '/tasks/999999', {'interval_days': 3})[0] == 404
+    status, headers, tasks = call('GET', '/tasks')
+    assert status == 200 and [t['name'] for t in tasks] == ['Окна']
+    assert call('GET', '/tasks', headers={'if-none-match': headers['etag']})[0] == 304
+
+
+def test_asgi_matches_flask_app(call, api):
+    call('POST', '/shopping', {'item_text': 'Молоко', 'category': 'dairy'})
+    assert call('GET', '/shopping')[2] == api.get('/shopping').get_json()
+    api.post('/tasks', json={'name': 'Пол', 'interval_days': 2})
+    assert call('GET', '/dashboard')[2] == api.get('/dashboard').get_json()
+
+
+def test_asgi_auth_errors(call):
+    assert call('GET', '/tasks', headers={'x-chat-id': None})[0] == 401
+    assert call('GET', '/tasks', headers={'x-chat-id': 'abc'})[0] == 400
+    status, _, body = call('GET', '/tasks', headers={'x-chat-id': '999'})
+    assert (status, body) == (403, {'error': 'User not found'})
+    assert call('GET', '/missing')[0] == 404
+
+
+def test_asgi_update_of_task_deleted_meanwhile_is_404(call, asgi_module, api, monkeypatch):
+    task = call('POST', '/tasks', {'name': 'Окна', 'interval_days': 7})[2]
+    db = asgi_module.main_db
+    update = db.update_task_interval
+
+    def update_then_delete(*args):
+        update(*args)
+        db.delete_task(api.household_id, task['id'])
+    monkeypatch.setattr(db, 'update_task_interval', update_then_delete)
+    status, _, body = call('PATCH', f"/tasks/{task['id']}", {'interval_days': 3})
+    assert (status, body) == (404, {'error': 'Task not found'})
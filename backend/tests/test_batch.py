@@ -0,0 +1,47 @@
+import pytest
+
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+from validation import parse_batch
+
+
+@pytest.mark.parametrize('operation, error', [
+    ({'op': ['add_task']}, 'Unknown op'),
+    ({'op': {'name': 'add_task'}}, 'Unknown op'),
+    ('add_task', 'operation must be object'),
+    ({'op': 'add_shopping_item', 'item_text': ['Молоко']}, 'item_text must be string'),
+    ({'op': 'add_shopping_item', 'item_text': {'a': 1}}, 'item_text must be string'),
+    ({'op': 'add_task', 'name': 7, 'interval_days': 3}, 'name must be string'),
+])
+def test_malformed_operation_is_rejected_alone(operation, error):
+    results, valid = parse_batch({'operations': [operation, {'op': 'toggle_shopping_item', 'id': 1}]}, 10)
+    assert results[0]['status'] == 400 and error in results[0]['error']
+    assert results[1] is None
+    assert valid == [(1, ('toggle_shopping_item', (1,)))]
+
+
+def test_failed_operation_rolls_back_only_itself(db, monkeypatch):
+    hid = DEFAULT_HOUSEHOLD_ID
+    insert_task = Database._insert_task
+
+    def broken_insert(cursor, household_id, name, interval_days):
+        insert_task(cursor, household_id, name, interval_days)
+        raise RuntimeError('constraint failed')
+    monkeypatch.setattr(db, '_insert_task', broken_insert)
+
+    results = db.apply_batch(hid, [
+        ('add_shopping_item', ('Молоко', 'supermarket')),
+        ('add_task', ('Окна', 3)),
+        ('add_shopping_item', ('Хлеб', 'supermarket')),
+    ], 10)
+
+    assert [item.item_text for item in (results[0], results[2])] == ['Молоко', 'Хлеб']
+    assert isinstance(results[1], RuntimeError)
+    assert 'Окна' not in [task.name for task in db.get_all_tasks(hid)]
+    assert {item.item_text for item in db.get_shopping_items(hid)} == {'Молоко', 'Хлеб'}
+
+
+@pytest.mark.parametrize('body', [[1, 2], 'x', 5])
+def test_non_object_body_is_rejected(body):
+    with pytest.raises(ValueError, match='JSON body must be object'):
+        parse_batch(body, 10)
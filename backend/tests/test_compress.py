@@ -0,0 +1,61 @@
+import gzip
+import os
+
+from compress import Compressor, parse_accept_encoding
+
+BODY = b'{"items": [' + b', '.join(b'{"id": %d, "item_text": "item"}' % i for i in range(100)) + b']}'
+
+
+def test_accept_encoding_negotiation():
+    compressor = Compressor(encodings=['gzip'])
+    assert parse_accept_encoding('gzip, br;q=0.8, *;q=0') == {'gzip': 1.0, 'br': 0.8, '*': 0.0}
+    assert compressor.negotiate('gzip, deflate') == 'gzip'
+    assert compressor.negotiate('*') == 'gzip'
+    assert compressor.negotiate('gzip;q=0') is None
+    assert compressor.negotiate('identity') is None
+    assert compressor.negotiate(None) is None
+
+
+def test_min_size_and_content_type():
+    compressor = Compressor(min_size=1024)
+    assert compressor.eligible('application/json', 1024)
+    assert not compressor.eligible('application/json', 1023)
+    assert compressor.eligible('text/event-stream', 2048)
+    assert not compressor.eligible('image/png', 4096)
+    assert not compressor.eligible(None, 4096)
+
+
+def test_cache_hit_and_crc_collision(monkeypatch):
+    compressor = Compressor(encodings=['gzip'])
+    calls = []
+    codec = compressor._codecs['gzip']
+    monkeypatch.setitem(compressor._codecs, 'gzip', lambda body: calls.append(body) or codec(body))
+
+    first = compressor.compress(BODY, 'gzip', 'W/"e-1-tasks.1-0000abcd"')
+    assert gzip.decompress(first) == BODY
+    assert compressor.compress(BODY, 'gzip', 'W/"e-1-tasks.1-0000abcd"') is first
+    assert len(calls) == 1
+    # Тот же ETag (совпавший crc32 URL), другое тело — своё сжатое тело
+    other = BODY.replace(b'item', b'meti')
+    assert gzip.decompress(compressor.compress(other, 'gzip', 'W/"e-1-tasks.1-0000abcd"')) == other
+    # Без ETag ответ не кэшируется
+    compressor.compress(BODY, 'gzip')
+    assert len(calls) == 3
+
+
+def test_incompressible_body_is_sent_as_is():
+    assert Compressor(encodings=['gzip']).compress(os.urandom(2048), 'gzip', 'etag') is None
+
+
+def test_api_response_headers(api):
+    for i in range(60):
+        api.post('/shopping', json={'item_text': f'Покупка номер {i}'})
+    large = api.get('/shopping', headers={'Accept-Encoding': 'gzip'})
+    assert large.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in large.headers['Vary']
+    plain = api.get('/shopping', headers={'Accept-Encoding': 'identity'})
+    assert 'Content-Encoding' not in plain.headers and 'Accept-Encoding' in plain.headers['Vary']
+    assert gzip.decompress(large.data) == plain.data
+    # Ответ меньше COMPRESSION_MIN_SIZE не сжимается и Vary не нужен
+    small = api.get('/shopping/stats', headers={'Accept-Encoding': 'gzip'})
+    assert 'Content-Encoding' not in small.headers and 'Vary' not in small.headers
@@ -0,0 +1,66 @@
+import threading
+
+import pytest
+
+from connection_pool import ConnectionPool, PoolTimeoutError
+from storage import get_storage_profile
+
+
+@pytest.fixture
+def pool(db_path):
+    pool = ConnectionPool(db_path, max_size=1, timeout=0.2, on_connect=get_storage_profile('default').apply)
+    yield pool
+    pool.close_all()
+
+
+def test_thread_reuses_connection_until_release(pool):
+    with pool.connection() as first:
+        with pool.connection() as nested:
+            assert nested is first
+    with pool.connection() as again:
+        assert again is first
+    pool.release()
+    assert pool.stats() == {'max_size': 1, 'in_use': 0, 'idle': 1}
+    # Другой поток получает то же соединение из пула, а не открывает новое
+    got = []
+    thread = threading.Thread(target=lambda: (got.append(pool._acquire()), pool.release()))
+    thread.start()
+    thread.join()
+    assert got == [first]
+
+
+def test_max_size_waits_then_times_out(pool):
+    with pool.connection():
+        errors = []
+
+        def other():
+            try:
+                pool._acquire()
+            except PoolTimeoutError as e:
+                errors.append(e)
+        thread = threading.Thread(target=other)
+        thread.start()
+        thread.join()
+        assert len(errors) == 1
+    pool.release()
+
+
+def test_connection_from_dead_thread_is_reclaimed(pool):
+    thread = threading.Thread(target=pool._acquire)
+    thread.start()
+    thread.join()
+    # Поток завершился без release(): его соединение достаётся следующему
+    with pool.connection() as conn:
+        assert conn.execute('SELECT 1').fetchone() == (1,)
+
+
+def test_default_profile_applies_wal(pool):
+    with pool.connection() as conn:
+        assert conn.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert conn.execute('PRAGMA synchronous').fetchone()[0] == 1  # NORMAL
+        assert conn.execute('PRAGMA busy_timeout').fetchone()[0] == 5000
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError, match='Unknown storage profile'):
+        get_storage_profile('turbo')
@@ -0,0 +1,34 @@
+from models import DEFAULT_HOUSEHOLD_ID
+
+HID = DEFAULT_HOUSEHOLD_ID
+
+
+def test_add_returns_created_rows(db):
+    task = db.add_new_task(HID, 'Окна', 7)
+    assert task == db.get_task_by_id(HID, task.id)
+    assert (task.name, task.interval_days, task.last_done, task.next_due) == ('Окна', 7, None, None)
+
+    item = db.add_shopping_item(HID, 'Молоко', 'dairy')
+    assert item in db.get_shopping_items(HID)
+    assert (item.item_text, item.is_checked, item.category) == ('Молоко', False, 'dairy')
+
+
+def test_duplicates_return_none(db):
+    db.add_new_task(HID, 'Windows', 7)
+    assert db.add_new_task(HID, 'WINDOWS', 3) is None
+    db.add_shopping_item(HID, 'Milk')
+    assert db.add_shopping_item(HID, 'milk') is None
+    # Отмеченная покупка не мешает добавить такую же заново
+    db.toggle_shopping_item(HID, db.get_shopping_items(HID)[0].id)
+    assert db.add_shopping_item(HID, 'milk') is not None
+
+
+def test_api_answers_with_created_rows(api):
+    response = api.post('/tasks', json={'name': 'Окна', 'interval_days': 7})
+    assert response.status_code == 201 and response.get_json()['name'] == 'Окна'
+    assert api.post('/tasks', json={'name': 'Окна', 'interval_days': 7}).status_code == 409
+    response = api.post('/shopping', json={'item_text': ' Молоко ', 'category': 'dairy'})
+    assert response.status_code == 201
+    assert response.get_json() == {'id': response.get_json()['id'], 'item_text': 'Молоко',
+                                   'is_checked': False, 'category': 'dairy'}
+    assert api.post('/shopping', json={'item_text': 'Молоко'}).status_code == 409
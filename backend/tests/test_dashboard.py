@@ -0,0 +1,42 @@
+def dashboard(api):
+    response = api.get('/dashboard')
+    assert response.status_code == 200
+    return response.get_json(), response.headers['ETag']
+
+
+def test_empty_household(api):
+    data, _ = dashboard(api)
+    assert data == {
+        'tasks': {'total': 0, 'overdue': 0},
+        'shopping': {'total': 0, 'unchecked': 0, 'checked': 0},
+        'next_task': None,
+    }
+
+
+def test_counts_and_next_task(api):
+    done = api.post('/tasks', json={'name': 'Окна', 'interval_days': 7}).get_json()
+    api.post(f"/tasks/{done['id']}/done")
+    never = api.post('/tasks', json={'name': 'Полы', 'interval_days': 3}).get_json()
+    milk = api.post('/shopping', json={'item_text': 'Молоко'}).get_json()
+    api.post('/shopping', json={'item_text': 'Хлеб'})
+    api.patch(f"/shopping/{milk['id']}/toggle")
+
+    data, _ = dashboard(api)
+    # Ни разу не выполненная задача просрочена и идёт первой
+    assert data['tasks'] == {'total': 2, 'overdue': 1}
+    assert data['shopping'] == {'total': 2, 'unchecked': 1, 'checked': 1}
+    assert data['next_task']['id'] == never['id']
+
+
+def test_etag_changes_after_writes(api):
+    _, etag = dashboard(api)
+    assert api.get('/dashboard', headers={'If-None-Match': etag}).status_code == 304
+
+    api.post('/tasks', json={'name': 'Окна', 'interval_days': 7})
+    _, after_task = dashboard(api)
+    assert after_task != etag
+    assert api.get('/dashboard', headers={'If-None-Match': etag}).status_code == 200
+
+    api.post('/shopping', json={'item_text': 'Молоко'})
+    _, after_item = dashboard(api)
+    assert after_item not in (etag, after_task)
@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from models import DEFAULT_HOUSEHOLD_ID
+from validation import parse_due_filter
+
+NOW = datetime(2026, 3, 10, 12, 0)
+
+
+def test_due_before_and_overdue():
+    assert parse_due_filter(None, None, NOW) == (None, False)
+    assert parse_due_filter('2026-03-01T08:30:00', None, NOW) == (datetime(2026, 3, 1, 8, 30), False)
+    assert parse_due_filter(None, 'true', NOW) == (NOW, True)
+    # overdue ограничивает границу текущим моментом
+    assert parse_due_filter('2026-04-01T00:00:00', 'true', NOW) == (NOW, True)
+    assert parse_due_filter('2026-03-01T00:00:00', 'TRUE', NOW) == (datetime(2026, 3, 1), True)
+
+
+@pytest.mark.parametrize('value', ['tomorrow', '2026-13-01', '01.03.2026'])
+def test_bad_iso_is_rejected(value):
+    with pytest.raises(ValueError, match='ISO 8601'):
+        parse_due_filter(value, None, NOW)
+
+
+@pytest.mark.parametrize('overdue', [None, 'true'])
+def test_offset_converted_to_naive_local_time(overdue):
+    aware = datetime(2026, 3, 1, 0, 0, tzinfo=timezone(timedelta(hours=3)))
+    due_before, _ = parse_due_filter(aware.isoformat(), overdue, NOW)
+    assert due_before.tzinfo is None
+    assert due_before == aware.astimezone().replace(tzinfo=None)
+    assert parse_due_filter('2026-03-01T00:00:00Z', overdue, NOW)[0].tzinfo is None
+
+
+def test_due_tasks_with_offset_bound(db):
+    hid = DEFAULT_HOUSEHOLD_ID
+    task = db.add_new_task(hid, 'Окна', 1)
+    db.mark_task_done(hid, task.id, 1)
+    due = db.get_task_by_id(hid, task.id).next_due
+    # Та же граница, записанная в UTC, отбирает те же задачи
+    just_after = (due + timedelta(minutes=1)).astimezone(timezone.utc).isoformat()
+    just_before = (due - timedelta(minutes=1)).astimezone(timezone.utc).isoformat()
+    ids_after = {t.id for t in db.get_due_tasks(hid, parse_due_filter(just_after, None, NOW)[0])}
+    ids_before = {t.id for t in db.get_due_tasks(hid, parse_due_filter(just_before, None, NOW)[0])}
+    assert task.id in ids_after and task.id not in ids_before
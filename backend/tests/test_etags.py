@@ -0,0 +1,18 @@
+import time
+
+from etags import make_etag, matching_etag
+
+
+def test_matching_etag_returns_current_tag_not_first():
+    base = 'epoch-1-tasks.3-0000abcd'
+    current = make_etag(base, time.time() + 60)
+    header = f'W/"stale-1-tasks.1-0000abcd", W/"{current}"'
+    assert matching_etag(header, base) == current
+    assert matching_etag(f'"{base}"', base) == base
+
+
+def test_expired_or_other_tags_do_not_match():
+    base = 'epoch-1-tasks.3-0000abcd'
+    assert matching_etag(f'W/"{make_etag(base, time.time() - 1)}"', base) is None
+    assert matching_etag('W/"epoch-1-tasks.2-0000abcd"', base) is None
+    assert matching_etag(None, base) is None
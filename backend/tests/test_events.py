@@ -0,0 +1,89 @@
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+
+
+def open_worker(db_path, versions_path):
+    # Отдельный объект Database с общим файлом версий — как второй воркер gunicorn
+    return Database(db_path, versions_path=versions_path, version_slots=64, events_poll_interval=0.05)
+
+
+def test_change_in_other_process_resyncs_subscribers(db_path, tmp_path):
+    versions_path = str(tmp_path / 'versions')
+    worker = open_worker(db_path, versions_path)
+    other = open_worker(db_path, versions_path)
+    household = worker.create_household('Дача').id
+    try:
+        subscription = worker.events.subscribe(scope=DEFAULT_HOUSEHOLD_ID)
+        unrelated = worker.events.subscribe(scope=household)
+
+        # Своё изменение — обычное событие, без лишнего 'resync'
+        worker.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 3)
+        assert subscription.get(timeout=1).type == 'task_changed'
+        assert subscription.get(timeout=0.3) is None
+
+        other.add_shopping_item(DEFAULT_HOUSEHOLD_ID, 'Молоко')
+        event = subscription.get(timeout=2)
+        assert event is not None and event.type == 'resync'
+        assert unrelated.get(timeout=0.3) is None
+        subscription.close()
+        unrelated.close()
+    finally:
+        other.close()
+        worker.close()
+
+
+def test_mark_done_of_missing_task_publishes_nothing(db):
+    subscription = db.events.subscribe(scope=DEFAULT_HOUSEHOLD_ID)
+    try:
+        db.mark_task_done(DEFAULT_HOUSEHOLD_ID, 999, 1)
+        assert subscription.get(timeout=0.1) is None
+        task = db.get_all_tasks(DEFAULT_HOUSEHOLD_ID)[0]
+        db.mark_task_done(DEFAULT_HOUSEHOLD_ID, task.id, 1)
+        event = subscription.get(timeout=1)
+        assert event.type == 'task_changed' and event.data == {'task_id': task.id}
+    finally:
+        subscription.close()
+
+
+def test_slow_subscriber_gets_single_resync(db):
+    subscription = db.events.subscribe(maxsize=2, scope=DEFAULT_HOUSEHOLD_ID)
+    try:
+        for name in ('Молоко', 'Хлеб', 'Сыр'):
+            db.add_shopping_item(DEFAULT_HOUSEHOLD_ID, name)
+        # Третье событие не поместилось: накопленные заменены одним 'resync'
+        event = subscription.get(timeout=1)
+        assert event.type == 'resync' and event.id == db.events.last_event_id(DEFAULT_HOUSEHOLD_ID)
+        assert subscription.get(timeout=0.1) is None
+    finally:
+        subscription.close()
+
+
+def read_events(response, count):
+    chunks = iter(response.response)
+    return [next(chunks) for _ in range(count)]
+
+
+def test_events_stream(api):
+    response = api.get('/events', buffered=False)
+    try:
+        assert response.mimetype == 'text/event-stream'
+        assert read_events(response, 1) == [b'retry: 5000\n\n']
+        api.post('/shopping', json={'item_text': 'Молоко'})
+        [chunk] = read_events(response, 1)
+        assert b'event: shopping_item_added\n' in chunk and 'Молоко'.encode() in chunk
+        last_id = chunk.split(b'\n')[0].removeprefix(b'id: ').decode()
+    finally:
+        response.close()
+
+    # Переподключение без пропусков — без 'resync'; после пропуска — сразу 'resync'
+    response = api.get('/events', buffered=False, headers={'Last-Event-ID': last_id})
+    api.post('/tasks', json={'name': 'Окна', 'interval_days': 7})
+    try:
+        assert b'event: task_changed' in read_events(response, 2)[1]
+    finally:
+        response.close()
+    response = api.get('/events', buffered=False, headers={'Last-Event-ID': last_id})
+    try:
+        assert b'event: resync' in read_events(response, 2)[1]
+    finally:
+        response.close()
@@ -0,0 +1,58 @@
+import threading
+
+from database import Database
+from households import Households
+
+
+def shared_versions(path):
+    return Database(path, seed_defaults=False, versions_path=f'{path}-versions')
+
+
+def test_reopen_after_eviction_writes_nothing(db, tmp_path):
+    households = Households(db, str(tmp_path / 'hh'), max_open=1, open_database=shared_versions)
+    first, second = db.create_household('Дача').id, db.create_household('Квартира').id
+    households.add_user(50, 'аня', first)
+    try:
+        version = households.acquire(first).versions.get('tasks', first)
+        households.release(first)
+        households.acquire(second)  # вытесняет first
+        households.release(second)
+        assert [hid for hid, _ in households.opened()] == [second]
+        reopened = households.acquire(first)
+        assert reopened.versions.get('tasks', first) == version
+        assert reopened.get_household_members(first) == [(50, 'аня')]
+        households.release(first)
+    finally:
+        households.close()
+
+
+def test_slow_open_does_not_block_other_households(db, tmp_path):
+    release_open = threading.Event()
+    opens = []
+
+    def slow_open(path):
+        opens.append(path)
+        if path.endswith(f'household_{slow}.db'):
+            release_open.wait(5)
+        return Database(path, seed_defaults=False)
+    households = Households(db, str(tmp_path / 'hh'), open_database=slow_open)
+    fast, slow = db.create_household('Дача').id, db.create_household('Квартира').id
+    try:
+        households.acquire(fast)
+        results = []
+        openers = [threading.Thread(target=lambda: results.append(households.acquire(slow))) for _ in range(2)]
+        for thread in openers:
+            thread.start()
+        # Пока файл slow открывается, уже открытая база выдаётся сразу
+        done = threading.Event()
+        threading.Thread(target=lambda: (households.acquire(fast), done.set())).start()
+        assert done.wait(2)
+        release_open.set()
+        for thread in openers:
+            thread.join(5)
+        # Два одновременных запроса — одно открытие файла
+        assert len(results) == 2 and results[0] is results[1]
+        assert sum(path.endswith(f'household_{slow}.db') for path in opens) == 1
+    finally:
+        release_open.set()
+        households.close()
@@ -0,0 +1,56 @@
+import sqlite3
+from datetime import datetime, timedelta
+
+import pytest
+
+from maintenance import MaintenanceScheduler, fcntl
+from models import DEFAULT_HOUSEHOLD_ID
+
+HID = DEFAULT_HOUSEHOLD_ID
+
+
+def history_dates(db_path):
+    with sqlite3.connect(db_path) as conn:
+        return [row[0] for row in conn.execute("SELECT done_at FROM task_history ORDER BY id")]
+
+
+def test_run_once_drops_old_history(db, db_path):
+    task = db.add_new_task(HID, 'Окна', 7)
+    db.mark_task_done(HID, task.id, 1)
+    db.mark_task_done(HID, task.id, 1)
+    old = (datetime.now() - timedelta(days=100)).isoformat()
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE task_history SET done_at = ? WHERE id = (SELECT MIN(id) FROM task_history)", (old,))
+    assert len(history_dates(db_path)) == 2
+
+    MaintenanceScheduler(db, history_days_to_keep=90).run_once()
+    dates = history_dates(db_path)
+    assert len(dates) == 1 and dates[0] > old
+
+
+def test_failed_step_does_not_stop_others(db, db_path, monkeypatch):
+    task = db.add_new_task(HID, 'Окна', 7)
+    db.mark_task_done(HID, task.id, 1)
+    with sqlite3.connect(db_path) as conn:
+        conn.execute("UPDATE task_history SET done_at = '2000-01-01T00:00:00'")
+    calls = []
+
+    def broken(days):
+        raise RuntimeError('boom')
+    monkeypatch.setattr(db, 'prune_change_log', broken)
+    monkeypatch.setattr(db, 'checkpoint', lambda mode: calls.append(mode))
+    MaintenanceScheduler(db).run_once()
+    assert history_dates(db_path) == [] and calls == ['PASSIVE']
+
+
+@pytest.mark.skipif(fcntl is None, reason='нет fcntl')
+def test_lock_allows_single_runner(db, tmp_path):
+    lock_path = str(tmp_path / 'maintenance.lock')
+    first = MaintenanceScheduler(db, lock_path=lock_path)
+    second = MaintenanceScheduler(db, lock_path=lock_path)
+    assert first._acquire_lock()
+    assert not second._acquire_lock()
+    first.stop()
+    # Блокировку освободили — её забирает следующий
+    assert second._acquire_lock()
+    second.stop()
@@ -0,0 +1,80 @@
+import re
+
+import pytest
+from flask import Flask, jsonify
+
+from database import Database
+from metrics import Metrics, span
+from models import DEFAULT_HOUSEHOLD_ID
+from query_hook import QueryHook
+
+
+class CountingHook(QueryHook):
+    def __init__(self):
+        self.connections, self.queries = 0, []
+
+    def on_connect(self, seconds):
+        self.connections += 1
+
+    def on_query(self, sql, seconds):
+        self.queries.append(sql)
+
+
+def test_query_hook_sees_connections_and_queries(db_path):
+    hook = CountingHook()
+    db = Database(db_path, query_hook=hook)
+    try:
+        assert hook.connections >= 1
+        hook.queries.clear()
+        db.get_all_tasks(DEFAULT_HOUSEHOLD_ID)
+        assert any('FROM tasks' in sql for sql in hook.queries)
+    finally:
+        db.close()
+
+
+@pytest.fixture
+def metrics_client(db_path):
+    metrics = Metrics()
+    db = Database(db_path, query_hook=metrics)
+    app = Flask(__name__)
+
+    @app.route('/tasks')
+    def tasks():
+        with span('load'):
+            rows = db.get_all_tasks(DEFAULT_HOUSEHOLD_ID)
+        db.release_connection()
+        return jsonify([task.name for task in rows])
+
+    @app.route('/tasks', methods=['POST'])
+    def add_task():
+        # Запрос выполняет поток-писатель, но засчитывается этому HTTP-запросу
+        db.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 7)
+        return jsonify({}), 201
+
+    metrics.init_app(app)
+    yield app.test_client()
+    db.close()
+
+
+def queries_in(response):
+    return int(re.search(r'db;dur=[\d.]+;desc="(\d+) queries"', response.headers['Server-Timing']).group(1))
+
+
+def test_server_timing_header(metrics_client):
+    response = metrics_client.get('/tasks')
+    timing = response.headers['Server-Timing']
+    assert re.search(r'load;dur=[\d.]+', timing) and re.search(r'serialize;dur=[\d.]+', timing)
+    assert re.search(r'total;dur=[\d.]+$', timing)
+    assert queries_in(response) >= 1
+    assert queries_in(metrics_client.post('/tasks')) >= 1
+
+
+def test_metrics_endpoint(metrics_client):
+    metrics_client.get('/tasks')
+    metrics_client.get('/tasks')
+    metrics_client.get('/missing')
+    text = metrics_client.get('/metrics').get_data(as_text=True)
+    assert 'household_http_requests_total{method="GET",endpoint="/tasks",status="200"} 2' in text
+    assert 'household_http_requests_total{method="GET",endpoint="unmatched",status="404"} 1' in text
+    assert 'household_db_queries_per_request_count{endpoint="/tasks"} 2' in text
+    assert re.search(r'^household_db_connections_opened_total [1-9]', text, re.M)
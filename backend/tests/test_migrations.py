@@ -0,0 +1,43 @@
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+
+
+def test_duplicate_unchecked_items_are_checked_not_deleted(baseline, db_path):
+    baseline.executemany(
+        "INSERT INTO shopping_items (item_text, is_checked, category) VALUES (?, ?, ?)",
+        [('Молоко', 0, 'supermarket'), ('Молоко', 0, 'supermarket'), ('Хлеб', 0, 'bakery'),
+         ('Молоко', 1, 'supermarket'), ('Milk', 0, 'supermarket'), ('milk', 0, 'supermarket')]
+    )
+    baseline.commit()
+    baseline.close()
+
+    db = Database(db_path)
+    try:
+        items = db.get_shopping_items(DEFAULT_HOUSEHOLD_ID)
+        assert len(items) == 6
+        unchecked = sorted((item.id, item.item_text) for item in items if not item.is_checked)
+        assert unchecked == [(1, 'Молоко'), (3, 'Хлеб'), (5, 'Milk')]
+        # Уникальный индекс создан: второе неотмеченное «молоко» не добавить
+        assert db.add_shopping_item(DEFAULT_HOUSEHOLD_ID, 'Молоко') is None
+        assert db.add_shopping_item(DEFAULT_HOUSEHOLD_ID, 'MILK') is None
+    finally:
+        db.close()
+
+
+def test_shopping_dictionary_backfilled_from_migrated_lists(baseline, db_path):
+    baseline.executemany(
+        "INSERT INTO shopping_items (item_text, is_checked, category) VALUES (?, ?, ?)",
+        [('Молоко', 0, 'supermarket'), ('Молоко', 0, 'supermarket'), ('Хлеб', 1, None)]
+    )
+    baseline.commit()
+    baseline.close()
+
+    db = Database(db_path)
+    try:
+        suggestions = {s.item_text: s for s in db.get_shopping_suggestions(DEFAULT_HOUSEHOLD_ID)}
+        # Дубликат, отмеченный миграцией, — тоже покупка
+        assert suggestions['Молоко'].uses == 2
+        assert suggestions['Хлеб'].category == 'supermarket'
+        assert [s.item_text for s in db.get_shopping_suggestions(DEFAULT_HOUSEHOLD_ID, 'мол')] == ['Молоко']
+    finally:
+        db.close()
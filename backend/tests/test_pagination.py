@@ -0,0 +1,48 @@
+from models import DEFAULT_HOUSEHOLD_ID
+
+HID = DEFAULT_HOUSEHOLD_ID
+
+
+def collect_pages(load_page, key):
+    """Все страницы по limit=2, начиная без after_id"""
+    pages, after_id = [], None
+    while True:
+        page = load_page(after_id)
+        if not page:
+            return pages
+        pages.append([key(item) for item in page])
+        after_id = page[-1].id
+
+
+def test_shopping_pages_match_full_list(db):
+    items = [db.add_shopping_item(HID, f'item {i}', 'bakery' if i % 2 else 'supermarket') for i in range(7)]
+    for item in items[::3]:
+        db.toggle_shopping_item(HID, item.id)
+
+    for show_checked, category in [(True, None), (False, None), (True, 'bakery')]:
+        expected = [item.id for item in db.get_shopping_items(HID, show_checked, category)]
+        pages = collect_pages(
+            lambda after_id: db.get_shopping_page(HID, 2, after_id, show_checked, category), lambda item: item.id)
+        assert [item_id for page in pages for item_id in page] == expected
+        assert all(len(page) == 2 for page in pages[:-1])
+        streamed = [item.id for page in db.iter_shopping_items(HID, 2, show_checked, category) for item in page]
+        assert streamed == expected
+
+
+def test_task_pages_follow_name_order(db):
+    for name in ['Окна', 'Балкон', 'Шторы']:
+        db.add_new_task(HID, name, 7)
+    expected = [task.name for task in db.get_all_tasks(HID)]
+    pages = collect_pages(lambda after_id: db.get_tasks_page(HID, 2, after_id), lambda task: task.name)
+    assert [name for page in pages for name in page] == expected
+    assert [task.name for page in db.iter_tasks(HID, 2) for task in page] == expected
+
+
+def test_page_after_deleted_or_foreign_row_is_none(db):
+    task = db.add_new_task(HID, 'Окна', 7)
+    item = db.add_shopping_item(HID, 'Молоко')
+    other = db.create_household('Дача').id
+    assert db.get_tasks_page(other, 2, task.id) is None
+    assert db.get_shopping_page(other, 2, item.id) is None
+    db.delete_task(HID, task.id)
+    assert db.get_tasks_page(HID, 2, task.id) is None
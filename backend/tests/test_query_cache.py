@@ -0,0 +1,40 @@
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+
+HID = DEFAULT_HOUSEHOLD_ID
+
+
+def test_cached_reads_until_write_in_same_process(db, monkeypatch):
+    db.add_shopping_item(HID, 'Молоко', 'dairy')
+    assert db.get_unique_categories(HID) == ['dairy']
+    first = db.get_shopping_items(HID)
+    # Повторное чтение — из кэша, без запроса к базе
+    monkeypatch.setattr(db, '_load_shopping_items', None)
+    assert db.get_shopping_items(HID) is first
+    monkeypatch.undo()
+
+    db.add_shopping_item(HID, 'Хлеб', 'bakery')
+    assert [item.item_text for item in db.get_shopping_items(HID)] == ['Хлеб', 'Молоко']
+    assert db.get_unique_categories(HID) == ['bakery', 'dairy']
+    assert db.get_shopping_item_count(HID)['total'] == 2
+
+
+def test_write_in_other_process_drops_cached_result(db_path, tmp_path):
+    versions_path = str(tmp_path / 'versions')
+    reader = Database(db_path, versions_path=versions_path)
+    writer = Database(db_path, versions_path=versions_path)
+    try:
+        other = reader.create_household('Дача', with_default_tasks=False).id
+        reader.add_shopping_item(HID, 'Молоко')
+        assert reader.get_shopping_item_count(HID)['total'] == 1
+        reader.get_shopping_item_count(other)
+        cached_other = reader._query_cache.get(('shopping_items', other))
+
+        writer.add_shopping_item(HID, 'Хлеб')
+        writer.toggle_shopping_item(HID, reader.get_shopping_items(HID)[0].id)
+        assert reader.get_shopping_item_count(HID) == {'total': 2, 'unchecked': 1, 'checked': 1}
+        # Записи в другом домохозяйстве кэш этого не трогают
+        assert reader._query_cache.get(('shopping_items', other)) is cached_other
+    finally:
+        writer.close()
+        reader.close()
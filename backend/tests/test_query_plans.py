@@ -0,0 +1,76 @@
+"""Частые запросы задач и покупок читают индексы, а не всю таблицу (EXPLAIN QUERY PLAN)"""
+import re
+import sqlite3
+
+import pytest
+
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+from query_hook import QueryHook
+
+FULL_SCAN = re.compile(r'\bSCAN (shopping_items|tasks)\b')
+
+
+class RecordingHook(QueryHook):
+    def __init__(self):
+        self.queries = []
+
+    def on_query(self, sql, seconds):
+        self.queries.append(sql)
+
+
+def query_plan(conn, sql):
+    # Значения параметров на план не влияют: подставляются NULL
+    numbered = [int(n) for n in re.findall(r'\?(\d+)', sql)]
+    count = max(numbered) if numbered else sql.count('?')
+    return [row[3] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', [None] * count)]
+
+
+@pytest.fixture
+def hot_queries(db_path):
+    hook = RecordingHook()
+    db = Database(db_path, query_hook=hook)
+    try:
+        hid = DEFAULT_HOUSEHOLD_ID
+        item = db.add_shopping_item(hid, 'Молоко', 'supermarket')
+        task = db.get_all_tasks(hid)[0]
+        hook.queries.clear()
+
+        db.get_all_tasks(hid)
+        db.get_tasks_page(hid, 2, after_id=task.id)
+        db.get_due_tasks(hid)
+        db.get_task_by_id(hid, task.id)
+        db.get_dashboard(hid)
+        db.get_shopping_items(hid, show_checked=False)
+        db.get_shopping_items(hid, category='supermarket')
+        db.get_shopping_page(hid, 2, after_id=item.id)
+        db.get_shopping_page(hid, 2, after_id=item.id, category='supermarket')
+        db.get_shopping_item_count(hid)
+        db.get_unique_categories(hid)
+        db.get_task_due_times([hid])
+        db.get_changes_since(hid, 0)
+    finally:
+        db.close()
+    return [sql for sql in hook.queries
+            if sql.lstrip().upper().startswith(('SELECT', 'WITH')) and re.search(r'\b(tasks|shopping_items)\b', sql)]
+
+
+def test_hot_queries_do_not_scan_tables(hot_queries, db_path):
+    assert len(hot_queries) >= 10
+    conn = sqlite3.connect(db_path)
+    try:
+        for sql in hot_queries:
+            plan = query_plan(conn, sql)
+            assert not any(FULL_SCAN.search(step) for step in plan), (sql, plan)
+    finally:
+        conn.close()
+
+
+def test_full_scan_is_detected(db):
+    # Проверка выше не пропускает запрос без подходящего индекса
+    conn = sqlite3.connect(db.db_path)
+    try:
+        plan = query_plan(conn, 'SELECT id FROM shopping_items WHERE item_text LIKE ?')
+    finally:
+        conn.close()
+    assert any(FULL_SCAN.search(step) for step in plan)
@@ -0,0 +1,142 @@
+import fcntl
+import os
+import time
+
+import pytest
+
+from households import Households
+from models import DEFAULT_HOUSEHOLD_ID
+from reminders import ReminderEngine, ReminderSink
+
+
+class ListSink(ReminderSink):
+    def __init__(self):
+        self.reminders = []
+
+    def send(self, reminder):
+        self.reminders.append(reminder)
+
+
+class FailingSink(ReminderSink):
+    def send(self, reminder):
+        raise RuntimeError('sink is down')
+
+
+def wait_for(condition, timeout=3.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+@pytest.fixture
+def households(db):
+    db.add_user(10, 'аня', DEFAULT_HOUSEHOLD_ID)
+    return Households(db)
+
+
+def make_due_now(db, name='Полить цветы'):
+    """Задача, срок которой наступает сразу после выполнения (интервал 0)"""
+    task = db.add_new_task(DEFAULT_HOUSEHOLD_ID, name, 3)
+    db.mark_task_done(DEFAULT_HOUSEHOLD_ID, task.id, 10)
+    db.update_task_interval(DEFAULT_HOUSEHOLD_ID, task.id, 0)
+    return task
+
+
+def test_done_task_reminded_once_and_delete_unschedules(db, households):
+    sink = ListSink()
+    engine = ReminderEngine(households, [sink], poll_interval=0.2)
+    engine.start()
+    try:
+        assert wait_for(lambda: engine._active_since)
+        later = db.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 3)
+        db.mark_task_done(DEFAULT_HOUSEHOLD_ID, later.id, 10)
+        assert wait_for(lambda: engine.scheduled_count() == 1)
+        db.delete_task(DEFAULT_HOUSEHOLD_ID, later.id)
+        assert wait_for(lambda: engine.scheduled_count() == 0)
+
+        task = make_due_now(db)
+        assert wait_for(lambda: sink.reminders)
+        time.sleep(0.3)
+        assert [r.task.id for r in sink.reminders] == [task.id]
+        assert (10, 'аня') in sink.reminders[0].recipients
+    finally:
+        engine.stop()
+
+
+def test_failing_sink_and_read_errors_do_not_stop_engine(db, households, monkeypatch):
+    sink = ListSink()
+    engine = ReminderEngine(households, [FailingSink(), sink], poll_interval=0.2)
+    monkeypatch.setattr('reminders.ERROR_RETRY_SECONDS', 0.1)
+    original = engine._read_task
+    failures = []
+
+    def flaky_read(household_id, task_id):
+        if not failures:
+            failures.append(task_id)
+            raise RuntimeError('database is locked')
+        return original(household_id, task_id)
+    engine._read_task = flaky_read
+    engine.start()
+    try:
+        assert wait_for(lambda: engine._active_since)
+        task = make_due_now(db)
+        # Первое чтение при событии упало, напоминание пришло после повтора
+        assert wait_for(lambda: sink.reminders)
+        assert failures and sink.reminders[0].task.id == task.id
+        assert engine._thread.is_alive()
+    finally:
+        engine.stop()
+
+
+def test_lock_released_after_stop(db, households, db_path):
+    lock_path = f'{db_path}-reminders.lock'
+    engine = ReminderEngine(households, [ListSink()], poll_interval=0.2, lock_path=lock_path)
+    engine.start()
+    assert wait_for(lambda: engine._active_since)
+    engine.stop()
+    fd = os.open(lock_path, os.O_RDWR)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    finally:
+        os.close(fd)
+
+
+def test_poll_reloads_only_changed_households(db_path, tmp_path):
+    from database import Database
+    versions_path = str(tmp_path / 'versions')
+    db = Database(db_path, versions_path=versions_path, version_slots=64)
+    db.add_user(10, 'аня', DEFAULT_HOUSEHOLD_ID)
+    # Другой процесс с той же базой: его запуск не трогает счётчики
+    other = Database(db_path, versions_path=versions_path, version_slots=64)
+    engine = ReminderEngine(Households(db), [ListSink()], poll_interval=0.1)
+    loads = []
+    original = engine._load
+
+    def recording_load(database, household_ids):
+        loads.append(household_ids)
+        original(database, household_ids)
+    engine._load = recording_load
+    engine.start()
+    try:
+        assert wait_for(lambda: engine._active_since)
+        restarted = Database(db_path, versions_path=versions_path, version_slots=64)
+        restarted.close()
+        task = other.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 3)
+        other.mark_task_done(DEFAULT_HOUSEHOLD_ID, task.id, 10)
+        assert wait_for(lambda: engine.scheduled_count() == 1)
+        assert loads[0] is None
+        assert all(ids == [DEFAULT_HOUSEHOLD_ID] for ids in loads[1:])
+    finally:
+        engine.stop()
+        other.close()
+        db.close()
+
+
+def test_sink_must_implement_send():
+    class Incomplete(ReminderSink):
+        pass
+    with pytest.raises(TypeError):
+        Incomplete()
@@ -0,0 +1,60 @@
+from models import DEFAULT_HOUSEHOLD_ID
+from suggest import SuggestionIndex, normalize_item_text
+
+HID = DEFAULT_HOUSEHOLD_ID
+
+
+def make_index(*rows):
+    index = SuggestionIndex()
+    index.apply((normalize_item_text(text), category, text, uses, revision)
+                for revision, (text, category, uses) in enumerate(rows, 1))
+    return index
+
+
+def texts(suggestions):
+    return [s.item_text for s in suggestions]
+
+
+def test_prefix_of_any_word_ignores_case_and_yo():
+    index = make_index(('Зелёный чай', 'supermarket', 1), ('Чай чёрный', 'supermarket', 5),
+                       ('Чайник', 'household', 2), ('Молоко', 'dairy', 9))
+    # С начала названия — выше, чем с начала другого слова; дальше по популярности
+    assert texts(index.search('ЧАЙ')) == ['Чай чёрный', 'Чайник', 'Зелёный чай']
+    assert texts(index.search('зеленый ч')) == ['Зелёный чай']
+    assert texts(index.search('чай', category='household')) == ['Чайник']
+    assert texts(index.search('', limit=2)) == ['Молоко', 'Чай чёрный']
+
+
+def test_fuzzy_match_after_prefix_matches():
+    index = make_index(('Молоко', 'dairy', 3), ('Мороженое', 'frozen', 1), ('Хлеб', 'bakery', 1))
+    assert texts(index.search('молако')) == ['Молоко']
+    # Короткий запрос ищется только по началу
+    assert texts(index.search('мл')) == []
+    assert texts(index.search('мо')) == ['Молоко', 'Мороженое']
+
+
+def test_uses_are_summed_over_categories():
+    index = make_index(('Сыр', 'dairy', 2), ('сыр', 'supermarket', 3))
+    [suggestion] = index.search('сыр')
+    assert (suggestion.item_text, suggestion.category, suggestion.uses) == ('сыр', 'supermarket', 5)
+    assert suggestion.categories == {'dairy': 2, 'supermarket': 3}
+
+
+def test_database_index_follows_new_items(db):
+    db.add_shopping_item(HID, 'Молоко', 'dairy')
+    assert texts(db.get_shopping_suggestions(HID, 'мол')) == ['Молоко']
+    # Словарь копит историю: удалённая из списка покупка остаётся подсказкой
+    db.delete_all_shopping_items(HID)
+    db.add_shopping_item(HID, 'Молочный коктейль', 'dairy')
+    db.add_shopping_item(HID, 'Молоко', 'dairy')
+    suggestions = db.get_shopping_suggestions(HID, 'мол')
+    assert texts(suggestions) == ['Молоко', 'Молочный коктейль'] and suggestions[0].uses == 2
+
+
+def test_suggest_endpoint(api):
+    api.post('/shopping', json={'item_text': 'Хлеб', 'category': 'bakery'})
+    response = api.get('/shopping/suggest?q=хл')
+    assert response.status_code == 200
+    assert response.get_json() == [{'item_text': 'Хлеб', 'category': 'bakery', 'uses': 1,
+                                     'categories': {'bakery': 1}}]
+    assert api.get('/shopping/suggest?limit=0').status_code == 400
@@ -0,0 +1,58 @@
+def sync(api, since=None):
+    response = api.get('/sync' if since is None else f'/sync?since={since}')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_delta_since_revision(api):
+    task = api.post('/tasks', json={'name': 'Окна', 'interval_days': 7}).get_json()
+    item = api.post('/shopping', json={'item_text': 'Молоко'}).get_json()
+    snapshot = sync(api)
+    assert snapshot['full'] and snapshot['revision'] > 0
+    assert [t['id'] for t in snapshot['tasks']] == [task['id']]
+    assert [i['id'] for i in snapshot['shopping_items']] == [item['id']]
+
+    # Без изменений — пустая дельта с той же ревизией
+    same = sync(api, snapshot['revision'])
+    assert not same['full'] and same['revision'] == snapshot['revision']
+    assert same['tasks'] == [] and same['shopping_items'] == []
+
+    api.patch(f"/shopping/{item['id']}/toggle")
+    delta = sync(api, snapshot['revision'])
+    assert not delta['full'] and delta['revision'] > snapshot['revision']
+    assert delta['tasks'] == []
+    assert [(i['id'], i['is_checked']) for i in delta['shopping_items']] == [(item['id'], True)]
+
+
+def test_tombstones_for_deleted_rows(api):
+    task = api.post('/tasks', json={'name': 'Окна', 'interval_days': 7}).get_json()
+    item = api.post('/shopping', json={'item_text': 'Молоко'}).get_json()
+    revision = sync(api)['revision']
+    api.delete(f"/tasks/{task['id']}")
+    api.delete('/shopping/all')
+    delta = sync(api, revision)
+    assert not delta['full']
+    assert delta['deleted'] == {'tasks': [task['id']], 'shopping_items': [item['id']]}
+    assert delta['tasks'] == [] and delta['shopping_items'] == []
+
+
+def test_change_log_is_scoped_to_household(api, app_module):
+    revision = sync(api)['revision']
+    other = app_module.db.create_household('Чужое', with_default_tasks=False).id
+    app_module.db.add_new_task(other, 'Чужая задача', 3)
+    app_module.db.add_shopping_item(other, 'Чужая покупка')
+    delta = sync(api, revision)
+    assert delta['revision'] == revision
+    assert delta['tasks'] == [] and delta['shopping_items'] == []
+    assert delta['deleted'] == {'tasks': [], 'shopping_items': []}
+
+
+def test_since_ahead_negative_or_invalid(api):
+    api.post('/tasks', json={'name': 'Окна', 'interval_days': 7})
+    revision = sync(api)['revision']
+    # Ревизия из будущего (другая база) и отрицательная — полный снимок
+    for since in (revision + 1000, -5):
+        response = sync(api, since)
+        assert response['full'] and response['revision'] == revision
+        assert [t['name'] for t in response['tasks']] == ['Окна']
+    assert api.get('/sync?since=abc').status_code == 400
@@ -0,0 +1,35 @@
+import pytest
+
+
+@pytest.fixture
+def task(api):
+    return api.post('/tasks', json={'name': 'Окна', 'interval_days': 7}).get_json()
+
+
+def delete_after(monkeypatch, db, method, task_id, household_id):
+    """Параллельный DELETE сразу после записи method"""
+    original = getattr(db, method)
+
+    def write_then_delete(*args):
+        result = original(*args)
+        db.delete_task(household_id, task_id)
+        return result
+    monkeypatch.setattr(db, method, write_then_delete)
+
+
+def test_update_task(api, task):
+    response = api.patch(f"/tasks/{task['id']}", json={'name': 'Пол', 'interval_days': 3})
+    assert response.status_code == 200
+    assert (response.get_json()['name'], response.get_json()['interval_days']) == ('Пол', 3)
+    assert api.patch('/tasks/999999', json={'interval_days': 3}).status_code == 404
+
+
+def test_update_of_task_deleted_meanwhile_is_404(api, app_module, task, monkeypatch):
+    delete_after(monkeypatch, app_module.db, 'update_task_interval', task['id'], api.household_id)
+    response = api.patch(f"/tasks/{task['id']}", json={'interval_days': 3})
+    assert response.status_code == 404
+
+
+def test_done_of_task_deleted_meanwhile_is_404(api, app_module, task, monkeypatch):
+    delete_after(monkeypatch, app_module.db, 'mark_task_done', task['id'], api.household_id)
+    assert api.post(f"/tasks/{task['id']}/done").status_code == 404
@@ -0,0 +1,65 @@
+from datetime import date
+
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+
+
+def test_migrates_history_with_null_done_by(baseline, db_path):
+    baseline.execute("INSERT INTO users (chat_id, username) VALUES (10, 'аня')")
+    baseline.execute("INSERT INTO tasks (id, name, interval_days) VALUES (1, 'Полы', 7)")
+    baseline.executemany(
+        "INSERT INTO task_history (task_id, done_by, done_at) VALUES (?, ?, ?)",
+        [(1, None, '2026-01-01T10:00:00'), (1, 10, '2026-01-05T10:00:00'), (None, 10, '2026-01-06T10:00:00')]
+    )
+    baseline.commit()
+    baseline.close()
+
+    db = Database(db_path)
+    try:
+        stats = db.get_task_stats(DEFAULT_HOUSEHOLD_ID, days=None, today=date(2026, 1, 6))
+        task = next(t for t in stats['tasks'] if t['task_id'] == 1)
+        # Выполнение без пользователя учитывается у задачи, но не у пользователей
+        assert task['completions'] == 2
+        assert task['avg_interval_days'] == 4.0
+        assert stats['total_completions'] == 2
+        user = next(u for u in stats['users'] if u['chat_id'] == 10)
+        assert user['completions'] == 1
+        with db.pool.connection() as conn:
+            assert conn.execute("SELECT chat_id FROM user_streaks").fetchall() == [(10,)]
+    finally:
+        db.close()
+
+
+def test_history_insert_with_null_done_by_at_runtime(db):
+    task = db.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 30)
+
+    def write(conn):
+        conn.execute("INSERT INTO task_history (task_id, done_by, household_id) VALUES (?, NULL, ?)",
+                     (task.id, DEFAULT_HOUSEHOLD_ID))
+    db._write(write)
+
+    stats = db.get_task_stats(DEFAULT_HOUSEHOLD_ID)
+    assert next(t for t in stats['tasks'] if t['task_id'] == task.id)['completions'] == 1
+    with db.pool.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM user_streaks").fetchone()[0] == 0
+
+
+def test_streaks_and_daily_rollup(db):
+    db.add_user(10, 'аня', DEFAULT_HOUSEHOLD_ID)
+    task = db.add_new_task(DEFAULT_HOUSEHOLD_ID, 'Окна', 3)
+
+    def write(conn):
+        conn.executemany(
+            "INSERT INTO task_history (task_id, done_by, done_at, household_id) VALUES (?, 10, ?, ?)",
+            [(task.id, day, DEFAULT_HOUSEHOLD_ID)
+             for day in ('2026-03-01T09:00:00', '2026-03-02T09:00:00', '2026-03-02T20:00:00', '2026-03-10T09:00:00')]
+        )
+    db._write(write)
+
+    stats = db.get_task_stats(DEFAULT_HOUSEHOLD_ID, days=None, today=date(2026, 3, 10))
+    assert [d['completions'] for d in stats['daily']] == [1, 2, 1]
+    task_stats = next(t for t in stats['tasks'] if t['task_id'] == task.id)
+    # Серия прервана: между 2 и 10 марта больше интервала задачи
+    assert (task_stats['completions'], task_stats['current_streak'], task_stats['best_streak']) == (4, 1, 3)
+    user = next(u for u in stats['users'] if u['chat_id'] == 10)
+    assert (user['current_streak'], user['best_streak']) == (1, 2)
@@ -0,0 +1,35 @@
+from models import DEFAULT_HOUSEHOLD_ID
+
+HID = DEFAULT_HOUSEHOLD_ID
+
+
+def test_toggle_back_and_forth(db):
+    item = db.add_shopping_item(HID, 'Молоко')
+    assert db.toggle_shopping_item(HID, item.id).is_checked
+    assert not db.toggle_shopping_item(HID, item.id).is_checked
+    assert db.toggle_shopping_item(HID, 999) is None
+
+
+def test_uncheck_over_unchecked_duplicate_keeps_both(db):
+    checked = db.add_shopping_item(HID, 'Milk')
+    db.toggle_shopping_item(HID, checked.id)
+    unchecked = db.add_shopping_item(HID, 'milk')
+    subscription = db.events.subscribe(scope=HID)
+    try:
+        assert db.toggle_shopping_item(HID, checked.id) is False
+        assert subscription.get(timeout=0.1) is None
+    finally:
+        subscription.close()
+    items = {item.id: item.is_checked for item in db.get_shopping_items(HID)}
+    assert items == {checked.id: True, unchecked.id: False}
+
+
+def test_toggle_conflict_is_409(api):
+    checked = api.post('/shopping', json={'item_text': 'Хлеб'}).get_json()
+    api.patch(f"/shopping/{checked['id']}/toggle")
+    api.post('/shopping', json={'item_text': 'Хлеб'})
+    response = api.patch(f"/shopping/{checked['id']}/toggle")
+    assert response.status_code == 409
+    assert len(api.get('/shopping').get_json()) == 2
+    response = api.post('/batch', json={'operations': [{'op': 'toggle_shopping_item', 'id': checked['id']}]})
+    assert response.get_json()['results'][0]['status'] == 409
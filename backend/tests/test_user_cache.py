@@ -0,0 +1,37 @@
+from models import DEFAULT_HOUSEHOLD_ID
+
+
+def test_known_user_resolved_from_cache(db, monkeypatch):
+    db.add_user(50, 'аня', DEFAULT_HOUSEHOLD_ID)
+    assert db.get_user_household(50) == DEFAULT_HOUSEHOLD_ID
+    # Попадание в кэш не обращается к пулу соединений
+    monkeypatch.setattr(db.pool, 'connection', None)
+    assert db.get_user_household(50) == DEFAULT_HOUSEHOLD_ID
+    assert db.user_exists(50)
+
+
+def test_unknown_user_is_not_cached(db):
+    assert db.get_user_household(60) is None
+    # Пользователь, добавленный в обход add_user, виден сразу
+    with db.pool.connection() as conn:
+        conn.execute("INSERT INTO users (chat_id, username, household_id) VALUES (60, 'петя', ?)",
+                     (DEFAULT_HOUSEHOLD_ID,))
+    assert db.get_user_household(60) == DEFAULT_HOUSEHOLD_ID
+
+
+def test_invalidate_user_rereads_household(db):
+    other = db.create_household('Дача').id
+    db.add_user(50, 'аня', DEFAULT_HOUSEHOLD_ID)
+    with db.pool.connection() as conn:
+        conn.execute('UPDATE users SET household_id = ? WHERE chat_id = 50', (other,))
+    assert db.get_user_household(50) == DEFAULT_HOUSEHOLD_ID
+    db.invalidate_user(50)
+    assert db.get_user_household(50) == other
+
+
+def test_require_chat_id(api):
+    assert api.get('/household').status_code == 200
+    assert api.get('/household', headers={'X-Chat-ID': '999999'}).status_code == 403
+    assert api.get('/household', headers={'X-Chat-ID': 'abc'}).status_code == 400
+    api.environ_base.pop('HTTP_X_CHAT_ID')
+    assert api.get('/household').status_code == 401
@@ -0,0 +1,37 @@
+from database import Database
+from models import DEFAULT_HOUSEHOLD_ID
+
+
+def test_add_user_bumps_only_new_and_old_household(db):
+    other = db.create_household('Дача').id
+    third = db.create_household('Квартира').id
+    before = {hid: db.versions.get('tasks', hid) for hid in (DEFAULT_HOUSEHOLD_ID, other, third)}
+    # Кэш запросов других домохозяйств перенос пользователя не сбрасывает
+    db.get_shopping_items(third)
+    cached = db._query_cache.get(('shopping_items', third))
+
+    db.add_user(10, 'аня', DEFAULT_HOUSEHOLD_ID)
+    db.add_user(10, 'аня', other)
+
+    after = {hid: db.versions.get('tasks', hid) for hid in before}
+    assert after[DEFAULT_HOUSEHOLD_ID] == before[DEFAULT_HOUSEHOLD_ID] + 2
+    assert after[other] == before[other] + 1
+    assert after[third] == before[third]
+    assert cached is not None and db._query_cache.get(('shopping_items', third)) is cached
+
+
+def test_user_move_in_other_process_is_seen_at_once(db_path, tmp_path):
+    versions_path = str(tmp_path / 'versions')
+    server = Database(db_path, versions_path=versions_path)
+    cli = Database(db_path, versions_path=versions_path)
+    try:
+        other = server.create_household('Дача').id
+        server.add_user(50, 'аня', other)
+        assert server.get_user_household(50) == other
+        # households.py add-user или другой воркер переносит пользователя
+        cli.add_user(50, 'аня', DEFAULT_HOUSEHOLD_ID)
+        assert server.get_user_household(50) == DEFAULT_HOUSEHOLD_ID
+    finally:
+        cli.close()
+        server.close()
+
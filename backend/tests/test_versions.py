@@ -0,0 +1,15 @@
+from versions import TableVersions
+
+
+def test_process_start_changes_epoch_not_counters(tmp_path):
+    path = str(tmp_path / 'versions')
+    first = TableVersions(('tasks', 'shopping_items'), path=path, slots=8)
+    first.bump('tasks', scope=3)
+    before = first.snapshot('tasks')
+    token = first.token('tasks', scope=3)
+
+    second = TableVersions(('tasks', 'shopping_items'), path=path, slots=8)
+    assert second.snapshot('tasks') == before == first.snapshot('tasks')
+    # ETag, выданные до запуска второго процесса, больше не совпадают
+    assert first.token('tasks', scope=3) != token
+    assert first.epoch == second.epoch
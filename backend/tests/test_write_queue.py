@@ -0,0 +1,104 @@
+import sqlite3
+import threading
+
+import pytest
+
+from write_queue import WriteQueue
+
+
+class FlakyConnection(sqlite3.Connection):
+    """Соединение, у которого можно сломать отдельные команды"""
+    fail = ()
+
+    def execute(self, sql, parameters=()):
+        if sql in self.fail:
+            raise sqlite3.OperationalError(f'disk I/O error ({sql})')
+        return super().execute(sql, parameters)
+
+
+@pytest.fixture
+def writer(db_path):
+    commits = []
+
+    def connect():
+        conn = sqlite3.connect(db_path, check_same_thread=False, factory=FlakyConnection)
+        conn.execute('CREATE TABLE IF NOT EXISTS items (value TEXT)')
+        conn.commit()
+        conn.set_trace_callback(lambda sql: commits.append(sql) if sql == 'COMMIT' else None)
+        return conn
+    queue = WriteQueue(connect)
+    queue.commits = commits
+    yield queue
+    queue.close()
+
+
+def insert(value):
+    return lambda conn: conn.execute('INSERT INTO items VALUES (?)', (value,)).lastrowid
+
+
+def values(db_path):
+    conn = sqlite3.connect(db_path)
+    try:
+        return sorted(row[0] for row in conn.execute('SELECT value FROM items'))
+    finally:
+        conn.close()
+
+
+def test_queued_jobs_share_one_commit(writer, db_path):
+    started, release = threading.Event(), threading.Event()
+
+    def blocker(conn):
+        started.set()
+        release.wait(5)
+    first = writer.submit(blocker)
+    assert started.wait(5)
+    futures = [writer.submit(insert(str(i))) for i in range(10)]
+    release.set()
+    first.result(5)
+    assert all(future.result(5) for future in futures)
+    # Пока писатель занят, задания копятся и фиксируются одним COMMIT
+    assert len(writer.commits) == 2
+    assert len(values(db_path)) == 10
+
+
+def test_failed_job_rolls_back_only_its_savepoint(writer, db_path):
+    started, release = threading.Event(), threading.Event()
+    writer.submit(lambda conn: (started.set(), release.wait(5)))
+    assert started.wait(5)
+
+    def broken(conn):
+        insert('broken')(conn)
+        raise ValueError('bad job')
+    before = writer.submit(insert('before'))
+    failed = writer.submit(broken)
+    after = writer.submit(insert('after'))
+    release.set()
+    assert before.result(5) and after.result(5)
+    with pytest.raises(ValueError):
+        failed.result(5)
+    assert values(db_path) == ['after', 'before']
+
+
+def test_batch_error_does_not_stop_writer(writer, db_path):
+    writer._conn.fail = ('SAVEPOINT job',)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.execute(insert('lost'))
+    writer._conn.fail = ()
+    writer.execute(insert('kept'))
+    assert values(db_path) == ['kept']
+
+
+def test_dead_writer_fails_queued_and_new_jobs(writer):
+    started, release = threading.Event(), threading.Event()
+    writer.submit(lambda conn: (started.set(), release.wait(5)))
+    assert started.wait(5)
+    # Откат после сбоя тоже не удался — писатель завершается
+    writer._conn.fail = ('SAVEPOINT job', 'ROLLBACK')
+    queued = [writer.submit(insert(str(i))) for i in range(3)]
+    release.set()
+    for future in queued:
+        with pytest.raises(sqlite3.OperationalError):
+            future.result(5)
+    writer._thread.join(5)
+    with pytest.raises(RuntimeError):
+        writer.execute(insert('late'))
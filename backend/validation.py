@@ -0,0 +1,213 @@
+"""Проверка входных данных API.
+
+Общая для Flask-приложения (app.py) и ASGI-варианта (asgi.py). Ошибка —
+ValueError с текстом для клиента (ответ 400).
+"""
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+
+def parse_login_name(data: dict) -> str:
+    name = data.get('name')
+    if not name:
+        raise ValueError('name is required')
+    if not isinstance(name, str):
+        raise ValueError('name must be string')
+    name = name.strip()
+    if not name:
+        raise ValueError('name cannot be empty')
+    return name
+
+
+def parse_login_household(data: dict) -> Optional[int]:
+    """Необязательный household_id при входе: нужен, если имя есть в нескольких домохозяйствах"""
+    value = data.get('household_id')
+    if value is not None and not isinstance(value, int):
+        raise ValueError('household_id must be integer')
+    return value
+
+
+def parse_new_task(data: dict) -> tuple:
+    name = data.get('name')
+    interval_days = data.get('interval_days')
+    if not name or not interval_days:
+        raise ValueError('name and interval_days are required')
+    if not isinstance(name, str):
+        raise ValueError('name must be string')
+    if not isinstance(interval_days, int) or interval_days <= 0:
+        raise ValueError('interval_days must be positive integer')
+    return name, interval_days
+
+
+def parse_task_update(data: dict) -> Tuple[Optional[str], Optional[int]]:
+    """PATCH /tasks/<id>: (новое имя, новый интервал), None — поле не меняется"""
+    new_name = new_interval = None
+    if 'name' in data:
+        if not isinstance(data['name'], str):
+            raise ValueError('name must be string')
+        new_name = data['name'].strip()
+        if not new_name:
+            raise ValueError('name cannot be empty')
+    if 'interval_days' in data:
+        new_interval = data['interval_days']
+        if not isinstance(new_interval, int) or new_interval <= 0:
+            raise ValueError('interval_days must be positive integer')
+    return new_name, new_interval
+
+
+def parse_new_shopping_item(data: dict) -> tuple:
+    item_text = data.get('item_text')
+    if not item_text:
+        raise ValueError('item_text is required')
+    if not isinstance(item_text, str):
+        raise ValueError('item_text must be string')
+    item_text = item_text.strip()
+    if not item_text:
+        raise ValueError('item_text cannot be empty')
+
+    category = data.get('category', 'supermarket')
+    if not isinstance(category, str) or not category.strip():
+        category = 'supermarket'
+    return item_text, category.strip()
+
+
+def parse_id(data: dict) -> int:
+    value = data.get('id')
+    if not isinstance(value, int):
+        raise ValueError('id must be integer')
+    return value
+
+
+def parse_due_filter(due_before: Optional[str], overdue: Optional[str],
+                     now: datetime) -> Tuple[Optional[datetime], bool]:
+    """GET /tasks?due_before=<ISO>&overdue=true: (граница срока или None, только просроченные).
+
+    next_due хранится в местном времени без смещения, поэтому due_before
+    со смещением (…+03:00, …Z) переводится в местное время сервера.
+    """
+    overdue = (overdue or 'false').lower() == 'true'
+    if due_before:
+        try:
+            due_before = datetime.fromisoformat(due_before)
+        except ValueError:
+            raise ValueError('due_before must be ISO 8601 datetime')
+        if due_before.tzinfo is not None:
+            due_before = due_before.astimezone().replace(tzinfo=None)
+    if overdue:
+        due_before = min(due_before, now) if due_before else now
+    return due_before or None, overdue
+
+
+def parse_shopping_filter(show_checked: Optional[str], category: Optional[str]) -> Tuple[bool, Optional[str]]:
+    show_checked = (show_checked or 'true').lower() == 'true'
+    if category == 'all':
+        category = None
+    return show_checked, category
+
+
+def parse_page(limit: Optional[str], after_id: Optional[str], stream: Optional[str],
+               max_limit: int) -> Tuple[Optional[int], Optional[int], bool]:
+    """?limit=<N>&after_id=<id> — страница списка, ?stream=true — весь список потоком.
+
+    Возвращает (limit, after_id, stream); limit None — список целиком.
+    after_id без limit — страница наибольшего размера.
+    """
+    stream = (stream or 'false').lower() == 'true'
+    if stream and (limit or after_id):
+        raise ValueError('stream cannot be combined with limit or after_id')
+    if after_id:
+        try:
+            after_id = int(after_id)
+        except ValueError:
+            raise ValueError('after_id must be integer')
+    if limit:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if not 0 < limit <= max_limit:
+            raise ValueError(f'limit must be integer from 1 to {max_limit}')
+    elif after_id:
+        limit = max_limit
+    return limit or None, after_id or None, stream
+
+
+def parse_suggest(query: Optional[str], limit: Optional[str], category: Optional[str],
+                  max_limit: int) -> Tuple[str, int, Optional[str]]:
+    """?q=<начало названия>&limit=<N>&category=<имя>: (q, limit, категория или None)"""
+    query = (query or '').strip()
+    if len(query) > 100:
+        raise ValueError('q is too long')
+    try:
+        limit = int(limit or 10)
+    except ValueError:
+        limit = 0
+    if not 0 < limit <= max_limit:
+        raise ValueError(f'limit must be integer from 1 to {max_limit}')
+    if category == 'all':
+        category = None
+    return query, limit, category or None
+
+
+def parse_stats_days(value: Optional[str]) -> Optional[int]:
+    """?days=<N> (по умолчанию 30) или days=all — за всё время (None)"""
+    value = value or '30'
+    if value == 'all':
+        return None
+    try:
+        days = int(value)
+    except ValueError:
+        days = 0
+    if days <= 0:
+        raise ValueError('days must be positive integer or "all"')
+    return days
+
+
+def parse_since(value: Optional[str]) -> int:
+    try:
+        return int(value or 0)
+    except ValueError:
+        raise ValueError('since must be integer')
+
+
+# ================== ПАКЕТНЫЕ ОПЕРАЦИИ ==================
+BATCH_PARSERS = {
+    'add_shopping_item': parse_new_shopping_item,
+    'toggle_shopping_item': lambda op: (parse_id(op),),
+    'add_task': parse_new_task,
+    'mark_task_done': lambda op: (parse_id(op),),
+}
+
+
+def parse_batch(data: dict, max_operations: int) -> Tuple[List[Optional[dict]], List[tuple]]:
+    """Разобрать тело POST /batch.
+
+    Возвращает (results, valid): results — список длины числа операций, где для
+    некорректных операций уже стоит ответ с ошибкой, а valid —
+    [(индекс, (op, args)), ...] для передачи в Database.apply_batch.
+    Ошибка всего запроса — ValueError.
+    """
+    if not isinstance(data, dict):
+        raise ValueError('JSON body must be object')
+    operations = data.get('operations')
+    if not isinstance(operations, list) or not operations:
+        raise ValueError('operations must be non-empty list')
+    if len(operations) > max_operations:
+        raise ValueError(f'Too many operations (max {max_operations})')
+
+    results: List[Optional[dict]] = [None] * len(operations)
+    valid = []  # (индекс в запросе, (op, args))
+    for index, op in enumerate(operations):
+        if not isinstance(op, dict):
+            results[index] = {'status': 400, 'error': 'operation must be object'}
+            continue
+        name = op.get('op')
+        # Имя проверяется до поиска в BATCH_PARSERS: список или объект в op не хешируются
+        if not isinstance(name, str) or name not in BATCH_PARSERS:
+            results[index] = {'status': 400, 'error': f'Unknown op: {name}'}
+            continue
+        try:
+            valid.append((index, (name, BATCH_PARSERS[name](op))))
+        except ValueError as e:
+            results[index] = {'status': 400, 'error': str(e)}
+    return results, valid
@@ -0,0 +1,134 @@
+import mmap
+import os
+import struct
+import threading
+import uuid
+from typing import Iterable, List, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: общий файл версий недоступен, только счётчики в памяти
+    fcntl = None
+
+# Можно ли разделять счётчики между процессами (TableVersions(path=...))
+SHARED_VERSIONS_SUPPORTED = fcntl is not None
+
+_EPOCH_SIZE = 8
+_COUNTER = struct.Struct('<q')
+
+
+class TableVersions:
+    """Счётчики изменений таблиц для ETag.
+
+    Счётчик увеличивается после каждой зафиксированной мутации таблицы.
+    epoch меняется при каждом запуске процесса, поэтому ETag, выданные до
+    перезапуска (когда счётчики начались с нуля), не совпадут с новыми.
+
+    У каждой таблицы slots счётчиков: изменение данных домохозяйства
+    (scope) сбрасывает ETag только в его ячейке scope % slots, а не у всех
+    домохозяйств. Совпадение ячеек даёт лишний сброс, но не устаревший ответ.
+
+    С path счётчики хранятся в общем для процессов файле (mmap), и
+    изменение, сделанное одним воркером, сбрасывает ETag во всех остальных.
+    epoch тогда хранится в том же файле и меняется при запуске каждого
+    процесса: база могла измениться, пока сервер не работал. Счётчики при
+    этом не трогаются — по их изменению видно, у каких домохозяйств
+    действительно менялись данные (см. reminders.py).
+    """
+
+    def __init__(self, tables: Iterable[str], path: Optional[str] = None, slots: int = 1):
+        self.tables = tuple(tables)
+        self.path = path
+        self.slots = slots
+        self._lock = threading.Lock()
+        # Номер первой ячейки таблицы
+        self._bases = {table: i * slots for i, table in enumerate(self.tables)}
+        # Увеличения, сделанные этим процессом (для foreign_snapshot)
+        self._local: List[int] = [0] * (len(self.tables) * slots)
+        if path is None:
+            self._epoch = uuid.uuid4().hex[:8]
+            self._versions: List[int] = [0] * (len(self.tables) * slots)
+            return
+
+        if fcntl is None:
+            raise RuntimeError('Shared table versions require fcntl (POSIX)')
+        size = _EPOCH_SIZE + len(self.tables) * slots * _COUNTER.size
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        fcntl.flock(self._fd, fcntl.LOCK_EX)
+        try:
+            if os.fstat(self._fd).st_size != size:
+                # Новый файл или другой набор таблиц: счётчики с нуля
+                os.ftruncate(self._fd, 0)
+                os.ftruncate(self._fd, size)
+            os.pwrite(self._fd, uuid.uuid4().hex[:_EPOCH_SIZE].encode(), 0)
+            self._map = mmap.mmap(self._fd, size)
+        finally:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    @property
+    def epoch(self) -> str:
+        # Из файла при каждом обращении: её меняет запуск любого процесса
+        if self.path is None:
+            return self._epoch
+        return self._map[:_EPOCH_SIZE].decode()
+
+    def _slots(self, tables: Iterable[str], scope: Optional[int]) -> List[int]:
+        if scope is None:
+            return [self._bases[table] + i for table in tables for i in range(self.slots)]
+        return [self._bases[table] + scope % self.slots for table in tables]
+
+    def bump(self, *tables: str, scope: Optional[int] = None) -> None:
+        """Отметить изменение таблиц в домохозяйстве scope (None — во всех)"""
+        slots = self._slots(tables, scope)
+        with self._lock:
+            # Свои увеличения учитываются до записи в файл: foreign_snapshot
+            # не примет их за чужие
+            for slot in slots:
+                self._local[slot] += 1
+            if self.path is None:
+                for slot in slots:
+                    self._versions[slot] += 1
+                return
+            # Блокировка файла: инкремент атомарен и между процессами
+            fcntl.flock(self._fd, fcntl.LOCK_EX)
+            try:
+                for slot in slots:
+                    offset = _EPOCH_SIZE + slot * _COUNTER.size
+                    _COUNTER.pack_into(self._map, offset, _COUNTER.unpack_from(self._map, offset)[0] + 1)
+            finally:
+                fcntl.flock(self._fd, fcntl.LOCK_UN)
+
+    def get(self, table: str, scope: int = 0) -> int:
+        slot = self._bases[table] + scope % self.slots
+        if self.path is None:
+            return self._versions[slot]
+        return _COUNTER.unpack_from(self._map, _EPOCH_SIZE + slot * _COUNTER.size)[0]
+
+    def snapshot(self, table: str) -> List[int]:
+        """Все ячейки таблицы: по разнице снимков видно, в каких ячейках были изменения"""
+        base = self._bases[table]
+        if self.path is None:
+            return self._versions[base:base + self.slots]
+        return list(struct.unpack_from(f'<{self.slots}q', self._map, _EPOCH_SIZE + base * _COUNTER.size))
+
+    def foreign_snapshot(self, table: str) -> List[int]:
+        """Ячейки таблицы без увеличений этого процесса — изменения других процессов.
+
+        Снимок файла читается раньше своих счётчиков, поэтому значение может
+        отставать, но никогда не опережает: рост значения — точно чужое изменение.
+        """
+        shared = self.snapshot(table)
+        base = self._bases[table]
+        with self._lock:
+            local = self._local[base:base + self.slots]
+        return [a - b for a, b in zip(shared, local)]
+
+    def token(self, *tables: str, scope: int = 0) -> str:
+        """Строка, меняющаяся при любом изменении перечисленных таблиц в домохозяйстве scope"""
+        return '-'.join([self.epoch, str(scope)] + [f"{table}.{self.get(table, scope)}" for table in tables])
+
+    def close(self) -> None:
+        # Повторный вызов (worker_exit в gunicorn, затем atexit) ничего не делает
+        if self.path is not None and not self._map.closed:
+            self._map.close()
+            os.close(self._fd)
@@ -0,0 +1,161 @@
+import contextvars
+import sqlite3
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+WriteJob = Callable[[sqlite3.Connection], Any]
+
+_STOP = object()
+
+
+class WriteQueue:
+    """Единственный поток-писатель SQLite.
+
+    Мутации ставятся в очередь и выполняются одним соединением. Все задания,
+    накопившиеся в очереди, объединяются в одну транзакцию (group commit):
+    каждое выполняется в своём SAVEPOINT, поэтому ошибка одного задания
+    откатывает только его. Результат задания становится доступен только
+    после COMMIT.
+
+    Если поток-писатель завершился (close() или ошибка соединения), задания
+    в очереди получают исключение, а submit()/execute() сразу его бросают —
+    вызывающие не ждут результата вечно.
+    """
+
+    def __init__(self, connect: Callable[[], sqlite3.Connection],
+                 max_batch: int = 64, name: str = 'sqlite-writer'):
+        self.max_batch = max_batch
+        self._queue: "queue.Queue" = queue.Queue()
+        # Соединение открываем сразу, чтобы ошибка подключения всплыла у вызывающего
+        self._conn = connect()
+        # Транзакциями управляем сами (BEGIN/SAVEPOINT/COMMIT)
+        self._conn.isolation_level = None
+        # Защищает постановку в очередь от одновременного завершения писателя
+        self._lock = threading.Lock()
+        self._closed = False
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, job: WriteJob) -> Future:
+        future = Future()
+        with self._lock:
+            if self._closed or not self._thread.is_alive():
+                raise RuntimeError("Write queue is closed") from self._error
+            # Задание выполняется в контексте вызывающего (contextvars), чтобы,
+            # например, метрики запросов относились к породившему его HTTP-запросу
+            self._queue.put((job, future, contextvars.copy_context()))
+        return future
+
+    def execute(self, job: WriteJob) -> Any:
+        """Выполнить задание и дождаться фиксации транзакции"""
+        if threading.current_thread() is self._thread:
+            # Вложенный вызов из другого задания — уже внутри транзакции
+            return job(self._conn)
+        return self.submit(job).result()
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def _run(self) -> None:
+        error: Optional[BaseException] = None
+        try:
+            while True:
+                batch = [self._queue.get()]
+                while batch[-1] is not _STOP and len(batch) < self.max_batch:
+                    try:
+                        batch.append(self._queue.get_nowait())
+                    except queue.Empty:
+                        break
+                stop = batch[-1] is _STOP
+                jobs = [item for item in batch if item is not _STOP]
+                if jobs:
+                    try:
+                        self._run_batch(jobs)
+                    except Exception as e:
+                        # Сбой самого соединения (SAVEPOINT, ROLLBACK TO): пакет
+                        # не зафиксирован; если откат не удался — писатель завершается
+                        logger.error(f"Error in write batch of {len(jobs)} jobs: {e}")
+                        self._fail(jobs, e)
+                        if self._conn.in_transaction:
+                            self._conn.execute("ROLLBACK")
+                if stop:
+                    break
+        except BaseException as e:
+            error = e
+            logger.exception("Write queue stopped")
+        finally:
+            with self._lock:
+                self._closed = True
+                self._error = error
+            # Задания, поставленные до закрытия, но не выполненные
+            pending = []
+            while True:
+                try:
+                    pending.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._fail(pending, error or RuntimeError("Write queue is closed"))
+            self._conn.close()
+
+    @staticmethod
+    def _fail(items: list, error: BaseException) -> None:
+        for item in items:
+            if item is _STOP:
+                continue
+            future = item[1]
+            if not future.done():
+                future.set_exception(error)
+
+    def _run_batch(self, jobs: List[Tuple[WriteJob, Future, contextvars.Context]]) -> None:
+        conn = self._conn
+        results = []
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            logger.error(f"Error starting write transaction: {e}")
+            self._fail(jobs, e)
+            return
+
+        for job, future, context in jobs:
+            if not future.set_running_or_notify_cancel():
+                continue
+            conn.execute("SAVEPOINT job")
+            try:
+                result = context.run(job, conn)
+            except BaseException as e:
+                if conn.in_transaction:
+                    conn.execute("ROLLBACK TO job")
+                    conn.execute("RELEASE job")
+                else:
+                    # SQLite откатил всю транзакцию (например, SQLITE_FULL):
+                    # предыдущие задания пакета тоже не зафиксированы
+                    results = [(f, False, e) for f, _, _ in results]
+                    conn.execute("BEGIN IMMEDIATE")
+                results.append((future, False, e))
+            else:
+                conn.execute("RELEASE job")
+                results.append((future, True, result))
+
+        try:
+            conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            logger.error(f"Error committing write batch of {len(results)} jobs: {e}")
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            for future, _, _ in results:
+                future.set_exception(e)
+            return
+
+        for future, ok, value in results:
+            if ok:
+                future.set_result(value)
+            else:
+                future.set_exception(value)
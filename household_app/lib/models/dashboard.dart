@@ -0,0 +1,33 @@
+import 'task.dart';
+
+// Сводка для главного экрана (GET /dashboard)
+class Dashboard {
+  final int tasksTotal;
+  final int tasksOverdue;
+  final int shoppingTotal;
+  final int shoppingUnchecked;
+  final int shoppingChecked;
+  final Task? nextTask; // ближайшая по сроку задача
+
+  Dashboard({
+    required this.tasksTotal,
+    required this.tasksOverdue,
+    required this.shoppingTotal,
+    required this.shoppingUnchecked,
+    required this.shoppingChecked,
+    this.nextTask,
+  });
+
+  factory Dashboard.fromJson(Map<String, dynamic> json) {
+    final tasks = json['tasks'] as Map<String, dynamic>;
+    final shopping = json['shopping'] as Map<String, dynamic>;
+    return Dashboard(
+      tasksTotal: tasks['total'] as int,
+      tasksOverdue: tasks['overdue'] as int,
+      shoppingTotal: shopping['total'] as int,
+      shoppingUnchecked: shopping['unchecked'] as int,
+      shoppingChecked: shopping['checked'] as int,
+      nextTask: json['next_task'] != null ? Task.fromJson(json['next_task']) : null,
+    );
+  }
+}
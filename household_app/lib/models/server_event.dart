@@ -0,0 +1,7 @@
+class ServerEvent {
+  final String? id;
+  final String type;
+  final Map<String, dynamic> data;
+
+  ServerEvent({this.id, required this.type, required this.data});
+}
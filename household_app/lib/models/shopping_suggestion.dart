@@ -0,0 +1,23 @@
+// Подсказка из истории покупок домохозяйства (GET /shopping/suggest)
+class ShoppingSuggestion {
+  final String itemText;
+  final String category; // где покупали чаще всего
+  final int uses;
+  final Map<String, int> categories; // сколько раз — по категориям
+
+  ShoppingSuggestion({
+    required this.itemText,
+    required this.category,
+    required this.uses,
+    required this.categories,
+  });
+
+  factory ShoppingSuggestion.fromJson(Map<String, dynamic> json) {
+    return ShoppingSuggestion(
+      itemText: json['item_text'] as String,
+      category: json['category'] as String,
+      uses: json['uses'] as int,
+      categories: Map<String, int>.from(json['categories'] ?? const {}),
+    );
+  }
+}
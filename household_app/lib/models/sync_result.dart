@@ -0,0 +1,62 @@
+import 'task.dart';
+import 'shopping_item.dart';
+
+class SyncResult {
+  final int revision;
+  final bool full; // true — пришёл полный снимок, локальные данные нужно заменить
+  final List<Task> tasks;
+  final List<ShoppingItem> shoppingItems;
+  final List<int> deletedTaskIds;
+  final List<int> deletedShoppingItemIds;
+
+  SyncResult({
+    required this.revision,
+    required this.full,
+    required this.tasks,
+    required this.shoppingItems,
+    required this.deletedTaskIds,
+    required this.deletedShoppingItemIds,
+  });
+
+  factory SyncResult.fromJson(Map<String, dynamic> json) {
+    final deleted = json['deleted'] as Map<String, dynamic>;
+    return SyncResult(
+      revision: json['revision'] as int,
+      full: json['full'] as bool,
+      tasks: (json['tasks'] as List).map((e) => Task.fromJson(e)).toList(),
+      shoppingItems: (json['shopping_items'] as List).map((e) => ShoppingItem.fromJson(e)).toList(),
+      deletedTaskIds: List<int>.from(deleted['tasks']),
+      deletedShoppingItemIds: List<int>.from(deleted['shopping_items']),
+    );
+  }
+
+  // Применить изменения к локальному списку задач
+  List<Task> applyToTasks(List<Task> current) {
+    if (full) return tasks;
+    final byId = {for (final t in current) t.id: t};
+    for (final id in deletedTaskIds) {
+      byId.remove(id);
+    }
+    for (final t in tasks) {
+      byId[t.id] = t;
+    }
+    return byId.values.toList()..sort((a, b) => a.name.compareTo(b.name));
+  }
+
+  // Применить изменения к локальному списку покупок (сначала неотмеченные, новые сверху)
+  List<ShoppingItem> applyToShoppingItems(List<ShoppingItem> current) {
+    if (full) return shoppingItems;
+    final byId = {for (final i in current) i.id: i};
+    for (final id in deletedShoppingItemIds) {
+      byId.remove(id);
+    }
+    for (final i in shoppingItems) {
+      byId[i.id] = i;
+    }
+    return byId.values.toList()
+      ..sort((a, b) {
+        if (a.isChecked != b.isChecked) return a.isChecked ? 1 : -1;
+        return b.id.compareTo(a.id);
+      });
+  }
+}
@@ -1,5 +1,7 @@
+import 'dart:async';
 import 'package:flutter/material.dart';
 import 'package:shared_preferences/shared_preferences.dart';
+import '../models/shopping_suggestion.dart';
 import '../services/api_service.dart';
 
 class ChatMessage {
@@ -24,11 +26,14 @@ class _AddItemsScreenState extends State<AddItemsScreen> {
   late ApiService _apiService;
   bool _itemsAdded = false;
   List<String> _categories = [];
+  List<ShoppingSuggestion> _suggestions = [];
+  Timer? _suggestDebounce;
 
   @override
   void initState() {
     super.initState();
     _apiService = ApiService();
+    _controller.addListener(_onTextChanged);
     _loadCategories();
     _messages.add(ChatMessage(
       text: 'Введите пункты списка покупок. Выберите категорию.',
@@ -36,6 +41,48 @@ class _AddItemsScreenState extends State<AddItemsScreen> {
     ));
   }
 
+  @override
+  void dispose() {
+    _suggestDebounce?.cancel();
+    _controller.dispose();
+    super.dispose();
+  }
+
+  // Подсказки по последней строке ввода, после паузы в наборе
+  void _onTextChanged() {
+    _suggestDebounce?.cancel();
+    final query = _controller.text.split('\n').last.trim();
+    if (query.isEmpty) {
+      if (_suggestions.isNotEmpty) setState(() => _suggestions = []);
+      return;
+    }
+    _suggestDebounce = Timer(const Duration(milliseconds: 200), () async {
+      try {
+        final suggestions = await _apiService.suggestShoppingItems(query);
+        if (!mounted || _controller.text.split('\n').last.trim() != query) return;
+        setState(() => _suggestions = suggestions);
+      } catch (_) {
+        // Без подсказок ввод работает как раньше
+      }
+    });
+  }
+
+  void _applySuggestion(ShoppingSuggestion suggestion) {
+    final lines = _controller.text.split('\n');
+    lines[lines.length - 1] = suggestion.itemText;
+    final text = lines.join('\n');
+    _controller.value = TextEditingValue(
+      text: text,
+      selection: TextSelection.collapsed(offset: text.length),
+    );
+    setState(() {
+      _suggestions = [];
+      // Категория — та, в которой этот товар обычно покупают
+      if (!_categories.contains(suggestion.category)) _categories.add(suggestion.category);
+      _selectedCategory = suggestion.category;
+    });
+  }
+
   Future<void> _loadCategories() async {
     try {
       final prefs = await SharedPreferences.getInstance();
@@ -98,7 +145,29 @@ class _AddItemsScreenState extends State<AddItemsScreen> {
       _controller.clear();
     });
 
+    // Каждая строка — отдельный пункт; несколько пунктов уходят одним запросом
+    final lines = text
+        .split('\n')
+        .map((line) => line.trim())
+        .where((line) => line.isNotEmpty)
+        .toList();
+
     try {
+      if (lines.length > 1) {
+        final created = await _apiService.createShoppingItems(lines, _selectedCategory);
+        if (!mounted) return;
+        final added = created.where((item) => item != null).length;
+        final skipped = created.length - added;
+        setState(() {
+          _messages.add(ChatMessage(
+            text: '✅ Добавлено $added в категорию "$_selectedCategory"'
+                '${skipped > 0 ? ', уже в списке: $skipped' : ''}',
+            isUser: false,
+          ));
+          if (added > 0) _itemsAdded = true;
+        });
+        return;
+      }
       await _apiService.createShoppingItem(text, _selectedCategory);
       if (!mounted) return;
       setState(() {
@@ -185,6 +254,25 @@ class _AddItemsScreenState extends State<AddItemsScreen> {
                 },
               ),
             ),
+            // Подсказки из истории покупок
+            if (_suggestions.isNotEmpty)
+              SizedBox(
+                height: 48,
+                child: ListView(
+                  scrollDirection: Axis.horizontal,
+                  padding: const EdgeInsets.symmetric(horizontal: 8),
+                  children: _suggestions.map((s) {
+                    return Padding(
+                      padding: const EdgeInsets.only(right: 6),
+                      child: ActionChip(
+                        label: Text(s.itemText),
+                        tooltip: '${_displayCategory(s.category)}, ${s.uses} раз',
+                        onPressed: () => _applySuggestion(s),
+                      ),
+                    );
+                  }).toList(),
+                ),
+              ),
             // Нижняя панель ввода
             Container(
               padding: const EdgeInsets.all(8.0),
@@ -195,10 +283,12 @@ class _AddItemsScreenState extends State<AddItemsScreen> {
                     child: TextField(
                       controller: _controller,
                       decoration: const InputDecoration(
-                        hintText: 'Введите пункт...',
+                        hintText: 'Введите пункт (несколько — с новой строки)...',
                         border: OutlineInputBorder(),
                       ),
-                      onSubmitted: (_) => _sendMessage(),
+                      keyboardType: TextInputType.multiline,
+                      minLines: 1,
+                      maxLines: 5,
                     ),
                   ),
                   IconButton(
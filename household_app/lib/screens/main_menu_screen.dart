@@ -15,7 +15,9 @@ class MainMenuScreen extends StatefulWidget {
 
 class _MainMenuScreenState extends State<MainMenuScreen> {
   int _tasksCount = 0;
+  int _overdueCount = 0;
   int _shoppingCount = 0;
+  String? _nextTaskName;
   bool _isLoading = true;
   String _userName = '';
 
@@ -27,19 +29,19 @@ class _MainMenuScreenState extends State<MainMenuScreen> {
 
   Future<void> _loadData() async {
     final prefs = await SharedPreferences.getInstance();
-    final chatId = prefs.getInt('chat_id');
     final userName = prefs.getString('username');
     setState(() {
       _userName = userName?.toString() ?? 'пользователь';
     });
 
     try {
-      final apiService = ApiService();
-      final tasks = await apiService.getTasks(chatId: chatId?.toString() ?? '');
-      final shopping = await apiService.getShoppingItems(chatId: chatId?.toString() ?? '');
+      // Только счётчики: один запрос вместо загрузки списков задач и покупок
+      final dashboard = await ApiService().getDashboard();
       setState(() {
-        _tasksCount = tasks.length;
-        _shoppingCount = shopping.length;
+        _tasksCount = dashboard.tasksTotal;
+        _overdueCount = dashboard.tasksOverdue;
+        _shoppingCount = dashboard.shoppingTotal;
+        _nextTaskName = dashboard.nextTask?.name;
         _isLoading = false;
       });
     } catch (e) {
@@ -130,9 +132,18 @@ class _MainMenuScreenState extends State<MainMenuScreen> {
                       color: Colors.blue[100],
                       borderRadius: BorderRadius.circular(12),
                     ),
-                    child: Text(
-                      'Всего задач: $_tasksCount, Покупок: $_shoppingCount',
-                      style: const TextStyle(fontSize: 18),
+                    child: Column(
+                      crossAxisAlignment: CrossAxisAlignment.start,
+                      children: [
+                        Text(
+                          'Всего задач: $_tasksCount, Покупок: $_shoppingCount',
+                          style: const TextStyle(fontSize: 18),
+                        ),
+                        if (_overdueCount > 0)
+                          Text('Просрочено: $_overdueCount', style: const TextStyle(fontSize: 16)),
+                        if (_nextTaskName != null)
+                          Text('Следующая: $_nextTaskName', style: const TextStyle(fontSize: 16)),
+                      ],
                     ),
                   ),
                   const SizedBox(height: 20),
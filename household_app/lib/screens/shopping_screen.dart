@@ -1,6 +1,8 @@
+import 'dart:async';
 import 'package:flutter/material.dart';
 import 'package:shared_preferences/shared_preferences.dart';
 import '../models/shopping_item.dart';
+import '../models/server_event.dart';
 import '../services/api_service.dart';
 import 'add_items_screen.dart';
 
@@ -19,11 +21,47 @@ class _ShoppingScreenState extends State<ShoppingScreen> {
   String? _error;
   String _chatId = '';
   String _selectedFilter = 'all'; // 'all', 'supermarket', 'household'
+  StreamSubscription<ServerEvent>? _eventsSubscription;
 
   @override
   void initState() {
     super.initState();
     _loadChatIdAndItems();
+    // Изменения от других пользователей приходят с сервера, без опроса
+    _eventsSubscription = _apiService.subscribeEvents().listen(_onServerEvent);
+  }
+
+  @override
+  void dispose() {
+    _eventsSubscription?.cancel();
+    super.dispose();
+  }
+
+  void _onServerEvent(ServerEvent event) {
+    if (!mounted || _isLoading) return;
+    switch (event.type) {
+      case 'shopping_item_added':
+      case 'shopping_item_toggled':
+        final item = ShoppingItem.fromJson(Map<String, dynamic>.from(event.data['item']));
+        final toggledId = event.data['id'];
+        setState(() {
+          _items.removeWhere((i) => i.id == item.id || i.id == toggledId);
+          if (_selectedFilter == 'all' || _selectedFilter == item.category) {
+            _items.add(item);
+          }
+          // Порядок как на сервере: сначала неотмеченные, новые сверху
+          _items.sort((a, b) {
+            if (a.isChecked != b.isChecked) return a.isChecked ? 1 : -1;
+            return b.id.compareTo(a.id);
+          });
+          if (!_categories.contains(item.category)) _categories.add(item.category);
+        });
+        break;
+      case 'shopping_items_deleted':
+      case 'resync':
+        _fetchItems();
+        break;
+    }
   }
 
   Future<void> _loadChatIdAndItems() async {
@@ -1,12 +1,29 @@
+import 'dart:async';
+import 'dart:convert';
 import 'package:dio/dio.dart';
 import 'package:shared_preferences/shared_preferences.dart';
 import '../models/task.dart';
+import '../models/dashboard.dart';
 import '../models/shopping_item.dart';
+import '../models/shopping_suggestion.dart';
+import '../models/sync_result.dart';
+import '../models/server_event.dart';
 import '../app_config.dart';
 
+// Закэшированный ответ GET-запроса вместе с его ETag
+class _CachedResponse {
+  final String etag;
+  final dynamic data;
+
+  _CachedResponse(this.etag, this.data);
+}
+
 class ApiService {
   final Dio _dio;
 
+  // Общий для всех экземпляров кэш: ключ — путь с параметрами запроса
+  static final Map<String, _CachedResponse> _etagCache = {};
+
   ApiService() : _dio = Dio(BaseOptions(
     baseUrl: AppConfig.baseUrl,
     headers: {'Content-Type': 'application/json'},
@@ -46,10 +63,50 @@ class ApiService {
     }
   }
 
+  // GET с If-None-Match: при 304 возвращаем ранее полученные данные
+  Future<Response> _getCached(String path, {Map<String, dynamic>? queryParameters}) async {
+    final uri = Uri(path: path, queryParameters: queryParameters);
+    final key = uri.toString();
+    final cached = _etagCache[key];
+    final response = await _dio.get(
+      path,
+      queryParameters: queryParameters,
+      options: Options(
+        headers: cached != null ? {'If-None-Match': cached.etag} : null,
+        validateStatus: (status) =>
+            status != null && ((status >= 200 && status < 300) || status == 304),
+      ),
+    );
+    if (response.statusCode == 304 && cached != null) {
+      return Response(
+        requestOptions: response.requestOptions,
+        statusCode: 200,
+        data: cached.data,
+        headers: response.headers,
+      );
+    }
+    final etag = response.headers.value('etag');
+    if (response.statusCode == 200 && etag != null) {
+      _etagCache[key] = _CachedResponse(etag, response.data);
+    }
+    return response;
+  }
+
+  // Сводка для главного экрана одним запросом
+  Future<Dashboard> getDashboard() async {
+    await _setChatIdHeader();
+    final response = await _getCached('/dashboard');
+    if (response.statusCode == 200) {
+      return Dashboard.fromJson(response.data);
+    } else {
+      throw Exception('Failed to load dashboard');
+    }
+  }
+
   // Задачи
   Future<List<Task>> getTasks({required String chatId}) async {
     await _setChatIdHeader();
-    final response = await _dio.get('/tasks');
+    final response = await _getCached('/tasks');
     if (response.statusCode == 200) {
       return (response.data as List).map((e) => Task.fromJson(e)).toList();
     } else {
@@ -111,7 +168,7 @@ class ApiService {
     if (category != null && category != 'all') {
       queryParams['category'] = category;
     }
-    final response = await _dio.get('/shopping', queryParameters: queryParams);
+    final response = await _getCached('/shopping', queryParameters: queryParams);
     if (response.statusCode == 200) {
       return (response.data as List).map((e) => ShoppingItem.fromJson(e)).toList();
     } else {
@@ -132,6 +189,23 @@ class ApiService {
     }
   }
 
+  // Несколько пунктов одним запросом (POST /batch). Для дубликатов — null
+  Future<List<ShoppingItem?>> createShoppingItems(List<String> itemTexts, String category) async {
+    await _setChatIdHeader();
+    final response = await _dio.post('/batch', data: {
+      'operations': itemTexts
+          .map((text) => {'op': 'add_shopping_item', 'item_text': text, 'category': category})
+          .toList(),
+    });
+    if (response.statusCode == 200) {
+      return (response.data['results'] as List)
+          .map((r) => r['status'] == 201 ? ShoppingItem.fromJson(r['item']) : null)
+          .toList();
+    } else {
+      throw Exception('Failed to create shopping items');
+    }
+  }
+
   Future<ShoppingItem> toggleShoppingItem(int itemId) async {
     await _setChatIdHeader();
     final response = await _dio.patch('/shopping/$itemId/toggle');
@@ -164,7 +238,7 @@ class ApiService {
 
   Future<Map<String, int>> getShoppingStats() async {
     await _setChatIdHeader();
-    final response = await _dio.get('/shopping/stats');
+    final response = await _getCached('/shopping/stats');
     if (response.statusCode == 200) {
       return Map<String, int>.from(response.data);
     } else {
@@ -172,13 +246,113 @@ class ApiService {
     }
   }
 
+  // Подсказки при вводе покупки: без кэша по ETag — запросы на каждый набранный символ
+  Future<List<ShoppingSuggestion>> suggestShoppingItems(String query, {String? category, int limit = 8}) async {
+    await _setChatIdHeader();
+    final response = await _dio.get('/shopping/suggest', queryParameters: {
+      'q': query,
+      'limit': limit,
+      if (category != null) 'category': category,
+    });
+    if (response.statusCode == 200) {
+      return (response.data as List).map((json) => ShoppingSuggestion.fromJson(json)).toList();
+    } else {
+      throw Exception('Failed to load suggestions');
+    }
+  }
+
   Future<List<String>> getCategories({required String chatId}) async {
     await _setChatIdHeader();
-    final response = await _dio.get('/categories');
+    final response = await _getCached('/categories');
     if (response.statusCode == 200) {
       return List<String>.from(response.data);
     } else {
       throw Exception('Failed to load categories');
     }
   }
-}
\ No newline at end of file
+
+  // Синхронизация: только изменения после сохранённой ревизии
+  Future<SyncResult> sync({bool reset = false}) async {
+    await _setChatIdHeader();
+    final prefs = await SharedPreferences.getInstance();
+    final since = reset ? 0 : (prefs.getInt('sync_revision') ?? 0);
+    final response = await _dio.get('/sync', queryParameters: {'since': since});
+    if (response.statusCode == 200) {
+      final result = SyncResult.fromJson(response.data);
+      await prefs.setInt('sync_revision', result.revision);
+      return result;
+    } else {
+      throw Exception('Failed to sync');
+    }
+  }
+
+  // Поток событий сервера (SSE). При обрыве переподключается сам,
+  // передавая Last-Event-ID; отмена подписки закрывает соединение.
+  Stream<ServerEvent> subscribeEvents() {
+    late StreamController<ServerEvent> controller;
+    CancelToken? cancelToken;
+    String? lastEventId;
+    var active = true;
+
+    Future<void> connect() async {
+      while (active) {
+        cancelToken = CancelToken();
+        try {
+          await _setChatIdHeader();
+          final response = await _dio.get<ResponseBody>(
+            '/events',
+            cancelToken: cancelToken,
+            options: Options(
+              responseType: ResponseType.stream,
+              headers: {
+                'Accept': 'text/event-stream',
+                if (lastEventId != null) 'Last-Event-ID': lastEventId,
+              },
+            ),
+          );
+          String? id;
+          String? type;
+          final data = StringBuffer();
+          final lines = response.data!.stream
+              .cast<List<int>>()
+              .transform(utf8.decoder)
+              .transform(const LineSplitter());
+          await for (final line in lines) {
+            if (line.isEmpty) {
+              // Пустая строка завершает событие
+              if (type != null) {
+                lastEventId = id ?? lastEventId;
+                final payload = data.isEmpty ? <String, dynamic>{} : jsonDecode(data.toString());
+                controller.add(ServerEvent(id: id, type: type, data: Map<String, dynamic>.from(payload)));
+              }
+              id = null;
+              type = null;
+              data.clear();
+            } else if (line.startsWith(':')) {
+              continue; // heartbeat
+            } else if (line.startsWith('id:')) {
+              id = line.substring(3).trim();
+            } else if (line.startsWith('event:')) {
+              type = line.substring(6).trim();
+            } else if (line.startsWith('data:')) {
+              data.write(line.substring(5).trim());
+            }
+          }
+        } catch (e) {
+          if (!active) return;
+          print('⚠️ SSE disconnected: $e');
+        }
+        if (active) await Future.delayed(const Duration(seconds: 5));
+      }
+    }
+
+    controller = StreamController<ServerEvent>(
+      onListen: connect,
+      onCancel: () {
+        active = false;
+        cancelToken?.cancel();
+      },
+    );
+    return controller.stream;
+  }
+}